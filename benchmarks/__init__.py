@@ -0,0 +1 @@
+"""Нагрузочные прогоны бота на локальных стендах."""
@@ -0,0 +1,183 @@
+"""Нагрузочный прогон бота на локальных стендах Практикума и Telegram.
+
+Запуск: python -m benchmarks.bench --tenants 1 100 10000
+Сохранить базовые значения: --save, сравнить с ними: --compare.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import time
+
+import telegram
+
+from telegram.utils.request import Request
+
+import circuit_breaker
+import homework
+import http_client
+import response_cache
+import retry
+
+from benchmarks.stubs import StubPracticum, StubTelegram
+from engine import PollingEngine, Tenant
+from send_queue import SEND_WORKERS, SendQueue, percentile
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+BENCH_BOT_TOKEN = '123456:benchmark'
+UNLIMITED_RATE = 1e9
+HIGHER_IS_BETTER = ('polls_per_sec',)
+LOWER_IS_BETTER = ('poll_p99', 'cycle_p99', 'rss_mb')
+
+
+class TimedEngine(PollingEngine):
+    """Движок, который замеряет длительность опроса каждого студента."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Движок с пустым списком задержек опросов."""
+        super().__init__(*args, **kwargs)
+        self.latencies = []
+
+    async def poll(self, tenant: Tenant) -> None:
+        """Опрос студента с замером времени, включая ожидание в очереди."""
+        started = time.perf_counter()
+        await super().poll(tenant)
+        self.latencies.append(time.perf_counter() - started)
+
+
+def rss_mb() -> float:
+    """Текущий RSS процесса в мегабайтах."""
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_scenario(tenants_count: int, cycles: int = 3, latency: float = 0,
+                 error_rate: float = 0, change_rate: float = 0.1,
+                 concurrency: int = 100) -> dict:
+    """Прогон cycles циклов опроса для tenants_count студентов."""
+    practicum = StubPracticum(latency, error_rate, change_rate).start()
+    stub_telegram = StubTelegram(latency, error_rate).start()
+    endpoint = homework.ENDPOINT
+    homework.ENDPOINT = practicum.url
+    circuit_breaker.reset_breakers()
+    retry.reset_budgets()
+    http_client.init_session(pool_size=concurrency)
+    response_cache.init_cache()
+    try:
+        bot = telegram.Bot(
+            BENCH_BOT_TOKEN, base_url=stub_telegram.base_url,
+            request=Request(con_pool_size=SEND_WORKERS),
+        )
+        tenants = [
+            Tenant(token=f'token{i}', chat_id=i, timestamp=1)
+            for i in range(tenants_count)
+        ]
+        polling = TimedEngine(bot, tenants, concurrency=concurrency)
+        polling.sender = SendQueue(
+            bot, global_rate=UNLIMITED_RATE, chat_rate=UNLIMITED_RATE
+        )
+        durations = []
+        for _ in range(cycles):
+            practicum.generation += 1
+            started = time.perf_counter()
+            asyncio.run(polling.run_cycle())
+            durations.append(time.perf_counter() - started)
+    finally:
+        homework.ENDPOINT = endpoint
+        http_client.close_session()
+        response_cache.close_cache()
+        practicum.stop()
+        stub_telegram.stop()
+    return {
+        'tenants': tenants_count,
+        'cycles': cycles,
+        'polls_per_sec': tenants_count * cycles / sum(durations),
+        'poll_p50': percentile(polling.latencies, 0.5),
+        'poll_p99': percentile(polling.latencies, 0.99),
+        'cycle_p50': percentile(durations, 0.5),
+        'cycle_p99': percentile(durations, 0.99),
+        'rss_mb': rss_mb(),
+        'api_requests': practicum.requests,
+        'api_errors': practicum.errors,
+        'messages': len(stub_telegram.messages),
+    }
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """Регрессии относительно сохранённых базовых значений."""
+    regressions = []
+    for result in results:
+        base = baseline.get(str(result['tenants']))
+        if base is None:
+            continue
+        for key in HIGHER_IS_BETTER:
+            if result[key] < base[key] * (1 - tolerance):
+                regressions.append((result['tenants'], key, base[key],
+                                    result[key]))
+        for key in LOWER_IS_BETTER:
+            if result[key] > base[key] * (1 + tolerance):
+                regressions.append((result['tenants'], key, base[key],
+                                    result[key]))
+    return regressions
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Разбор аргументов командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tenants', type=int, nargs='+',
+                        default=[1, 100, 10000])
+    parser.add_argument('--cycles', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--change-rate', type=float, default=0.1)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--save', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--baseline', default=BASELINE)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """Прогон сценариев, вывод результатов и сравнение с базой."""
+    args = parse_args(argv)
+    homework.logger.setLevel(logging.CRITICAL)
+    results = []
+    for count in args.tenants:
+        result = run_scenario(
+            count, args.cycles, args.latency, args.error_rate,
+            args.change_rate, args.concurrency,
+        )
+        results.append(result)
+        print(
+            f'{count:>6} студентов: {result["polls_per_sec"]:9.1f} опр/с, '
+            f'опрос p50 {result["poll_p50"] * 1000:7.1f} мс '
+            f'p99 {result["poll_p99"] * 1000:7.1f} мс, '
+            f'цикл p99 {result["cycle_p99"]:6.2f} с, '
+            f'RSS {result["rss_mb"]:6.1f} МБ'
+        )
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(
+                {str(result['tenants']): result for result in results},
+                file, indent=2,
+            )
+    if not args.compare:
+        return 0
+    with open(args.baseline, encoding='utf-8') as file:
+        regressions = compare(results, json.load(file), args.tolerance)
+    for tenants, key, base, value in regressions:
+        print(f'Регрессия: {tenants} студентов, {key}: {base:.4g} -> '
+              f'{value:.4g}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Замер памяти на одну работу в индексе статусов студентов.
+
+Запуск: python -m benchmarks.memory --records 1000000
+Сравниваются полные словари работ из ответа API, словарь
+ключ -> статус (как хранилось раньше) и HomeworkIndex.
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+
+from homework import HOMEWORK_STATUSES
+from homework_index import HomeworkIndex
+
+HOMEWORKS_PER_TENANT = 10
+STATUS_NAMES = tuple(HOMEWORK_STATUSES)
+
+
+def api_homeworks(tenant: int, count: int) -> list:
+    """Работы студента в том виде, в каком их отдаёт API."""
+    return [
+        {
+            'id': tenant * count + number,
+            'homework_name': f'student{tenant}__hw{number:02}.zip',
+            'status': STATUS_NAMES[(tenant + number) % len(STATUS_NAMES)],
+            'reviewer_comment': 'Всё хорошо',
+            'date_updated': '2021-08-01T12:00:00Z',
+            'lesson_name': f'Спринт {number}',
+        }
+        for number in range(count)
+    ]
+
+
+def full_dicts(homeworks: list):
+    """Полные словари работ."""
+    return homeworks
+
+
+def status_dict(homeworks: list):
+    """Словарь ключ работы -> статус."""
+    return {str(item['id']): item['status'] for item in homeworks}
+
+
+def compact_index(homeworks: list):
+    """Компактный индекс статусов."""
+    return HomeworkIndex(status_dict(homeworks))
+
+
+LAYOUTS = {
+    'full': full_dicts,
+    'dict': status_dict,
+    'compact': compact_index,
+}
+
+
+def bytes_per_record(layout, records: int,
+                     per_tenant: int = HOMEWORKS_PER_TENANT) -> float:
+    """Байт на одну работу для records работ в представлении layout.
+
+    Исходные данные строятся заново для каждого студента и сразу
+    освобождаются, так что в замер попадает только то, что остаётся
+    в памяти после построения представления.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = [
+            layout(api_homeworks(tenant, per_tenant))
+            for tenant in range(records // per_tenant)
+        ]
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size / records
+
+
+def main(argv=None) -> int:
+    """Замер всех представлений и вывод байт на работу."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=1_000_000)
+    parser.add_argument('--per-tenant', type=int,
+                        default=HOMEWORKS_PER_TENANT)
+    parser.add_argument('--layouts', nargs='+', choices=LAYOUTS,
+                        default=list(LAYOUTS))
+    args = parser.parse_args(argv)
+    for name in args.layouts:
+        size = bytes_per_record(LAYOUTS[name], args.records, args.per_tenant)
+        print(f'{name}: {size:.1f} байт на работу ({args.records} работ)')
+        sys.stdout.flush()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
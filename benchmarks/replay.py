@@ -0,0 +1,36 @@
+"""Прогон записанного трафика API и Telegram без сети.
+
+Запись: TRAFFIC_RECORD=traffic.jsonl.gz python homework.py
+Запуск: python -m benchmarks.replay traffic.jsonl.gz --speed max
+При --speed wall ответы отдаются с записанными интервалами и задержками.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+import homework
+import traffic
+
+
+def main(argv=None) -> int:
+    """Прогон записи и вывод итогов."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('path')
+    parser.add_argument('--speed', choices=('max', 'wall'), default='max')
+    args = parser.parse_args(argv)
+    homework.logger.setLevel(logging.CRITICAL)
+    result = asyncio.run(
+        traffic.replay(traffic.load(args.path), args.speed == 'wall')
+    )
+    print(
+        f'{result["tenants"]} токенов, {result["polls"]} опросов за '
+        f'{result["seconds"]:.2f} с ({result["polls_per_sec"]:.1f} опр/с), '
+        f'сообщений {result["messages"]} '
+        f'(в записи {result["recorded_messages"]})'
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
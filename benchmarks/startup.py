@@ -0,0 +1,147 @@
+"""Замер холодного старта: импорт homework, --check и время до первого опроса.
+
+Запуск: python -m benchmarks.startup
+Каждый замер делается в новом процессе, как при перезапуске dyno.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.stubs import StubPracticum, StubTelegram
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET = 0.25
+CHECK_BUDGET = 1.0
+FIRST_POLL_BUDGET = 3.0
+CLIENT_MODULES = ('telegram', 'requests', 'urllib3', 'asyncio')
+IMPORT_SCRIPT = (
+    'import sys, time\n'
+    'started = time.perf_counter()\n'
+    'import homework\n'
+    'print(time.perf_counter() - started)\n'
+    'print(",".join(m for m in {modules!r} if m in sys.modules))\n'
+)
+CHECK_ENV = {
+    'PRACTICUM_TOKEN': 'startup', 'TELEGRAM_TOKEN': '123456:startup',
+    'TELEGRAM_CHAT_ID': '1',
+}
+
+
+def python(args: list, env: dict = None, **kwargs) -> subprocess.Popen:
+    """Новый процесс интерпретатора в корне проекта."""
+    return subprocess.Popen(
+        [sys.executable, *args], cwd=ROOT, env={**os.environ, **(env or {})},
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        **kwargs,
+    )
+
+
+def measure_import() -> tuple:
+    """Время импорта homework и загруженные при этом тяжёлые клиенты."""
+    script = IMPORT_SCRIPT.format(modules=CLIENT_MODULES)
+    output, _ = python(['-c', script]).communicate()
+    seconds, loaded = output.splitlines()
+    return float(seconds), [name for name in loaded.split(',') if name]
+
+
+def measure_check() -> tuple:
+    """Полное время процесса homework.py --check и код возврата."""
+    started = time.perf_counter()
+    process = python(['homework.py', '--check'], CHECK_ENV)
+    process.communicate()
+    return time.perf_counter() - started, process.returncode
+
+
+def measure_first_poll(timeout: float = 30) -> float:
+    """От запуска процесса до первого запроса к стенду Практикума."""
+    practicum = StubPracticum().start()
+    telegram = StubTelegram().start()
+    process = None
+    try:
+        started = time.perf_counter()
+        process = python(
+            ['-m', 'benchmarks.startup', '--child', practicum.url,
+             telegram.base_url],
+        )
+        while not practicum.requests:
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError('Бот не опросил стенд')
+            time.sleep(0.001)
+        return time.perf_counter() - started
+    finally:
+        if process is not None:
+            try:
+                process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+        practicum.stop()
+        telegram.stop()
+
+
+def first_poll(url: str, base_url: str) -> None:
+    """Запуск бота, как в main(), до завершения первого цикла опроса."""
+    import asyncio
+
+    import telegram
+
+    import homework
+    import http_client
+    import response_cache
+
+    from benchmarks.bench import BENCH_BOT_TOKEN
+    from engine import PollingEngine, Tenant
+
+    homework.ENDPOINT = url
+    bot = telegram.Bot(BENCH_BOT_TOKEN, base_url=base_url)
+    http_client.init_session()
+    response_cache.init_cache()
+    tenant = Tenant(token='token0', chat_id=0, timestamp=1)
+    asyncio.run(PollingEngine(bot, [tenant]).run_cycle())
+
+
+def measure(runs: int = 3) -> dict:
+    """Лучшие из runs замеры холодного старта."""
+    imports = [measure_import() for _ in range(runs)]
+    checks = [measure_check() for _ in range(runs)]
+    return {
+        'import_seconds': min(seconds for seconds, _ in imports),
+        'import_loads': imports[0][1],
+        'check_seconds': min(seconds for seconds, _ in checks),
+        'check_returncode': checks[0][1],
+        'first_poll_seconds': min(
+            measure_first_poll() for _ in range(runs)
+        ),
+    }
+
+
+def main(argv=None) -> int:
+    """Замеры и сравнение с бюджетом старта."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--child', nargs=2, metavar=('URL', 'BASE_URL'))
+    args = parser.parse_args(argv)
+    if args.child:
+        first_poll(*args.child)
+        return 0
+    result = measure(args.runs)
+    print(
+        f'импорт homework {result["import_seconds"] * 1000:.1f} мс '
+        f'(бюджет {IMPORT_BUDGET * 1000:.0f}), '
+        f'--check {result["check_seconds"] * 1000:.1f} мс '
+        f'(бюджет {CHECK_BUDGET * 1000:.0f}), '
+        f'до первого опроса {result["first_poll_seconds"] * 1000:.1f} мс '
+        f'(бюджет {FIRST_POLL_BUDGET * 1000:.0f})'
+    )
+    over = (
+        result['import_seconds'] > IMPORT_BUDGET
+        or result['check_seconds'] > CHECK_BUDGET
+        or result['first_poll_seconds'] > FIRST_POLL_BUDGET
+    )
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
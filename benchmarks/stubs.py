@@ -0,0 +1,181 @@
+import json
+import random
+import threading
+import time
+import zlib
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+STATUSES = ('reviewing', 'rejected', 'approved')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Общая часть обработчиков: задержка, ошибки и ответ JSON."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        """Без записи каждого запроса в stderr."""
+
+    def reply(self, status: int, payload, headers=None) -> None:
+        """Отправка ответа JSON с Content-Length для keep-alive."""
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def simulate(self) -> bool:
+        """Задержка и случайная ошибка; True, если ответ уже отправлен."""
+        stub = self.server.stub
+        with stub.lock:
+            stub.requests += 1
+        if stub.latency:
+            time.sleep(stub.latency)
+        if stub.error_rate and random.random() < stub.error_rate:
+            with stub.lock:
+                stub.errors += 1
+            self.reply(500, stub.error_payload)
+            return True
+        return False
+
+
+class PracticumHandler(StubHandler):
+    """Имитация эндпоинта homework_statuses."""
+
+    def do_GET(self):
+        """Список работ для токена из заголовка Authorization."""
+        if self.simulate():
+            return
+        stub = self.server.stub
+        token = self.headers.get('Authorization', '').split(' ')[-1]
+        homeworks = stub.homeworks_for(token)
+        etag = f'"{zlib.crc32(json.dumps(homeworks).encode())}"'
+        if stub.use_etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        params = parse_qs(urlparse(self.path).query)
+        from_date = int(params.get('from_date', ['0'])[0])
+        headers = {'ETag': etag} if stub.use_etag else None
+        self.reply(200, {
+            'homeworks': homeworks,
+            'current_date': max(from_date, int(time.time())),
+        }, headers)
+
+
+class TelegramHandler(StubHandler):
+    """Имитация метода sendMessage Bot API."""
+
+    def do_POST(self):
+        """Приём сообщения и ответ в формате Bot API."""
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if self.simulate():
+            return
+        stub = self.server.stub
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            data = json.loads(body or b'{}')
+        else:
+            data = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+        with stub.lock:
+            stub.messages.append((data.get('chat_id'), data.get('text')))
+            message_id = len(stub.messages)
+        self.reply(200, {'ok': True, 'result': {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': int(data.get('chat_id', 0)), 'type': 'private'},
+            'text': data.get('text', ''),
+        }})
+
+
+class StubServer:
+    """Локальный HTTP-сервер в отдельном потоке."""
+
+    handler = StubHandler
+    path = '/'
+    error_payload = {'error': 'stub error', 'code': 'stub'}
+
+    def __init__(self, latency: float = 0, error_rate: float = 0) -> None:
+        """Сервер с задержкой latency и долей ошибок error_rate."""
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.handler)
+        self.server.daemon_threads = True
+        self.server.request_queue_size = 1024
+        self.server.stub = self
+        self.url = f'http://127.0.0.1:{self.server.server_port}{self.path}'
+
+    def start(self) -> 'StubServer':
+        """Запуск сервера в фоновом потоке."""
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Остановка сервера."""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StubPracticum(StubServer):
+    """Стенд API Практикум.Домашка.
+
+    По умолчанию отдаёт одинаковый список homeworks всем токенам. Если
+    задан change_rate, у такой доли токенов статус единственной работы
+    меняется при каждом увеличении generation.
+    """
+
+    handler = PracticumHandler
+    path = '/api/user_api/homework_statuses/'
+
+    def __init__(self, latency: float = 0, error_rate: float = 0,
+                 change_rate: float = None, use_etag: bool = False) -> None:
+        """Заглушка API Практикум без работ."""
+        super().__init__(latency, error_rate)
+        self.homeworks = []
+        self.change_rate = change_rate
+        self.use_etag = use_etag
+        self.generation = 0
+
+    def homeworks_for(self, token: str) -> list:
+        """Список работ для токена в текущем поколении."""
+        if self.change_rate is None:
+            return self.homeworks
+        bucket = zlib.crc32(token.encode()) % 1000
+        changes = bucket < self.change_rate * 1000
+        status = STATUSES[self.generation % 3 if changes else 0]
+        return [{
+            'id': bucket,
+            'homework_name': f'{token}__hw',
+            'status': status,
+        }]
+
+
+class StubTelegram(StubServer):
+    """Стенд Bot API; base_url для telegram.Bot — в свойстве base_url."""
+
+    handler = TelegramHandler
+    path = '/bot'
+    error_payload = {
+        'ok': False, 'error_code': 500, 'description': 'Internal Server Error'
+    }
+
+    def __init__(self, latency: float = 0, error_rate: float = 0) -> None:
+        """Заглушка Telegram без сообщений."""
+        super().__init__(latency, error_rate)
+        self.messages = []
+
+    @property
+    def base_url(self) -> str:
+        """Адрес для параметра base_url у telegram.Bot."""
+        return self.url
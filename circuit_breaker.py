@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+
+from http import HTTPStatus
+from urllib.parse import urlparse
+
+import metrics
+
+from exceptions import CircuitOpenError, DeadlineExceededError
+from exceptions import HTTPStatusError
+
+BREAKER_FAILURES = int(os.getenv('BREAKER_FAILURES', 5))
+BREAKER_RESET = float(os.getenv('BREAKER_RESET', 60))
+BREAKER_PROBES = int(os.getenv('BREAKER_PROBES', 3))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = metrics.REGISTRY.gauge(
+    'homework_bot_circuit_state',
+    'Состояние предохранителя: 0 закрыт, 1 полуоткрыт, 2 открыт',
+    ('endpoint',),
+)
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def is_failure_status(status_code: int) -> bool:
+    """Ответ говорит о сбое сервиса, а не об ошибке конкретного запроса."""
+    return (
+        status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+        or status_code == HTTPStatus.TOO_MANY_REQUESTS
+    )
+
+
+def is_outage(error: Exception) -> bool:
+    """Ошибка вызвана недоступностью API, а не данными студента."""
+    import requests
+
+    if isinstance(error, (CircuitOpenError, DeadlineExceededError,
+                          requests.ConnectionError)):
+        return True
+    return (
+        isinstance(error, HTTPStatusError)
+        and isinstance(error.code, int)
+        and is_failure_status(error.code)
+    )
+
+
+class CircuitBreaker:
+    """Предохранитель для одного эндпоинта, общий для всех студентов.
+
+    После failures ошибок подряд он размыкается, и запросы не уходят в
+    сеть reset_timeout секунд. Затем пропускается до probes пробных
+    запросов: успех замыкает предохранитель, ошибка снова размыкает.
+    """
+
+    def __init__(self, name: str, failures: int = BREAKER_FAILURES,
+                 reset_timeout: float = BREAKER_RESET,
+                 probes: int = BREAKER_PROBES, clock=time.monotonic) -> None:
+        """Замкнутый предохранитель эндпоинта name."""
+        self.name = name
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+        self.clock = clock
+        self.state = CLOSED
+        self.failure_count = 0
+        self._opened_at = 0
+        self._probes_in_flight = 0
+        self._listeners = []
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.set(STATE_CODES[CLOSED], name)
+
+    def add_listener(self, listener) -> None:
+        """Функция listener(breaker, state) вызывается при смене состояния."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener) -> None:
+        """Отписка от смены состояния."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _set_state(self, state: str) -> None:
+        """Смена состояния под блокировкой; слушатели вызываются после."""
+        self.state = state
+        CIRCUIT_STATE.set(STATE_CODES[state], self.name)
+        if state == OPEN:
+            self._opened_at = self.clock()
+        if state != HALF_OPEN:
+            self._probes_in_flight = 0
+
+    def _notify(self, state: str) -> None:
+        """Оповещение слушателей о новом состоянии."""
+        for listener in self._listeners:
+            listener(self, state)
+
+    def allow(self) -> bool:
+        """Можно ли отправить запрос сейчас."""
+        changed = None
+        with self._lock:
+            if self.state == OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._set_state(HALF_OPEN)
+                changed = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self._probes_in_flight >= self.probes:
+                    return False
+                self._probes_in_flight += 1
+        if changed:
+            self._notify(changed)
+        return True
+
+    def release(self) -> None:
+        """Освобождение слота пробы, если запрос завершился без ответа.
+
+        Нужно, когда запрос прерван ошибкой, которая ничего не говорит
+        о сервисе (например, истёк срок операции): иначе занятый слот
+        не освободится и предохранитель не замкнётся.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes_in_flight:
+                self._probes_in_flight -= 1
+
+    def record_success(self) -> None:
+        """Успешный запрос: сброс счётчика, замыкание после пробы."""
+        with self._lock:
+            self.failure_count = 0
+            if self.state == CLOSED:
+                return
+            self._set_state(CLOSED)
+        self._notify(CLOSED)
+
+    def record_failure(self) -> None:
+        """Неудачный запрос: размыкание после порога или неудачной пробы."""
+        with self._lock:
+            self.failure_count += 1
+            if self.state == OPEN:
+                return
+            if self.state == CLOSED and self.failure_count < self.failures:
+                return
+            self._set_state(OPEN)
+        self._notify(OPEN)
+
+    def record_status(self, status_code: int) -> None:
+        """Учёт ответа по его коду."""
+        if is_failure_status(status_code):
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    """Предохранитель для хоста url, один на процесс."""
+    name = urlparse(url).netloc
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def reset_breakers() -> None:
+    """Сброс всех предохранителей."""
+    with _breakers_lock:
+        _breakers.clear()
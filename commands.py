@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+
+from telegram.ext import CommandHandler, Updater
+
+import homework
+
+STATUS_COMMAND = os.getenv('STATUS_COMMAND', '1') == '1'
+STATUS_MAX_AGE = float(os.getenv('STATUS_MAX_AGE', 300))
+COMMAND_WORKERS = 2
+
+NOT_SUBSCRIBED = 'Этот чат не подписан на статусы домашних работ.'
+NO_STATUS = 'Статус ещё не получен.'
+REFRESHING = 'Данные устарели, запрошено обновление: о новом статусе пришлю.'
+
+
+def status_text(tenant, now: float) -> str:
+    """Последний известный статус студента и возраст этих данных."""
+    if tenant.status is None:
+        return NO_STATUS
+    verdict = homework.HOMEWORK_STATUSES.get(tenant.status, tenant.status)
+    if not tenant.polled_at:
+        return f'Последний статус: {verdict}'
+    age = int(max(now - tenant.polled_at, 0) // 60)
+    return f'Последний статус: {verdict} (проверено {age} мин назад)'
+
+
+class StatusCommand:
+    """Команда /status: ответ из памяти движка, без запроса к API.
+
+    Если данные чата старше max_age, движку передаётся запрос на
+    внеочередной опрос. Пока он идёт, повторные команды новых запросов
+    не создают, поэтому поток команд не увеличивает нагрузку на API.
+    """
+
+    def __init__(self, engine, max_age: float = STATUS_MAX_AGE,
+                 clock=time.time) -> None:
+        """Команда по состоянию движка опроса engine."""
+        self.engine = engine
+        self.max_age = max_age
+        self.clock = clock
+        self._chats = {}
+        for tenant in engine.tenants:
+            self._chats.setdefault(str(tenant.chat_id), []).append(tenant)
+
+    def reply(self, chat_id) -> str:
+        """Текст ответа для чата; устаревшие данные ставятся на обновление."""
+        tenants = self._chats.get(str(chat_id))
+        if not tenants:
+            return NOT_SUBSCRIBED
+        now = self.clock()
+        lines = []
+        stale = False
+        for tenant in tenants:
+            lines.append(status_text(tenant, now))
+            if now - tenant.polled_at > self.max_age:
+                stale = True
+                self.engine.request_refresh(tenant)
+        if stale:
+            lines.append(REFRESHING)
+        return '\n'.join(lines)
+
+    def handle(self, update, context) -> None:
+        """Ответ на команду в чат, из которого она пришла."""
+        update.effective_message.reply_text(
+            self.reply(update.effective_chat.id)
+        )
+
+    def handler(self) -> CommandHandler:
+        """Обработчик команды для регистрации в диспетчере."""
+        return CommandHandler('status', self.handle)
+
+
+def start_updater(bot, engine) -> Updater:
+    """Приём команд через getUpdates в фоновых потоках диспетчера."""
+    updater = Updater(bot=bot, workers=COMMAND_WORKERS)
+    updater.dispatcher.add_handler(StatusCommand(engine).handler())
+    updater.start_polling(drop_pending_updates=True)
+    return updater
+
+
+def stop_updater(updater: Updater) -> threading.Thread:
+    """Остановка приёма команд в фоновом потоке.
+
+    Текущий getUpdates может ждать ответа до таймаута long polling,
+    поэтому остановка начинается сразу по сигналу и идёт одновременно
+    с дописыванием очереди сообщений, а не после него.
+    """
+    thread = threading.Thread(
+        target=updater.stop, name='updater-stop', daemon=True
+    )
+    thread.start()
+    return thread
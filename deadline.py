@@ -0,0 +1,68 @@
+import contextlib
+import contextvars
+import math
+import os
+import time
+
+from exceptions import DeadlineExceededError
+
+POLL_DEADLINE = float(os.getenv('POLL_DEADLINE', 30))
+SEND_DEADLINE = float(os.getenv('SEND_DEADLINE', 20))
+CONNECT_TIMEOUT = float(os.getenv('CONNECT_TIMEOUT', 3.05))
+READ_TIMEOUT = float(os.getenv('READ_TIMEOUT', 10))
+
+_current = contextvars.ContextVar('deadline', default=None)
+
+
+class Deadline:
+    """Момент, к которому операция должна завершиться."""
+
+    def __init__(self, seconds: float, clock=time.monotonic) -> None:
+        """Срок через seconds секунд по часам clock."""
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self) -> float:
+        """Сколько секунд осталось (не меньше нуля)."""
+        return max(self.expires_at - self.clock(), 0.0)
+
+
+def current():
+    """Срок текущей операции или None."""
+    return _current.get()
+
+
+def remaining() -> float:
+    """Остаток срока текущей операции; без срока — бесконечность."""
+    deadline = _current.get()
+    return math.inf if deadline is None else deadline.remaining()
+
+
+@contextlib.contextmanager
+def scope(seconds: float, clock=time.monotonic):
+    """Срок для вложенных вызовов; внешний срок сокращает внутренний.
+
+    Срок хранится в contextvars: его видят задачи asyncio, созданные
+    внутри, и вызовы в пуле потоков, если их запускать через
+    contextvars.copy_context().run.
+    """
+    deadline = Deadline(seconds, clock)
+    outer = _current.get()
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def timeouts(connect: float = CONNECT_TIMEOUT,
+             read: float = READ_TIMEOUT) -> tuple:
+    """Таймауты (connect, read) для запроса, не дольше остатка срока."""
+    left = remaining()
+    if left <= 0:
+        raise DeadlineExceededError(
+            msg='Срок операции истёк, запрос не отправлен', code=''
+        )
+    return min(connect, left), min(read, left)
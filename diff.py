@@ -0,0 +1,30 @@
+def homework_key(homework: dict) -> str:
+    """Ключ работы в индексе статусов: id, а если его нет — название."""
+    if 'id' in homework:
+        return str(homework['id'])
+    return homework['homework_name']
+
+
+def diff_homeworks(index: dict, homeworks: list) -> list:
+    """Работы из ответа API, статус которых отличается от индекса.
+
+    Возвращает пары (ключ, работа) от старых к новым (API отдаёт
+    свежие работы первыми). homeworks может быть любым итерируемым,
+    в том числе потоком из stream_parser: в памяти остаются только
+    изменившиеся работы. Индекс не меняется, пока изменения не
+    применены через apply_changes: если уведомление не удалось
+    сформировать, переход будет обработан при следующем опросе.
+    """
+    changes = []
+    for item in homeworks:
+        key = homework_key(item)
+        if index.get(key) != item.get('status'):
+            changes.append((key, item))
+    changes.reverse()
+    return changes
+
+
+def apply_changes(index: dict, changes: list) -> None:
+    """Запись новых статусов изменившихся работ в индекс."""
+    for key, item in changes:
+        index[key] = item.get('status')
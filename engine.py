@@ -0,0 +1,559 @@
+import asyncio
+import contextvars
+import json
+import os
+import time
+
+from operator import attrgetter
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import circuit_breaker
+import deadline
+import diff
+import homework
+import http_client
+import metrics
+import profiling
+import response_cache
+import validation
+
+from homework_index import HomeworkIndex
+from scheduler import POLL_BUDGET, PollScheduler
+from send_queue import PRIORITY_ERROR, SendQueue, message_priority
+from sharding import LEASE_TTL, ring_key, tenant_key
+from single_flight import SingleFlight
+from storage import STATE_FLUSH_INTERVAL, message_hash
+
+POLL_CONCURRENCY = int(os.getenv('POLL_CONCURRENCY', 100))
+SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', 20))
+
+
+@dataclass
+class Tenant:
+    """Студент: токен Практикума, чат Telegram и состояние опроса."""
+
+    token: str
+    chat_id: str
+    timestamp: int = 0
+    message_hash: str = ''
+    status: str = None
+    status_changed_at: float = 0
+    statuses: dict = field(default_factory=dict)
+    next_poll_at: float = 0
+    polled_at: float = 0
+    answer_digest: bytes = None
+
+    def __post_init__(self) -> None:
+        """Статусы из словаря переводятся в HomeworkIndex."""
+        if not isinstance(self.statuses, HomeworkIndex):
+            self.statuses = HomeworkIndex.from_dict(self.statuses)
+
+
+@dataclass
+class Answer:
+    """Ответ API по токену, общий для всех подписок на этот токен."""
+
+    response: dict
+    homeworks: list = None
+    messages: dict = field(default_factory=dict)
+    digest: bytes = None
+
+    def valid_homeworks(self) -> list:
+        """Работы ответа; проверяются один раз на все подписки.
+
+        Некорректные работы отбрасываются одним проходом по списку
+        и не мешают уведомлениям об остальных.
+        """
+        if self.homeworks is None:
+            with profiling.stage('validation'):
+                self.homeworks = validation.validate_homeworks(
+                    homework.check_response(self.response)
+                )
+        return self.homeworks
+
+    def message(self, key: str, item: dict) -> tuple:
+        """Уведомление о работе; разбирается один раз на все подписки."""
+        message = self.messages.get(key)
+        if message is None:
+            message = self.messages[key] = (
+                homework.parse_status(item),
+                message_priority(item.get('status')),
+            )
+        return message
+
+
+def cached_answer(token: str, response) -> tuple:
+    """Ответ API и хеш его тела; неизменный ответ берётся из кеша.
+
+    Хеш известен, только если ответ лежит в кеше: свежий ответ мог
+    быть вытеснен из кеша параллельным запросом по тому же токену.
+    """
+    cache = response_cache.get_cache()
+    entry = cache.entry(token) if cache is not None else None
+    if entry is None:
+        return response, None
+    if response is not None and entry.payload is not response:
+        return response, None
+    return entry.payload, entry.digest
+
+
+def record_chats(record: dict) -> list:
+    """Чаты подписки из записи TENANTS_FILE: chat_id и/или chat_ids."""
+    chats = list(record.get('chat_ids') or ())
+    if record.get('chat_id') is not None:
+        chats.insert(0, record['chat_id'])
+    return list(dict.fromkeys(chats))
+
+
+def load_tenants() -> list:
+    """Загрузка списка студентов из TENANTS_FILE или переменных окружения.
+
+    Запись с chat_ids (студент, наставник, группа) разворачивается в
+    подписку на каждый чат: токен опрашивается один раз, а уведомление
+    рассылается во все чаты параллельно воркерами очереди отправки.
+    """
+    if not homework.TENANTS_FILE:
+        return [Tenant(
+            token=homework.PRACTICUM_TOKEN,
+            chat_id=homework.TELEGRAM_CHAT_ID,
+            timestamp=int(time.time()),
+        )]
+    with open(homework.TENANTS_FILE, encoding='utf-8') as file:
+        records = json.load(file)
+    now = int(time.time())
+    return [
+        Tenant(
+            token=record['practicum_token'],
+            chat_id=chat_id,
+            timestamp=record.get('from_date', now),
+        )
+        for record in records
+        for chat_id in record_chats(record)
+    ]
+
+
+class PollingEngine:
+    """Асинхронный опрос API Практикум.Домашка для многих студентов."""
+
+    def __init__(self, bot, tenants: list,
+                 concurrency: int = POLL_CONCURRENCY, store=None,
+                 shard=None, history=None) -> None:
+        """Движок для студентов tenants; состояние берётся из store."""
+        self.bot = bot
+        self.tenants = tenants
+        self.concurrency = concurrency
+        self.store = store
+        self.history = history
+        self.shard = shard
+        if store is not None:
+            restored = store.restore(tenants)
+            homework.logger.info('Восстановлено состояние: %s', restored)
+        if shard is None:
+            self.scheduler = PollScheduler(tenants)
+        else:
+            self.scheduler = PollScheduler()
+        self._shard_keys = (
+            {tenant_key(tenant): tenant for tenant in tenants}
+            if shard is not None else {}
+        )
+        self._placement = {
+            key: ring_key(tenant) for key, tenant in self._shard_keys.items()
+        }
+        self._by_token = {}
+        for tenant in tenants:
+            self._by_token.setdefault(tenant.token, []).append(tenant)
+        self._flights = SingleFlight()
+        self._in_flight = set()
+        self.sender = SendQueue(bot)
+        self._dirty = {}
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._semaphore = None
+        self._stopping = None
+        self._loop = None
+        self._breaker = None
+        self._outage = False
+        self._refreshing = set()
+        self._stop_callbacks = []
+
+    async def _call(self, func, *args):
+        """Выполнение блокирующего вызова в пуле потоков.
+
+        Вызов получает контекст задачи, в том числе срок опроса
+        и замеры этапов (profiling).
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, context.run, profiling.run, func, *args
+        )
+
+    def _notify(self, tenant: Tenant, message: str, priority: int) -> None:
+        """Отправка сообщения студенту, если оно отличается от прошлого."""
+        digest = message_hash(message)
+        if tenant.message_hash == digest:
+            homework.logger.debug('Статус не изменился')
+            return
+        self.sender.put(tenant.chat_id, message, priority)
+        tenant.message_hash = digest
+
+    @staticmethod
+    def _track_status(tenant: Tenant, latest) -> None:
+        """Запоминание статуса последней работы и времени его смены."""
+        if latest is None:
+            return
+        status = latest.get('status')
+        if status != tenant.status:
+            tenant.status = status
+            tenant.status_changed_at = time.time()
+
+    @staticmethod
+    def _stream_changes(tenant: Tenant) -> tuple:
+        """Потоковый запрос к API и поиск изменившихся работ."""
+        stream = homework.get_token_api_stream(tenant.token, tenant.timestamp)
+        homeworks = validation.ValidHomeworks(stream)
+        with profiling.stage('json'):
+            changes = diff.diff_homeworks(tenant.statuses, homeworks)
+        return Answer(stream.response), homeworks.first, changes
+
+    async def _fetch_answer(self, token: str, timestamp: int):
+        """Запрос к API по токену.
+
+        Если ответ не изменился с прошлого запроса по токену, берётся
+        закешированный: кеш общий для подписок на токен, а подписка,
+        опрошенная отдельно, могла ещё не разобрать этот ответ.
+        """
+        response = await self._call(
+            homework.get_token_api_answer, token, timestamp
+        )
+        response, digest = cached_answer(token, response)
+        if response is None:
+            return None
+        return Answer(response, digest=digest)
+
+    async def _fetch_changes(self, tenant: Tenant):
+        """Ответ API, самая свежая работа и изменения; None — без изменений.
+
+        Одновременные опросы подписок на один токен делят один запрос,
+        если его from_date не позже собственного: такой ответ включает
+        все работы, нужные подписке. Потоковый режим запросы не делит.
+        Ответ, уже разобранный подпиской, повторно не сравнивается.
+        """
+        if homework.STREAM_RESPONSES:
+            return await self._call(self._stream_changes, tenant)
+        answer = await self._flights.do(
+            tenant.token, self._fetch_answer, tenant.token, tenant.timestamp,
+            accept=lambda args: args[1] <= tenant.timestamp,
+        )
+        if answer is None or (
+            answer.digest is not None and answer.digest == tenant.answer_digest
+        ):
+            return None
+        homeworks = answer.valid_homeworks()
+        changes = diff.diff_homeworks(tenant.statuses, homeworks)
+        latest = homeworks[0] if homeworks else None
+        return answer, latest, changes
+
+    async def poll(self, tenant: Tenant) -> None:
+        """Один цикл опроса API для одного студента.
+
+        Опрос дольше SLOW_POLL выводит в журнал время по этапам.
+        """
+        started = time.perf_counter()
+        try:
+            with profiling.poll(f'chat{tenant.chat_id}'):
+                await self._poll(tenant)
+        finally:
+            metrics.POLL_SECONDS.observe(time.perf_counter() - started)
+
+    async def _poll(self, tenant: Tenant) -> None:
+        """Опрос API, поиск изменений и постановка уведомлений в очередь.
+
+        Срок POLL_DEADLINE отсчитывается с получения слота: из его остатка
+        берутся таймауты запросов и паузы повторов.
+        """
+        async with self._semaphore:
+            try:
+                with deadline.scope(deadline.POLL_DEADLINE):
+                    fetched = await self._fetch_changes(tenant)
+                tenant.polled_at = time.time()
+                if fetched is None:
+                    return
+                answer, latest, changes = fetched
+                messages = [answer.message(key, item) for key, item in changes]
+                self._record_transitions(tenant, changes)
+                diff.apply_changes(tenant.statuses, changes)
+                tenant.answer_digest = answer.digest
+                tenant.timestamp = answer.response.get(
+                    'current_date', tenant.timestamp
+                )
+                self._track_status(tenant, latest)
+            except Exception as error:
+                if circuit_breaker.is_outage(error):
+                    homework.logger.warning('API недоступен: %s', error)
+                    return
+                message = f'Сбой в работе программы: {error}'
+                homework.logger.error('Сбой в работе программы: %s', error)
+                messages = [(message, PRIORITY_ERROR)]
+            for message, priority in messages:
+                self._notify(tenant, message, priority)
+            self._dirty[tenant.token, tenant.chat_id] = tenant
+
+    def _record_transitions(self, tenant: Tenant, changes: list) -> None:
+        """Запись переходов статусов в журнал до обновления индекса."""
+        if self.history is None:
+            return
+        for key, item in changes:
+            self.history.record(
+                tenant.token, key, tenant.statuses.get(key), item
+            )
+
+    def request_refresh(self, tenant: Tenant) -> None:
+        """Внеочередной опрос студента; можно вызывать из любого потока."""
+        if self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._refresh, tenant)
+        except RuntimeError:
+            homework.logger.debug('Цикл опроса остановлен')
+
+    def _refresh(self, tenant: Tenant) -> None:
+        """Запуск внеочередного опроса, если он ещё не идёт."""
+        key = tenant.token, tenant.chat_id
+        if key in self._refreshing or not self._owns(tenant):
+            return
+        self._refreshing.add(key)
+        task = asyncio.create_task(self.poll(tenant))
+        task.add_done_callback(lambda _: self._refreshing.discard(key))
+
+    def _on_breaker(self, breaker, state: str) -> None:
+        """Смена состояния предохранителя API (из любого потока)."""
+        self._loop.call_soon_threadsafe(self._outage_notice, breaker, state)
+
+    def _outage_notice(self, breaker, state: str) -> None:
+        """Одно общее уведомление о недоступности API вместо сбоя у каждого."""
+        if state == circuit_breaker.OPEN and not self._outage:
+            self._outage = True
+            message = (
+                f'API Практикум недоступен ({breaker.name}): '
+                f'опрос приостановлен после {breaker.failure_count} ошибок'
+            )
+        elif state == circuit_breaker.CLOSED and self._outage:
+            self._outage = False
+            message = 'API Практикум снова доступен, опрос возобновлён'
+        else:
+            return
+        homework.logger.warning(message)
+        if homework.ADMIN_CHAT_ID:
+            self.sender.put(homework.ADMIN_CHAT_ID, message, PRIORITY_ERROR)
+
+    def _start(self) -> None:
+        """Подготовка к опросу в текущем цикле событий."""
+        self._loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._stopping = asyncio.Event()
+        self._breaker = circuit_breaker.get_breaker(homework.ENDPOINT)
+        self._breaker.add_listener(self._on_breaker)
+        self.sender.start()
+
+    async def _stop(self) -> None:
+        """Остановка отправки и отписка от предохранителя."""
+        await self.sender.stop()
+        self._breaker.remove_listener(self._on_breaker)
+
+    async def run_cycle(self) -> None:
+        """Опрос всех студентов с ограничением числа одновременных запросов."""
+        self._start()
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(
+                *(self.poll(tenant) for tenant in self.tenants
+                  if self._owns(tenant))
+            )
+            await self.sender.join()
+        finally:
+            metrics.CYCLE_SECONDS.observe(time.perf_counter() - started)
+            await self._stop()
+            profiling.memory_report()
+
+    def _owns(self, tenant: Tenant) -> bool:
+        """Опрашивает ли студента этот воркер."""
+        return self.shard is None or self.shard.owns(tenant_key(tenant))
+
+    def _poll_key(self, tenant: Tenant):
+        """Ключ студента в наборе идущих опросов."""
+        return tenant_key(tenant) if self.shard is not None else id(tenant)
+
+    async def _poll_and_reschedule(self, tenant: Tenant) -> None:
+        """Опрос студента вместе с подписками на тот же токен.
+
+        Подписки опрашиваются одновременно, начиная с самого раннего
+        from_date, поэтому делят один запрос к API, а после него у всех
+        одинаковый from_date и общее расписание. Студент, аренда которого
+        истекла, но по кольцу остаётся у воркера, не выпадает из
+        расписания: аренду продлит следующий rebalance.
+        """
+        if not self._owns(tenant) and self.shard.wants(tenant_key(tenant)):
+            self.scheduler.reschedule(tenant)
+        group = sorted(
+            (
+                subscription for subscription in self._by_token[tenant.token]
+                if self._owns(subscription)
+                and self._poll_key(subscription) not in self._in_flight
+            ),
+            key=attrgetter('timestamp'),
+        )
+        await asyncio.gather(
+            *(self._poll_scheduled(subscription) for subscription in group)
+        )
+
+    async def _poll_scheduled(self, tenant: Tenant) -> None:
+        """Опрос студента и планирование следующего опроса."""
+        metrics.POLL_LAG_SECONDS.observe(
+            max(time.monotonic() - tenant.next_poll_at, 0)
+        )
+        key = self._poll_key(tenant)
+        self._in_flight.add(key)
+        try:
+            await self.poll(tenant)
+        finally:
+            self._in_flight.discard(key)
+            self.scheduler.reschedule(tenant)
+
+    def rebalance(self) -> None:
+        """Пересчёт доли студентов этого воркера при шардировании.
+
+        Состояние сохраняется до освобождения аренды, а новые студенты
+        загружаются из хранилища после её захвата: новый владелец
+        продолжает с того же from_date и не повторяет уведомления.
+        """
+        shard = self.shard
+        shard.assign(self._placement)
+        self.flush_state()
+        lost = shard.release(busy=self._in_flight)
+        gained = [self._shard_keys[key] for key in shard.acquire()]
+        self.scheduler.set_budget(POLL_BUDGET / max(len(shard.members), 1))
+        if lost or gained:
+            homework.logger.info(
+                'Шард %s: +%s -%s, всего %s из %s', shard.worker_id,
+                len(gained), len(lost), len(shard.owned), len(self.tenants),
+            )
+        if self.store is not None and gained:
+            self.store.restore(gained)
+        now = time.monotonic()
+        for tenant in gained:
+            self.scheduler.schedule(tenant, now)
+
+    def flush_state(self) -> None:
+        """Сохранение изменившихся состояний студентов в хранилище."""
+        if self.history is not None:
+            self.history.flush()
+        if self.store is None or not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, {}
+        self.store.save(dirty.values())
+
+    def _log_pool_stats(self) -> None:
+        """Периодический вывод статистики пула соединений и кеша."""
+        session = http_client.get_session()
+        if session is not None:
+            homework.logger.info('Пул соединений: %s', session.stats())
+        cache = response_cache.get_cache()
+        if cache is not None:
+            homework.logger.info('Кеш ответов API: %s', cache.stats())
+        homework.logger.info('Очередь отправки: %s', self.sender.stats())
+        homework.logger.info('Общие запросы: %s', self._flights.stats())
+        profiling.memory_report()
+        if self.history is not None:
+            homework.logger.info(
+                'Проверки за неделю: %s', self.history.stats()
+            )
+        self.sender.prune()
+
+    def stop(self) -> None:
+        """Остановка опроса: новые опросы не начинаются, очередь дописывается.
+
+        Подходит как обработчик сигнала в цикле событий.
+        """
+        homework.logger.info('Остановка: завершаются начатые опросы')
+        self._stopping.set()
+        callbacks, self._stop_callbacks = self._stop_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_stop(self, callback) -> None:
+        """Вызов callback по stop(), до дописывания очереди сообщений."""
+        self._stop_callbacks.append(callback)
+
+    async def _sleep(self, seconds: float) -> None:
+        """Ожидание, которое прерывается вызовом stop()."""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _drain(self, tasks: set) -> None:
+        """Завершение начатых опросов и отправок не дольше SHUTDOWN_TIMEOUT."""
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=SHUTDOWN_TIMEOUT)
+            for task in pending:
+                task.cancel()
+        try:
+            await asyncio.wait_for(
+                self.sender.join(), max(deadline - time.monotonic(), 0)
+            )
+        except asyncio.TimeoutError:
+            homework.logger.warning(
+                'Не отправлено сообщений при остановке: %s',
+                self.sender.depth(),
+            )
+
+    def _start_due(self, tasks: set) -> None:
+        """Запуск опроса студентов, чей срок подошёл."""
+        for tenant in self.scheduler.due():
+            task = asyncio.create_task(self._poll_and_reschedule(tenant))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    async def run(self, signals=()) -> None:
+        """Опрос студентов по расписанию планировщика до вызова stop().
+
+        По сигналам из signals (SIGTERM при перезапуске dyno) опрос
+        останавливается, а отправка сообщений из очереди завершается.
+        """
+        self._start()
+        loop = asyncio.get_running_loop()
+        for signum in signals:
+            loop.add_signal_handler(signum, self.stop)
+        metrics.TENANTS_BEHIND.set_function(self.scheduler.overdue)
+        metrics.SEND_QUEUE_DEPTH.set_function(self.sender.depth)
+        tasks = set()
+        stats_at = time.monotonic() + homework.RETRY_TIME
+        flush_at = time.monotonic() + STATE_FLUSH_INTERVAL
+        rebalance_at = time.monotonic()
+        try:
+            while not self._stopping.is_set():
+                if self.shard is not None and (
+                    time.monotonic() >= rebalance_at
+                ):
+                    self.rebalance()
+                    rebalance_at = time.monotonic() + LEASE_TTL / 3
+                self._start_due(tasks)
+                if time.monotonic() >= stats_at:
+                    self._log_pool_stats()
+                    stats_at += homework.RETRY_TIME
+                if time.monotonic() >= flush_at:
+                    self.flush_state()
+                    flush_at = time.monotonic() + STATE_FLUSH_INTERVAL
+                await self._sleep(min(self.scheduler.wait_time(), 1))
+            await self._drain(tasks)
+        finally:
+            for signum in signals:
+                loop.remove_signal_handler(signum)
+            await self._stop()
+            self.flush_state()
+            if self.shard is not None:
+                self.shard.leave()
+            self._executor.shutdown(wait=False)
@@ -16,4 +16,12 @@ class CheckTokenError(BaseError):
     pass
 
 class NoHomeworkStatusInResponse(BaseError):
-    pass
\ No newline at end of file
+    pass
+
+
+class CircuitOpenError(BaseError):
+    pass
+
+
+class DeadlineExceededError(BaseError):
+    pass
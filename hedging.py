@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import deadline
+import metrics
+
+from retry import RetryBudget
+from send_queue import percentile
+
+HEDGE_REQUESTS = os.getenv('HEDGE_REQUESTS', '') == '1'
+HEDGE_QUANTILE = float(os.getenv('HEDGE_QUANTILE', 0.95))
+HEDGE_RATIO = float(os.getenv('HEDGE_RATIO', 0.05))
+HEDGE_WORKERS = int(os.getenv('HEDGE_WORKERS', 200))
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 1000
+RECOMPUTE_EVERY = 50
+
+HEDGED = metrics.REGISTRY.counter(
+    'homework_bot_hedged_requests_total',
+    'Дублирующие запросы: отправленные и ответившие первыми',
+    ('outcome',),
+)
+
+_hedger = None
+_hedger_lock = threading.Lock()
+
+
+class LatencyTracker:
+    """Скользящее окно времени ответа и его квантиль.
+
+    Квантиль пересчитывается раз в RECOMPUTE_EVERY замеров, а не на
+    каждый запрос: сортировка окна дороже самого замера.
+    """
+
+    def __init__(self, quantile: float = HEDGE_QUANTILE,
+                 window: int = LATENCY_WINDOW) -> None:
+        """Пустое окно из window замеров."""
+        self.quantile = quantile
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._since = 0
+        self.value = None
+
+    def observe(self, seconds: float) -> None:
+        """Учёт времени одного ответа."""
+        with self._lock:
+            self._samples.append(seconds)
+            self._since += 1
+            if len(self._samples) < HEDGE_MIN_SAMPLES:
+                return
+            if self.value is None or self._since >= RECOMPUTE_EVERY:
+                self.value = percentile(self._samples, self.quantile)
+                self._since = 0
+
+
+def _close(future) -> None:
+    """Закрытие ответа, который уже не нужен."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    close = getattr(future.result(), 'close', None)
+    if close is not None:
+        close()
+
+
+class Hedger:
+    """Дублирующий запрос, если первый отвечает дольше обычного.
+
+    Запрос уходит в пул; если за квантиль времени ответа (p95) он не
+    завершился, отправляется второй такой же, и берётся первый успешный
+    ответ. Второй ответ закрывается. Дубли ограничены бюджетом HEDGE_RATIO
+    от числа запросов. Подходит только для идемпотентных запросов (GET).
+    """
+
+    def __init__(self, workers: int = HEDGE_WORKERS,
+                 budget: RetryBudget = None) -> None:
+        """Пул дублирующих запросов на workers потоков."""
+        self.latency = LatencyTracker()
+        self.budget = budget or RetryBudget(HEDGE_RATIO, min_rate=0)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='hedge'
+        )
+
+    def _timed(self, func, args, kwargs):
+        """Вызов с учётом времени успешного ответа."""
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.latency.observe(time.perf_counter() - started)
+        return result
+
+    def call(self, func, *args, **kwargs):
+        """func(*args, **kwargs) с дублем после p95 ожидания."""
+        threshold = self.latency.value
+        self.budget.deposit()
+        if threshold is None or threshold >= deadline.remaining():
+            return self._timed(func, args, kwargs)
+        first = self._executor.submit(self._timed, func, args, kwargs)
+        done, _ = wait([first], timeout=threshold)
+        if done or not self.budget.withdraw():
+            return first.result()
+        HEDGED.inc('fired')
+        second = self._executor.submit(self._timed, func, args, kwargs)
+        return self._first_success(first, second)
+
+    @staticmethod
+    def _first_success(first, second):
+        """Первый успешный из двух ответов; второй закрывается."""
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.add_done_callback(_close)
+                    if future is second:
+                        HEDGED.inc('won')
+                    return future.result()
+        return first.result()
+
+    def close(self) -> None:
+        """Остановка пула без ожидания зависших запросов."""
+        self._executor.shutdown(wait=False)
+
+
+def get_hedger():
+    """Общий Hedger или None, если дублирование выключено."""
+    global _hedger
+    if not HEDGE_REQUESTS:
+        return None
+    with _hedger_lock:
+        if _hedger is None:
+            _hedger = Hedger()
+        return _hedger
@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from sketch import QuantileSketch
+from storage import STATE_DB
+
+HISTORY_DB = os.getenv('HISTORY_DB', STATE_DB)
+REVIEWING = 'reviewing'
+VERDICTS = ('approved', 'rejected')
+ALL_TIME = 'all'
+RECENT_EVENTS = 10000
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS transitions (
+    at REAL NOT NULL,
+    token TEXT NOT NULL,
+    homework TEXT NOT NULL,
+    old_status TEXT,
+    new_status TEXT
+);
+CREATE INDEX IF NOT EXISTS transitions_at ON transitions (at);
+CREATE TABLE IF NOT EXISTS transition_stats (
+    period TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS open_reviews (
+    token TEXT NOT NULL,
+    homework TEXT NOT NULL,
+    since REAL NOT NULL,
+    PRIMARY KEY (token, homework)
+) WITHOUT ROWID;
+'''
+
+UPSERT_STATS = '''
+INSERT INTO transition_stats (period, data) VALUES (?, ?)
+ON CONFLICT (period) DO UPDATE SET data = excluded.data
+'''
+
+UPSERT_REVIEW = '''
+INSERT INTO open_reviews (token, homework, since) VALUES (?, ?, ?)
+ON CONFLICT (token, homework) DO UPDATE SET since = excluded.since
+'''
+
+
+def token_hash(token: str) -> str:
+    """Обезличенный идентификатор токена для журнала переходов."""
+    return hashlib.blake2b(token.encode(), digest_size=8).hexdigest()
+
+
+def period_of(at: float) -> str:
+    """Неделя ISO ('2024-W07'), к которой относится момент at."""
+    year, week, _ = datetime.fromtimestamp(at, timezone.utc).isocalendar()
+    return f'{year}-W{week:02d}'
+
+
+def event_time(item: dict, default: float) -> float:
+    """Момент перехода: date_updated работы или default."""
+    value = item.get('date_updated')
+    if not isinstance(value, str):
+        return default
+    try:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return default
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class PeriodStats:
+    """Агрегаты переходов за период: вердикты и время проверки."""
+
+    __slots__ = ('verdicts', 'review')
+
+    def __init__(self) -> None:
+        """Пустые агрегаты периода."""
+        self.verdicts = dict.fromkeys(VERDICTS, 0)
+        self.review = QuantileSketch()
+
+    def to_json(self) -> str:
+        """Состояние для таблицы transition_stats."""
+        return json.dumps(
+            {'verdicts': self.verdicts, 'review': self.review.to_dict()}
+        )
+
+    @classmethod
+    def from_json(cls, data: str) -> 'PeriodStats':
+        """Агрегаты из строки таблицы transition_stats."""
+        decoded = json.loads(data)
+        stats = cls()
+        stats.verdicts.update(decoded['verdicts'])
+        stats.review = QuantileSketch.from_dict(decoded['review'])
+        return stats
+
+
+class TransitionHistory:
+    """Журнал переходов статусов работ и агрегаты по неделям.
+
+    Каждый переход дописывается в таблицу transitions (индекс по времени)
+    и сразу учитывается в агрегатах своей недели и за всё время: число
+    принятых и возвращённых работ и набросок квантилей времени в статусе
+    reviewing. Поэтому запросы вроде «p90 времени проверки за неделю»
+    читают готовый агрегат и не перебирают журнал. Запись в базу идёт
+    пачкой в flush() вместе с сохранением состояния студентов.
+    """
+
+    def __init__(self, path: str = HISTORY_DB, clock=time.time) -> None:
+        """Подключение к базе path и загрузка агрегатов."""
+        self.clock = clock
+        self._connection = sqlite3.connect(path)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._periods = {
+            period: PeriodStats.from_json(data)
+            for period, data in self._connection.execute(
+                'SELECT period, data FROM transition_stats'
+            )
+        }
+        self._reviewing = {
+            (token, key): since
+            for token, key, since in self._connection.execute(
+                'SELECT token, homework, since FROM open_reviews'
+            )
+        }
+        self._recent = OrderedDict()
+        self._events = []
+        self._dirty_periods = set()
+        self._dirty_reviews = set()
+
+    def record(self, token: str, key: str, old_status, item: dict) -> bool:
+        """Учёт перехода работы key из old_status в статус item.
+
+        Переход, замеченный несколькими подписками на токен, учитывается
+        один раз: для недавних работ помнится последний записанный статус,
+        и повтор того же статуса не записывается (возвращается False).
+        """
+        owner = token_hash(token)
+        status = item.get('status')
+        at = event_time(item, self.clock())
+        homework = (owner, key)
+        with self._lock:
+            if homework in self._recent and self._recent[homework] == status:
+                return False
+            self._recent[homework] = status
+            self._recent.move_to_end(homework)
+            if len(self._recent) > RECENT_EVENTS:
+                self._recent.popitem(last=False)
+            self._events.append((at, owner, key, old_status, status))
+            self._aggregate(owner, key, status, at)
+        return True
+
+    def _aggregate(self, owner: str, key: str, status, at: float) -> None:
+        """Обновление агрегатов одним переходом за O(1)."""
+        review = (owner, key)
+        since = self._reviewing.pop(review, None)
+        if since is not None or status == REVIEWING:
+            self._dirty_reviews.add(review)
+        if status == REVIEWING:
+            self._reviewing[review] = at
+            return
+        if status not in VERDICTS:
+            return
+        for period in (period_of(at), ALL_TIME):
+            stats = self._periods.get(period)
+            if stats is None:
+                stats = self._periods[period] = PeriodStats()
+            stats.verdicts[status] += 1
+            if since is not None:
+                stats.review.add(max(at - since, 0.0))
+            self._dirty_periods.add(period)
+
+    def _stats(self, period):
+        """Агрегаты периода; None — текущая неделя."""
+        if period is None:
+            period = period_of(self.clock())
+        return self._periods.get(period)
+
+    def review_time(self, fraction: float, period: str = None):
+        """Квантиль времени проверки в секундах или None, если данных нет."""
+        with self._lock:
+            stats = self._stats(period)
+            return None if stats is None else stats.review.quantile(fraction)
+
+    def verdicts(self, period: str = None) -> dict:
+        """Число принятых и возвращённых работ за период."""
+        with self._lock:
+            stats = self._stats(period)
+            if stats is None:
+                return dict.fromkeys(VERDICTS, 0)
+            return dict(stats.verdicts)
+
+    def events(self, since: float, until: float = None) -> list:
+        """Сохранённые переходы за интервал [since, until) по времени."""
+        until = self.clock() if until is None else until
+        return self._connection.execute(
+            'SELECT at, token, homework, old_status, new_status '
+            'FROM transitions WHERE at >= ? AND at < ? ORDER BY at',
+            (since, until),
+        ).fetchall()
+
+    def stats(self) -> dict:
+        """Сводка за текущую неделю для журнала работы."""
+        return {
+            'verdicts': self.verdicts(),
+            'review_p50': self.review_time(0.5),
+            'review_p90': self.review_time(0.9),
+        }
+
+    def flush(self) -> None:
+        """Запись новых переходов и изменённых агрегатов одной транзакцией."""
+        with self._lock:
+            events, self._events = self._events, []
+            stats = [
+                (period, self._periods[period].to_json())
+                for period in self._dirty_periods
+            ]
+            reviews = [
+                (review, self._reviewing.get(review))
+                for review in self._dirty_reviews
+            ]
+            self._dirty_periods = set()
+            self._dirty_reviews = set()
+        if not (events or stats or reviews):
+            return
+        with self._connection:
+            self._connection.executemany(
+                'INSERT INTO transitions VALUES (?, ?, ?, ?, ?)', events
+            )
+            self._connection.executemany(UPSERT_STATS, stats)
+            self._connection.executemany(UPSERT_REVIEW, [
+                (*review, since) for review, since in reviews
+                if since is not None
+            ])
+            self._connection.executemany(
+                'DELETE FROM open_reviews WHERE token = ? AND homework = ?',
+                [review for review, since in reviews if since is None],
+            )
+
+    def close(self) -> None:
+        """Запись несохранённых переходов и закрытие соединения."""
+        self.flush()
+        self._connection.close()
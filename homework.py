@@ -1,28 +1,36 @@
 import logging
 import os
-import requests
 import sys
-import telegram
 import time
 
 from dotenv import load_dotenv
+from functools import partial
 from http import HTTPStatus
-from telegram import TelegramError
+
+import circuit_breaker
+import log_pipeline
+import metrics
+import profiling
+import response_cache
 
 from exceptions import APIResponseError, CheckTokenError, HTTPStatusError
-from exceptions import NoHomeworkStatusInResponse
+from exceptions import CircuitOpenError, NoHomeworkStatusInResponse
 
 load_dotenv()
 
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+ADMIN_CHAT_ID = os.getenv('ADMIN_CHAT_ID', TELEGRAM_CHAT_ID)
+
+TENANTS_FILE = os.getenv('TENANTS_FILE')
 
 TOKEN_NAMES = ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID')
 
 RETRY_TIME = 600
+STREAM_RESPONSES = os.getenv('STREAM_RESPONSES', '') == '1'
+STREAM_CHUNK_SIZE = 64 * 1024
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
-HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
 HOMEWORK_STATUSES = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -30,53 +38,188 @@ HOMEWORK_STATUSES = {
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
-formatter = logging.Formatter(
-    '%(asctime)s [%(levelname)s] %(message)s'
-)
-
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
-stream_handler = logging.StreamHandler(sys.stdout)
-stream_handler.setFormatter(formatter)
-logger.addHandler(stream_handler)
+log_pipeline.setup_logging(logger, sys.stdout)
 
 
 def send_message(bot, message) -> None:
     """Отправка сообщения пользователю."""
+    send_chat_message(bot, TELEGRAM_CHAT_ID, message)
+
+
+@metrics.timed('send_message')
+def send_chat_message(bot, chat_id, message) -> bool:
+    """Отправка сообщения в указанный чат; True, если оно доставлено.
+
+    Сетевые ошибки и RetryAfter от Telegram повторяются (retry),
+    пока не истечёт срок отправки SEND_DEADLINE; таймаут ответа
+    не повторяется, чтобы не отправить сообщение дважды.
+    """
+    import deadline
+    import retry
+    from telegram import TelegramError
+
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
-        logger.info(f'Сообщение отправлено в Телеграмм: {message}')
-    except TelegramError:
-        logger.error(f'Не удалось отправить в Telegram сообщение: {message}')
+        with deadline.scope(deadline.SEND_DEADLINE):
+            retry.call(
+                retry.TELEGRAM_HOST, _send_once, bot, chat_id, message,
+                should_retry=retry.telegram_delay,
+            )
+    except TelegramError as error:
+        metrics.EXCEPTIONS.inc(type(error).__name__)
+        logger.error('Не удалось отправить в Telegram сообщение: %s', message)
+        return False
+    logger.info('Сообщение отправлено в Телеграмм: %s', message)
+    return True
+
+
+def _send_once(bot, chat_id, message):
+    """Одна попытка отправки с таймаутом чтения из остатка срока."""
+    import deadline
+
+    _, read_timeout = deadline.timeouts()
+    return bot.send_message(chat_id, message, timeout=read_timeout)
+
 
+def get_headers(token: str) -> dict:
+    """Заголовки авторизации для токена Практикум.Домашка."""
+    return {'Authorization': f'OAuth {token}'}
 
-def get_api_answer(current_timestamp: int) -> int:
+
+def get_api_answer(current_timestamp: int) -> dict:
     """Запрос к API Практикум.Домашка."""
+    response = get_token_api_answer(PRACTICUM_TOKEN, current_timestamp)
+    if response is None:
+        return response_cache.get_cache().payload(PRACTICUM_TOKEN)
+    return response
+
+
+def request_api(headers: dict, current_timestamp: int, **kwargs):
+    """GET-запрос к эндпоинту статусов домашних работ.
+
+    Ответы 429/5xx и ошибки соединения повторяются с паузой (retry).
+    Пока предохранитель эндпоинта разомкнут, запрос в сеть не уходит.
+    """
+    import retry
+
     timestamp = current_timestamp or int(time.time())
     params = {'from_date': timestamp}
+    breaker = circuit_breaker.get_breaker(ENDPOINT)
+    return retry.call(
+        breaker.name, _request_once, breaker, headers, params, kwargs,
+        should_retry=lambda response, error: (
+            None if breaker.state == circuit_breaker.OPEN
+            else retry.http_delay(response, error)
+        ),
+    )
+
+
+def _request_once(breaker, headers: dict, params: dict, kwargs: dict):
+    """Одна попытка запроса с учётом ответа в предохранителе.
+
+    Таймауты соединения и чтения берутся из остатка срока опроса
+    (deadline); при HEDGE_REQUESTS=1 медленный запрос дублируется.
+    """
+    import deadline
+    import hedging
+    import http_client
+    import requests
+
+    timeout = deadline.timeouts()
+    if not breaker.allow():
+        raise CircuitOpenError(
+            msg='API Практикум недоступен, запрос пропущен', code=''
+        )
+    client = http_client.get_session() or requests
+    hedger = hedging.get_hedger()
+    get = client.get if hedger is None else partial(hedger.call, client.get)
     try:
-        response = requests.get(ENDPOINT, headers=HEADERS, params=params)
+        with profiling.stage('http'):
+            response = get(
+                ENDPOINT, headers=headers, params=params, timeout=timeout,
+                **kwargs
+            )
     except requests.RequestException as exc:
-        logger.error(f'Ошибка {exc}')
+        breaker.record_failure()
+        logger.error('Ошибка %s', exc)
         raise requests.ConnectionError('Ошибка подключения к API Практикум')
-    resp_json = response.json()
+    except BaseException:
+        breaker.release()
+        raise
+    breaker.record_status(response.status_code)
+    return response
+
+
+@metrics.timed('get_api_answer')
+def get_token_api_answer(token: str, current_timestamp: int):
+    """Запрос к API Практикум.Домашка с токеном конкретного студента.
+
+    Возвращает None, если ответ не изменился с прошлого запроса по токену.
+    """
+    timestamp = current_timestamp or int(time.time())
+    headers = get_headers(token)
+    cache = response_cache.get_cache()
+    if cache is not None:
+        headers.update(cache.conditional_headers(token, timestamp))
+    response = request_api(headers, timestamp)
+    if cache is not None and cache.is_unchanged(token, timestamp, response):
+        logger.debug('Ответ API не изменился')
+        return None
+    with profiling.stage('json'):
+        resp_json = response.json()
+    check_api_status(response, resp_json)
+    if cache is not None:
+        cache.store(token, timestamp, response, resp_json)
+    return resp_json
+
+
+@metrics.timed('get_api_headers')
+def get_token_api_stream(token: str, current_timestamp: int):
+    """Потоковый запрос к API: работы разбираются по мере чтения ответа.
+
+    Кеш ответов в этом режиме не используется: для сравнения ответа
+    с прошлым его пришлось бы прочитать целиком. Отдельные работы
+    не проверяются: это делает вызывающий (validation.ValidHomeworks).
+    Этап get_api_headers — время до заголовков ответа; get_api_answer
+    учитывается потоком, когда ответ прочитан до конца.
+    """
+    from stream_parser import HomeworksStream
+
+    started = time.perf_counter()
+    response = request_api(
+        get_headers(token), current_timestamp, stream=True
+    )
+    if response.status_code != HTTPStatus.OK:
+        try:
+            check_api_status(response, response.json())
+        finally:
+            response.close()
+    return HomeworksStream(
+        response.iter_content(STREAM_CHUNK_SIZE), close=response.close,
+        strict=False, stage='get_api_answer', started=started,
+    )
+
+
+def check_api_status(response, resp_json) -> None:
+    """Проверка кода ответа API Практикум.Домашка."""
     if response.status_code != HTTPStatus.OK:
         error_keys = {'error', 'code'}
         for k in error_keys:
             if k in resp_json:
                 resp_error = resp_json['error']
                 resp_code = resp_json['code']
-                logger.error(f'Ответ от API {resp_error},{resp_code}')
+                logger.error('Ответ от API %s,%s', resp_error, resp_code)
                 raise APIResponseError(
                     msg=resp_error, code=resp_code
                 )
-        logger.error(f'Ответ от API {response.status_code}')
+        logger.error('Ответ от API %s', response.status_code)
         raise HTTPStatusError(
             msg='код ответа от API:', code=response.status_code
         )
-    return resp_json
 
 
+@metrics.timed('check_response')
 def check_response(response: dict) -> list:
     """Проверка ответа API Практикум.Домашка на корректность."""
     if not isinstance(response, dict):
@@ -93,12 +236,13 @@ def check_response(response: dict) -> list:
     return resp_list
 
 
+@metrics.timed('parse_status')
 def parse_status(homework: dict) -> str:
     """Извлекает из ответа о домашней работе ее статус."""
     homework_name = homework['homework_name']
     homework_status = homework['status']
     if homework_status not in HOMEWORK_STATUSES:
-        logger.error(f'В ответе нет статуса работы: {homework_status}')
+        logger.error('В ответе нет статуса работы: %s', homework_status)
         raise NoHomeworkStatusInResponse(
             msg=f'Незнакомый статус: {homework_status}', code=''
         )
@@ -109,47 +253,98 @@ def parse_status(homework: dict) -> str:
 
 def check_tokens() -> bool:
     """Проверка доступности переменных окружения."""
-    for name in TOKEN_NAMES:
+    names = ('TELEGRAM_TOKEN',) if TENANTS_FILE else TOKEN_NAMES
+    for name in names:
         if not globals()[name]:
-            logger.critical(f'Переменная {name} не найдена')
+            logger.critical('Переменная %s не найдена', name)
             return False
     return True
 
 
+def check_config() -> bool:
+    """Проверка настроек без загрузки клиентов Telegram и API."""
+    if not check_tokens():
+        return False
+    if not TENANTS_FILE:
+        return True
+    import json
+
+    try:
+        with open(TENANTS_FILE, encoding='utf-8') as file:
+            records = json.load(file)
+        for record in records:
+            chats = [record.get('chat_id'), *(record.get('chat_ids') or ())]
+            if not record['practicum_token'] or not any(chats):
+                raise ValueError('пустой токен или чат')
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        logger.critical('Некорректный TENANTS_FILE %s: %s', TENANTS_FILE,
+                        error)
+        return False
+    return True
+
+
 def main() -> None:
     """Основная логика работы бота."""
     if not check_tokens():
         raise CheckTokenError(
             msg='Переменная не найдена', code=''
         )
-    old_status = ''
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = int(time.time())
-    while True:
-        try:
-            response = get_api_answer(current_timestamp)
-            resp = check_response(response)
-            if not resp:
-                message = 'Обновлений статуса домашки нет'
-            else:
-                message = parse_status(resp[0])
-                current_timestamp = resp[0].get(
-                    'current_date', current_timestamp
-                )
-            if old_status != message:
-                send_message(bot, message)
-                old_status = message
-            else:
-                logger.debug('Статус не изменился')
-        except Exception as error:
-            message = f'Сбой в работе программы: {error}'
-            if old_status != message:
-                send_message(bot, message)
-                old_status = message
-            logger.error(message)
-        finally:
-            time.sleep(RETRY_TIME)
+    import asyncio
+    import commands
+    import signal
+    import http_client
+    import sharding
+    import telegram
+    import traffic
+    from engine import PollingEngine, load_tenants
+    from history import TransitionHistory
+    from send_queue import SEND_WORKERS
+    from storage import StateStore
+    from telegram.utils.request import Request
+
+    bot = telegram.Bot(
+        token=TELEGRAM_TOKEN,
+        request=Request(
+            con_pool_size=SEND_WORKERS + commands.COMMAND_WORKERS + 4
+        ),
+    )
+    http_client.init_session()
+    response_cache.init_cache()
+    polling_bot, recorder = bot, None
+    if traffic.TRAFFIC_RECORD:
+        polling_bot, recorder = traffic.start_recording(bot)
+    store = StateStore()
+    profiling.start(getattr(signal, 'SIGUSR1', None))
+    history = TransitionHistory()
+    if metrics.METRICS_PORT:
+        import metrics_server
+        metrics_server.start_server(int(metrics.METRICS_PORT))
+    shard = None
+    if sharding.SHARDING:
+        shard = sharding.Shard(sharding.LeaseTable())
+    engine = PollingEngine(
+        polling_bot, load_tenants(), store=store, shard=shard,
+        history=history,
+    )
+    updater = None
+    if commands.STATUS_COMMAND and shard is None:
+        updater = commands.start_updater(bot, engine)
+        engine.on_stop(partial(commands.stop_updater, updater))
+    try:
+        asyncio.run(engine.run(signals=(signal.SIGTERM, signal.SIGINT)))
+    finally:
+        if updater is not None:
+            updater.stop()
+        store.close()
+        history.close()
+        if shard is not None:
+            shard.table.close()
+        http_client.close_session()
+        if recorder is not None:
+            recorder.close()
 
 
 if __name__ == '__main__':
+    if '--check' in sys.argv[1:]:
+        sys.exit(0 if check_config() else 1)
     main()
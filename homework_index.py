@@ -0,0 +1,159 @@
+import sys
+
+from array import array
+from collections.abc import MutableMapping
+
+from homework import HOMEWORK_STATUSES
+
+SMALL_INDEX = 32
+STATUSES = [None, *HOMEWORK_STATUSES]
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+def status_code(status) -> int:
+    """Код статуса (один байт); неизвестные статусы получают новый код."""
+    code = STATUS_CODES.get(status)
+    if code is None:
+        if len(STATUSES) > 255:
+            raise ValueError(f'Слишком много статусов работ: {status}')
+        code = STATUS_CODES[status] = len(STATUSES)
+        STATUSES.append(status)
+    return code
+
+
+def pack_key(key: str):
+    """Ключ работы в памяти: id — числом, название — общей строкой."""
+    if key.isascii() and key.isdigit() and not key.startswith('0'):
+        return int(key)
+    return sys.intern(key)
+
+
+def unpack_key(packed) -> str:
+    """Ключ работы в исходном строковом виде."""
+    return str(packed) if isinstance(packed, int) else packed
+
+
+def key_column(packed: list):
+    """Столбец ключей: массив чисел, если все ключи — id, иначе кортеж."""
+    for key in packed:
+        if type(key) is not int:
+            return tuple(packed)
+    try:
+        return array('q', packed)
+    except OverflowError:
+        return tuple(packed)
+
+
+class HomeworkIndex(MutableMapping):
+    """Статусы работ студента в компактном виде: ключ работы -> статус.
+
+    Снаружи это словарь строк, внутри — два столбца: id работ массивом
+    восьмибайтных чисел (или кортеж, если у работ нет id) и байты кодов
+    статусов. У студента обычно пара десятков работ, и поиск перебором
+    по столбцу дешевле словаря и по памяти, и по времени. Если работ
+    больше SMALL_INDEX, индекс переходит на словарь ключ -> код.
+
+    Индекс из from_dict хранит исходный словарь и упаковывается при
+    первом обращении к статусам: при загрузке сотен тысяч студентов
+    упаковка не замедляет старт, а делается уже при их опросе.
+    """
+
+    __slots__ = ('_keys', '_codes')
+
+    def __init__(self, items=()) -> None:
+        """Упакованный индекс из словаря или пар (ключ, статус)."""
+        self._keys = dict(items)
+        self._codes = None
+        self._pack()
+
+    @classmethod
+    def from_dict(cls, statuses: dict) -> 'HomeworkIndex':
+        """Индекс из словаря статусов, например загруженного из базы.
+
+        Словарь не копируется и упаковывается при первом обращении.
+        """
+        index = cls.__new__(cls)
+        if statuses:
+            index._keys, index._codes = statuses, None
+        else:
+            index._keys, index._codes = (), b''
+        return index
+
+    def _pack(self) -> None:
+        """Упаковка исходного словаря статусов в столбцы или словарь кодов."""
+        statuses = self._keys
+        if len(statuses) > SMALL_INDEX:
+            self._keys = {
+                pack_key(key): status_code(status)
+                for key, status in statuses.items()
+            }
+            self._codes = b''
+        elif statuses:
+            self._keys = key_column(list(map(pack_key, statuses)))
+            self._codes = bytes(map(status_code, statuses.values()))
+        else:
+            self._keys, self._codes = (), b''
+
+    def __getitem__(self, key: str):
+        """Статус работы key."""
+        if self._codes is None:
+            self._pack()
+        packed = pack_key(key)
+        if isinstance(self._keys, dict):
+            return STATUSES[self._keys[packed]]
+        try:
+            return STATUSES[self._codes[self._keys.index(packed)]]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, status) -> None:
+        """Запись статуса работы key."""
+        if self._codes is None:
+            self._pack()
+        packed, code = pack_key(key), status_code(status)
+        if isinstance(self._keys, dict):
+            self._keys[packed] = code
+            return
+        try:
+            position = self._keys.index(packed)
+        except ValueError:
+            if len(self._keys) < SMALL_INDEX:
+                self._keys = key_column([*self._keys, packed])
+                self._codes += bytes((code,))
+                return
+            self._keys = dict(zip(self._keys, self._codes))
+            self._codes = b''
+            self._keys[packed] = code
+            return
+        codes = bytearray(self._codes)
+        codes[position] = code
+        self._codes = bytes(codes)
+
+    def __delitem__(self, key: str) -> None:
+        """Удаление работы key из индекса."""
+        if self._codes is None:
+            self._pack()
+        packed = pack_key(key)
+        if isinstance(self._keys, dict):
+            del self._keys[packed]
+            return
+        try:
+            position = self._keys.index(packed)
+        except ValueError:
+            raise KeyError(key) from None
+        self._keys = self._keys[:position] + self._keys[position + 1:]
+        self._codes = self._codes[:position] + self._codes[position + 1:]
+
+    def __iter__(self):
+        """Ключи работ строками."""
+        if self._codes is None:
+            return iter(self._keys)
+        return map(unpack_key, self._keys)
+
+    def __len__(self) -> int:
+        """Число работ в индексе."""
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        """Индекс в виде словаря статусов."""
+        return f'HomeworkIndex({dict(self)!r})'
@@ -0,0 +1,88 @@
+import os
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+HTTP_POOL_SIZE = int(
+    os.getenv('HTTP_POOL_SIZE', os.getenv('POLL_CONCURRENCY', 100))
+)
+HTTP_POOL_HOSTS = 10
+
+_session = None
+
+
+class PooledSession:
+    """Сессия requests с пулом keep-alive соединений и статистикой."""
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE) -> None:
+        """Сессия с пулом до pool_size соединений на хост."""
+        self.pool_size = pool_size
+        self._adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_HOSTS,
+            pool_maxsize=pool_size,
+            pool_block=True,
+        )
+        self._session = requests.Session()
+        self._session.mount('https://', self._adapter)
+        self._session.mount('http://', self._adapter)
+        self._session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET-запрос через общий пул соединений."""
+        return self._session.get(url, **kwargs)
+
+    def stats(self) -> dict:
+        """Статистика пула: запросы, новые соединения, их переиспользование."""
+        pools = self._adapter.poolmanager.pools
+        requests_count = connections = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_count += pool.num_requests
+            connections += pool.num_connections
+        avoided = max(requests_count - connections, 0)
+        return {
+            'pool_size': self.pool_size,
+            'requests': requests_count,
+            'connections': connections,
+            'handshakes_avoided': avoided,
+            'reuse_ratio': avoided / requests_count if requests_count else 0.0,
+        }
+
+    def close(self) -> None:
+        """Закрытие всех соединений пула."""
+        self._session.close()
+
+
+def init_session(pool_size: int = HTTP_POOL_SIZE) -> PooledSession:
+    """Создание общей сессии при старте бота."""
+    global _session
+    if _session is not None:
+        _session.close()
+    _session = PooledSession(pool_size)
+    return _session
+
+
+def get_session():
+    """Общая сессия или None, если она не создана."""
+    return _session
+
+
+def set_session(session):
+    """Замена общей сессии (например, обёрткой); возвращает прежнюю."""
+    global _session
+    previous, _session = _session, session
+    return previous
+
+
+def close_session() -> None:
+    """Закрытие общей сессии."""
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
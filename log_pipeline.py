@@ -0,0 +1,122 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+
+from logging.handlers import QueueHandler, QueueListener
+
+from ratelimit import TokenBucket
+
+LOG_JSON = os.getenv('LOG_JSON', '1') == '1'
+LOG_RATE = float(os.getenv('LOG_RATE', 20))
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+MAX_MESSAGE_TYPES = 1000
+TEXT_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись — одна строка JSON.
+
+    Поля из extra={'fields': {...}} попадают в запись как есть,
+    число отброшенных ограничителем похожих записей — в suppressed.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Запись в виде JSON-строки."""
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Не больше rate записей в секунду на каждый тип сообщения.
+
+    Тип — уровень и шаблон сообщения до подстановки аргументов, поэтому
+    'Ошибка %s' с разными аргументами считается одним типом. Отброшенные
+    записи подсчитываются и отмечаются в следующей пропущенной.
+    """
+
+    def __init__(self, rate: float = LOG_RATE) -> None:
+        """Фильтр с лимитом rate записей в секунду."""
+        super().__init__()
+        self.rate = rate
+        self._buckets = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Пропустить запись или отбросить её по лимиту типа."""
+        key = record.levelno, record.msg
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= MAX_MESSAGE_TYPES:
+                    self._prune()
+                bucket = self._buckets[key] = TokenBucket(self.rate)
+            if not bucket.try_take():
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            record.suppressed = self._suppressed.pop(key, 0)
+        return True
+
+    def _prune(self) -> None:
+        """Удаление ограничителей типов, которые давно не встречались."""
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items()
+            if not bucket.is_full() or key in self._suppressed
+        }
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Постановка записи в очередь без форматирования и ожидания.
+
+    Сообщение форматируется в потоке QueueListener. Если очередь
+    заполнена, запись отбрасывается, а не задерживает опрос.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        """Обработчик, пишущий в очередь log_queue."""
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Запись уходит в очередь как есть, без форматирования."""
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Запись в очередь; при переполнении она отбрасывается."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(logger: logging.Logger, stream=sys.stdout,
+                  json_output: bool = LOG_JSON, rate: float = LOG_RATE,
+                  queue_size: int = LOG_QUEUE_SIZE) -> QueueListener:
+    """Вывод логгера через очередь и фоновый поток записи в stream."""
+    log_queue = queue.Queue(queue_size)
+    output = logging.StreamHandler(stream)
+    output.setFormatter(
+        JsonFormatter() if json_output else logging.Formatter(TEXT_FORMAT)
+    )
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(RateLimitFilter(rate))
+    logger.addHandler(handler)
+    listener = QueueListener(log_queue, output)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
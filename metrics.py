@@ -0,0 +1,226 @@
+import functools
+import os
+import threading
+import time
+
+from bisect import bisect_left
+
+import exceptions
+
+METRICS_PORT = os.getenv('METRICS_PORT')
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30
+)
+
+
+def format_labels(names: tuple, values: tuple, extra: str = '') -> str:
+    """Метки в формате Prometheus: {name="value",...}."""
+    pairs = [
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'),
+        )
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    """Общая часть метрик: имя, описание, метки и блокировка."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str,
+                 labels: tuple = ()) -> None:
+        """Метрика name с описанием и именами меток."""
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def header(self) -> list:
+        """Строки HELP и TYPE."""
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+
+
+class Counter(Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = 'counter'
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        """Увеличение счётчика для набора меток."""
+        with self._lock:
+            self._values[label_values] = (
+                self._values.get(label_values, 0) + amount
+            )
+
+    def value(self, *label_values) -> float:
+        """Текущее значение для набора меток."""
+        return self._values.get(label_values, 0)
+
+    def render(self) -> list:
+        """Строки значений в формате Prometheus."""
+        return [
+            f'{self.name}{format_labels(self.labels, key)} {value}'
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Metric):
+    """Значение, которое может расти и убывать, или функция-источник."""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str,
+                 labels: tuple = ()) -> None:
+        """Показатель без значения и функции-источника."""
+        super().__init__(name, documentation, labels)
+        self._function = None
+
+    def set(self, value: float, *label_values) -> None:
+        """Установка значения для набора меток."""
+        self._values[label_values] = value
+
+    def set_function(self, function) -> None:
+        """Значение вычисляется функцией только при сборе метрик."""
+        self._function = function
+
+    def render(self) -> list:
+        """Строки значений в формате Prometheus."""
+        if self._function is not None:
+            return [f'{self.name} {self._function()}']
+        return [
+            f'{self.name}{format_labels(self.labels, key)} {value}'
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(Metric):
+    """Гистограмма с фиксированными границами корзин."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (),
+                 buckets: tuple = DEFAULT_BUCKETS) -> None:
+        """Гистограмма с верхними границами корзин buckets."""
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *label_values) -> None:
+        """Учёт одного наблюдения."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [
+                    [0] * (len(self.buckets) + 1), 0.0, 0
+                ]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, *label_values) -> int:
+        """Число наблюдений для набора меток."""
+        state = self._values.get(label_values)
+        return state[2] if state is not None else 0
+
+    def render(self) -> list:
+        """Строки корзин, суммы и количества в формате Prometheus."""
+        lines = []
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+            for bound, bucket in zip(bounds, counts):
+                cumulative += bucket
+                labels = format_labels(self.labels, key, f'le="{bound}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(self.labels, key)
+            lines.append(f'{self.name}_sum{labels} {total}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class Registry:
+    """Набор метрик процесса."""
+
+    def __init__(self) -> None:
+        """Пустой реестр метрик."""
+        self._metrics = []
+
+    def register(self, metric: Metric) -> Metric:
+        """Добавление метрики в набор."""
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        """Создание и регистрация счётчика."""
+        return self.register(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        """Создание и регистрация измерителя."""
+        return self.register(Gauge(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        """Создание и регистрация гистограммы."""
+        return self.register(Histogram(*args, **kwargs))
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.histogram(
+    'homework_bot_stage_seconds', 'Длительность этапов обработки',
+    ('stage',),
+)
+EXCEPTIONS = REGISTRY.counter(
+    'homework_bot_exceptions_total', 'Исключения по классам', ('exception',),
+)
+POLL_SECONDS = REGISTRY.histogram(
+    'homework_bot_poll_seconds', 'Полный опрос одного студента',
+)
+POLL_LAG_SECONDS = REGISTRY.histogram(
+    'homework_bot_poll_lag_seconds', 'Опоздание опроса от расписания',
+)
+CYCLE_SECONDS = REGISTRY.histogram(
+    'homework_bot_cycle_seconds', 'Длительность цикла опроса всех студентов',
+)
+TENANTS_BEHIND = REGISTRY.gauge(
+    'homework_bot_tenants_behind_schedule', 'Студенты с просроченным опросом',
+)
+SEND_QUEUE_DEPTH = REGISTRY.gauge(
+    'homework_bot_send_queue_depth', 'Сообщения в очереди на отправку',
+)
+
+for error_class in exceptions.BaseError.__subclasses__():
+    EXCEPTIONS.inc(error_class.__name__, amount=0)
+
+
+def timed(stage: str):
+    """Декоратор: время этапа в гистограмму, исключения в счётчик."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception as error:
+                EXCEPTIONS.inc(type(error).__name__)
+                raise
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - started, stage)
+        return wrapper
+    return decorator
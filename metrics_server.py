@@ -0,0 +1,32 @@
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from metrics import REGISTRY
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Отдача метрик по GET /metrics."""
+
+    def do_GET(self):
+        """Ответ со всеми метриками в формате Prometheus."""
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Без записи каждого запроса в stderr."""
+
+
+def start_server(port: int, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+    """Запуск HTTP-сервера метрик в фоновом потоке."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,238 @@
+import contextlib
+import contextvars
+import os
+import random
+import threading
+import time
+
+import metrics
+
+SLOW_POLL = float(os.getenv('SLOW_POLL', 10))
+PROFILE = os.getenv('PROFILE', '') == '1'
+PROFILE_SAMPLE = float(os.getenv('PROFILE_SAMPLE', 0.01))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+TRACEMALLOC_FRAMES = int(os.getenv('TRACEMALLOC_FRAMES', 5))
+TRACEMALLOC_TOP = 10
+STAGES = ('http', 'json', 'validation', 'send')
+
+SLOW_POLLS = metrics.REGISTRY.counter(
+    'homework_bot_slow_polls_total',
+    'Опросы дольше SLOW_POLL с разбивкой по этапам в журнале',
+)
+
+_current = contextvars.ContextVar('profiling', default=None)
+_OFF = contextlib.nullcontext()
+_state = {'active': False, 'loop_profile': False, 'snapshot': None}
+
+
+class Timings:
+    """Время этапов одного опроса и профили, если опрос попал в выборку.
+
+    Опрос считается завершённым, когда закончился сам опрос и отправлены
+    все его сообщения: каждое сообщение в очереди держит hold().
+    """
+
+    __slots__ = ('label', 'started', 'stages', 'profiles', '_holds', '_lock')
+
+    def __init__(self, label: str, sampled: bool = False) -> None:
+        """Замеры опроса label, начатые сейчас."""
+        self.label = label
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.profiles = [] if sampled else None
+        self._holds = 1
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Учёт времени этапа; этапы из разных потоков складываются."""
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0) + seconds
+
+    def hold(self) -> None:
+        """Продление опроса до отправки ещё одного сообщения."""
+        with self._lock:
+            self._holds += 1
+
+    def release(self) -> None:
+        """Завершение части опроса; последняя часть выводит итог."""
+        with self._lock:
+            self._holds -= 1
+            finished = self._holds == 0
+        if finished:
+            _finish(self, time.perf_counter() - self.started)
+
+    def breakdown(self, elapsed: float) -> dict:
+        """Секунды по этапам; other — всё остальное, включая ожидание."""
+        result = {name: round(self.stages.get(name, 0), 3) for name in STAGES}
+        result['other'] = round(max(elapsed - sum(self.stages.values()), 0), 3)
+        return result
+
+
+class _Stage:
+    """Замер одного этапа."""
+
+    __slots__ = ('timings', 'name', 'started')
+
+    def __init__(self, timings: Timings, name: str) -> None:
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.timings.add(self.name, time.perf_counter() - self.started)
+
+
+def current():
+    """Замеры текущего опроса или None."""
+    return _current.get()
+
+
+def stage(name: str, timings: Timings = None):
+    """Замер этапа name текущего опроса; вне опроса ничего не делает."""
+    if timings is None:
+        timings = _current.get()
+        if timings is None:
+            return _OFF
+    return _Stage(timings, name)
+
+
+def _enable_profile():
+    """Запущенный cProfile или None, если профилировщик уже занят."""
+    import cProfile
+
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        return None
+    return profile
+
+
+@contextlib.contextmanager
+def poll(label: str):
+    """Замеры опроса: разбивка медленного опроса и выборочный cProfile.
+
+    Без SLOW_POLL и профилирования только проверяет два флага.
+    Профиль опроса в цикле событий включает и соседние корутины,
+    которые выполнялись в это время; вызовы в пуле потоков
+    профилируются отдельно через run() и складываются в один файл.
+    """
+    sampled = _state['active'] and random.random() < PROFILE_SAMPLE
+    if SLOW_POLL <= 0 and not sampled:
+        yield None
+        return
+    timings = Timings(label, sampled)
+    token = _current.set(timings)
+    profile = None
+    if sampled and not _state['loop_profile']:
+        profile = _enable_profile()
+        _state['loop_profile'] = profile is not None
+    try:
+        yield timings
+    finally:
+        if profile is not None:
+            profile.disable()
+            _state['loop_profile'] = False
+            timings.profiles.append(profile)
+        _current.reset(token)
+        timings.release()
+
+
+def run(func, *args):
+    """func(*args) в пуле потоков; под cProfile, если опрос в выборке."""
+    timings = _current.get()
+    if timings is None or timings.profiles is None:
+        return func(*args)
+    profile = _enable_profile()
+    if profile is None:
+        return func(*args)
+    try:
+        return func(*args)
+    finally:
+        profile.disable()
+        timings.profiles.append(profile)
+
+
+def _dump(timings: Timings) -> None:
+    """Сохранение профилей опроса в PROFILE_DIR для pstats/snakeviz."""
+    import pstats
+
+    import homework
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(
+        PROFILE_DIR, f'poll-{time.time():.3f}-{timings.label}.prof'
+    )
+    pstats.Stats(*timings.profiles).dump_stats(path)
+    homework.logger.info('Профиль опроса сохранён: %s', path)
+
+
+def _finish(timings: Timings, elapsed: float) -> None:
+    """Итог опроса: профиль и предупреждение о медленном опросе."""
+    import homework
+
+    if timings.profiles:
+        _dump(timings)
+    if 0 < SLOW_POLL <= elapsed:
+        SLOW_POLLS.inc()
+        homework.logger.warning(
+            'Медленный опрос %s: %.2f с, этапы: %s',
+            timings.label, elapsed, timings.breakdown(elapsed),
+        )
+
+
+def toggle(*_) -> bool:
+    """Включение или выключение профилирования; подходит для сигнала.
+
+    Включает выборочный cProfile опросов и tracemalloc.
+    """
+    import tracemalloc
+
+    import homework
+
+    _state['active'] = not _state['active']
+    if _state['active']:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    else:
+        tracemalloc.stop()
+        _state['snapshot'] = None
+    homework.logger.warning(
+        'Профилирование %s', 'включено' if _state['active'] else 'выключено'
+    )
+    return _state['active']
+
+
+def start(signum=None) -> None:
+    """Профилирование при PROFILE=1 и его переключение сигналом signum."""
+    if signum is not None:
+        import signal
+
+        signal.signal(signum, toggle)
+    if PROFILE and not _state['active']:
+        toggle()
+
+
+def memory_report(top: int = TRACEMALLOC_TOP) -> list:
+    """Рост памяти по строкам кода с прошлого вызова (tracemalloc).
+
+    Первый вызов только запоминает снимок. Пока tracemalloc
+    не запущен, возвращает пустой список.
+    """
+    import tracemalloc
+
+    import homework
+
+    if not tracemalloc.is_tracing():
+        return []
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),)
+    )
+    previous, _state['snapshot'] = _state['snapshot'], snapshot
+    if previous is None:
+        return []
+    diff = snapshot.compare_to(previous, 'lineno')[:top]
+    for line in diff:
+        homework.logger.info('Память: %s', line)
+    return diff
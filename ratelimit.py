@@ -0,0 +1,46 @@
+import time
+
+
+class TokenBucket:
+    """Token bucket: rate токенов в секунду, не больше capacity в запасе."""
+
+    def __init__(self, rate: float, capacity: float = None,
+                 clock=time.monotonic) -> None:
+        """Полный запас: capacity токенов (по умолчанию rate)."""
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated_at = clock()
+
+    def _refill(self) -> None:
+        """Пополнение запаса токенов за прошедшее время."""
+        now = self.clock()
+        self.tokens = min(
+            self.tokens + (now - self.updated_at) * self.rate, self.capacity
+        )
+        self.updated_at = now
+
+    def try_take(self) -> bool:
+        """Взять токен, если он есть."""
+        self._refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def reserve(self) -> float:
+        """Занять токен в долг; возвращает, сколько секунд ждать."""
+        self._refill()
+        self.tokens -= 1
+        return max(-self.tokens / self.rate, 0)
+
+    def wait_time(self) -> float:
+        """Сколько секунд до появления следующего токена."""
+        self._refill()
+        return max((1 - self.tokens) / self.rate, 0)
+
+    def is_full(self) -> bool:
+        """Запас полон: ограничитель давно не использовался."""
+        self._refill()
+        return self.tokens >= self.capacity
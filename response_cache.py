@@ -0,0 +1,135 @@
+import hashlib
+import re
+import threading
+
+from http import HTTPStatus
+
+CURRENT_DATE = re.compile(rb'"current_date"\s*:\s*-?\d+')
+
+_cache = None
+
+
+def body_digest(content: bytes) -> bytes:
+    """Хеш тела ответа без поля current_date, которое меняется всегда."""
+    return hashlib.blake2b(
+        CURRENT_DATE.sub(b'', content), digest_size=16
+    ).digest()
+
+
+class CacheEntry:
+    """Последний ответ API для одного токена и его валидаторы."""
+
+    __slots__ = ('from_date', 'etag', 'last_modified', 'digest', 'payload')
+
+    def __init__(self, from_date, etag, last_modified, digest, payload):
+        """Ответ API по токену и его валидаторы."""
+        self.from_date = from_date
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.payload = payload
+
+
+class ResponseCache:
+    """Кеш ответов API Практикум.Домашка по токенам.
+
+    Если сервер поддерживает ETag или Last-Modified, запрос отправляется
+    с условными заголовками и неизменный ответ приходит как 304. Иначе
+    неизменность определяется по хешу тела ответа без разбора JSON.
+    """
+
+    def __init__(self) -> None:
+        """Пустой кеш со счётчиками попаданий."""
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Число токенов в кеше."""
+        return len(self._entries)
+
+    def conditional_headers(self, token: str, from_date: int) -> dict:
+        """Условные заголовки для повторного запроса с тем же from_date."""
+        entry = self._entries.get(token)
+        if entry is None or entry.from_date != from_date:
+            return {}
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def _count(self, hit: bool) -> bool:
+        """Учёт попадания или промаха в кеш."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return hit
+
+    def is_unchanged(self, token: str, from_date: int, response) -> bool:
+        """Проверка, что ответ совпадает с закешированным для токена."""
+        entry = self._entries.get(token)
+        if entry is None:
+            return self._count(False)
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            return self._count(True)
+        if response.status_code != HTTPStatus.OK:
+            return self._count(False)
+        if body_digest(response.content) != entry.digest:
+            return self._count(False)
+        entry.from_date = from_date
+        entry.etag = response.headers.get('ETag')
+        entry.last_modified = response.headers.get('Last-Modified')
+        return self._count(True)
+
+    def store(self, token: str, from_date: int, response,
+              payload: dict) -> None:
+        """Сохранение успешного ответа API для токена."""
+        self._entries[token] = CacheEntry(
+            from_date=from_date,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            digest=body_digest(response.content),
+            payload=payload,
+        )
+
+    def entry(self, token: str):
+        """Последний ответ API для токена вместе с хешем тела."""
+        return self._entries.get(token)
+
+    def payload(self, token: str):
+        """Последний разобранный ответ API для токена."""
+        entry = self._entries.get(token)
+        return entry.payload if entry is not None else None
+
+    def stats(self) -> dict:
+        """Счётчики попаданий и промахов кеша."""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+
+def init_cache() -> ResponseCache:
+    """Создание общего кеша ответов при старте бота."""
+    global _cache
+    _cache = ResponseCache()
+    return _cache
+
+
+def get_cache():
+    """Общий кеш ответов или None, если он не создан."""
+    return _cache
+
+
+def close_cache() -> None:
+    """Отключение кеша ответов."""
+    global _cache
+    _cache = None
@@ -0,0 +1,191 @@
+import email.utils
+import os
+import random
+import threading
+import time
+
+from http import HTTPStatus
+
+import deadline
+import metrics
+
+from ratelimit import TokenBucket
+
+RETRY_ATTEMPTS = int(os.getenv('RETRY_ATTEMPTS', 3))
+RETRY_BASE = float(os.getenv('RETRY_BASE', 0.5))
+RETRY_CAP = float(os.getenv('RETRY_CAP', 8))
+RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', 30))
+RETRY_BUDGET_RATIO = float(os.getenv('RETRY_BUDGET_RATIO', 0.1))
+RETRY_BUDGET_MIN = float(os.getenv('RETRY_BUDGET_MIN', 0.2))
+RETRY_BUDGET_BURST = 10
+RETRY_STATUSES = frozenset((
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+))
+TELEGRAM_HOST = 'api.telegram.org'
+
+RETRIES = metrics.REGISTRY.counter(
+    'homework_bot_retries_total',
+    'Повторы запросов: выполненные и отклонённые бюджетом или сроком',
+    ('host', 'outcome'),
+)
+
+_budgets = {}
+_budgets_lock = threading.Lock()
+
+
+def parse_retry_after(value, now: float = None):
+    """Секунды из заголовка Retry-After (число или HTTP-дата) или None."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment is None or moment.tzinfo is None:
+        return None
+    now = time.time() if now is None else now
+    return max(moment.timestamp() - now, 0.0)
+
+
+def backoff(attempt: int, base: float = RETRY_BASE, cap: float = RETRY_CAP,
+            rng=random.random) -> float:
+    """Экспоненциальная пауза с полным джиттером: от 0 до base * 2^attempt."""
+    return rng() * min(cap, base * 2 ** attempt)
+
+
+class RetryBudget:
+    """Бюджет повторов для одного хоста.
+
+    Каждый исходный запрос добавляет ratio токена, каждый повтор
+    забирает один; сверх этого бюджет пополняется на min_rate в секунду
+    и копит не больше burst. Поэтому при частичной недоступности
+    повторов не больше ratio от запросов плюс min_rate в секунду,
+    и нагрузка на хост не умножается.
+    """
+
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO,
+                 min_rate: float = RETRY_BUDGET_MIN,
+                 burst: float = RETRY_BUDGET_BURST,
+                 clock=time.monotonic) -> None:
+        """Бюджет с полным запасом burst."""
+        self.ratio = ratio
+        self._bucket = TokenBucket(min_rate, burst, clock)
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        """Учёт исходного запроса."""
+        with self._lock:
+            bucket = self._bucket
+            bucket.tokens = min(bucket.tokens + self.ratio, bucket.capacity)
+
+    def withdraw(self) -> bool:
+        """Разрешение на один повтор."""
+        with self._lock:
+            return self._bucket.try_take()
+
+
+def get_budget(host: str) -> RetryBudget:
+    """Бюджет повторов хоста, один на процесс."""
+    with _budgets_lock:
+        budget = _budgets.get(host)
+        if budget is None:
+            budget = _budgets[host] = RetryBudget()
+        return budget
+
+
+def reset_budgets() -> None:
+    """Сброс бюджетов всех хостов."""
+    with _budgets_lock:
+        _budgets.clear()
+
+
+def _attempt(func, args) -> tuple:
+    """Результат или исключение одной попытки."""
+    try:
+        return func(*args), None
+    except Exception as error:
+        return None, error
+
+
+def _discard(result) -> None:
+    """Закрытие ответа, который заменит повтор."""
+    close = getattr(result, 'close', None)
+    if close is not None:
+        close()
+
+
+def _retry_delay(host: str, attempt: int, wait: float, budget: RetryBudget,
+                 max_delay: float):
+    """Пауза перед повтором или None, если повторять нельзя."""
+    delay = max(wait, backoff(attempt))
+    if delay > min(max_delay, deadline.remaining()):
+        RETRIES.inc(host, 'too_long')
+        return None
+    if not budget.withdraw():
+        RETRIES.inc(host, 'budget_exhausted')
+        return None
+    RETRIES.inc(host, 'retried')
+    return delay
+
+
+def call(host: str, func, *args, should_retry,
+         attempts: int = RETRY_ATTEMPTS, max_delay: float = RETRY_MAX_DELAY,
+         sleep=time.sleep):
+    """func(*args) с повторами при временных сбоях хоста host.
+
+    should_retry(result, error) возвращает None, если исход окончательный,
+    или минимальную паузу в секундах, которую просит сервер (0 — пауза
+    по backoff). Повтор, для которого нужна пауза дольше max_delay или
+    остатка срока (deadline), либо нет бюджета хоста, не делается:
+    возвращается последний исход.
+    """
+    budget = get_budget(host)
+    budget.deposit()
+    for attempt in range(attempts):
+        result, error = _attempt(func, args)
+        wait = should_retry(result, error)
+        if wait is None or attempt + 1 >= attempts:
+            break
+        delay = _retry_delay(host, attempt, wait, budget, max_delay)
+        if delay is None:
+            break
+        _discard(result)
+        sleep(delay)
+    if error is not None:
+        raise error
+    return result
+
+
+def http_delay(response, error):
+    """Повтор ответа 429/5xx (с учётом Retry-After) и ошибки соединения."""
+    import requests
+
+    if error is not None:
+        return 0 if isinstance(error, requests.ConnectionError) else None
+    if response.status_code not in RETRY_STATUSES:
+        return None
+    return parse_retry_after(response.headers.get('Retry-After')) or 0
+
+
+def telegram_delay(result, error):
+    """Повтор RetryAfter через указанное время и сетевых ошибок Telegram.
+
+    TimedOut не повторяется: Telegram мог принять сообщение и ответить
+    медленно, а sendMessage не идемпотентен — повтор дал бы дубль.
+    """
+    from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
+
+    if isinstance(error, RetryAfter):
+        return float(error.retry_after)
+    if isinstance(error, (BadRequest, TimedOut)):
+        return None
+    if isinstance(error, NetworkError):
+        return 0
+    return None
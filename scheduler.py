@@ -0,0 +1,111 @@
+import os
+import random
+import time
+
+from homework import RETRY_TIME
+from ratelimit import TokenBucket
+from timing_wheel import TimingWheel
+
+STATUS_INTERVALS = {
+    'reviewing': 120,
+    'rejected': 600,
+    'approved': 1800,
+    None: RETRY_TIME,
+}
+MIN_INTERVAL = 60
+MAX_INTERVAL = 3600
+STALE_AFTER = 24 * 60 * 60
+JITTER = 0.1
+POLL_BUDGET = float(os.getenv('POLL_BUDGET', 50))
+
+
+def next_interval(status, changed_at: float, now: float,
+                  jitter: float = JITTER) -> float:
+    """Интервал до следующего опроса по последнему статусу работы.
+
+    Сразу после смены статуса студент опрашивается с базовым интервалом
+    статуса, а чем дольше статус не меняется, тем реже (до двух раз).
+    """
+    base = STATUS_INTERVALS.get(status, RETRY_TIME)
+    age = max(now - changed_at, 0) if changed_at else 0
+    interval = base * (1 + min(age / STALE_AFTER, 1))
+    interval *= 1 + random.uniform(-jitter, jitter)
+    return min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+
+
+class PollScheduler:
+    """Очередь студентов по времени следующего опроса с общим бюджетом.
+
+    Сроки хранятся в колесе таймеров, поэтому постановка и выдача
+    студента стоят O(1) при любом их числе. Бюджет задаётся в запросах
+    в секунду и работает как token bucket: если просроченных студентов
+    больше, чем позволяет бюджет, остальные ждут следующего тика в
+    порядке очереди.
+    """
+
+    def __init__(self, tenants=(), budget: float = POLL_BUDGET,
+                 clock=time.monotonic) -> None:
+        """Очередь, где студенты tenants сразу ждут первого опроса."""
+        self.budget = budget
+        self.clock = clock
+        self._wheel = TimingWheel(clock())
+        self._bucket = TokenBucket(budget, clock=clock)
+        now = clock()
+        for tenant in tenants:
+            self.schedule(tenant, max(tenant.next_poll_at, now))
+
+    def __len__(self) -> int:
+        """Число постановок в очереди."""
+        return len(self._wheel)
+
+    def schedule(self, tenant, when: float) -> None:
+        """Постановка студента в очередь на момент when."""
+        tenant.next_poll_at = when
+        self._wheel.add((tenant, when), when)
+
+    def set_budget(self, budget: float) -> None:
+        """Новый бюджет, например доля воркера при шардировании."""
+        self._bucket.wait_time()
+        self.budget = self._bucket.rate = self._bucket.capacity = budget
+        self._bucket.tokens = min(self._bucket.tokens, budget)
+
+    def reschedule(self, tenant) -> None:
+        """Планирование следующего опроса по статусу студента."""
+        interval = next_interval(
+            tenant.status, tenant.status_changed_at, time.time()
+        )
+        self.schedule(tenant, self.clock() + interval)
+
+    def due(self) -> list:
+        """Студенты, которых пора опросить, в пределах бюджета.
+
+        Записи, срок которых уже перенесён новым schedule(), пропускаются:
+        у каждого студента действует только последняя постановка.
+        """
+        self._wheel.advance(self.clock())
+        tenants = []
+        while self._wheel.ready():
+            tenant, when = self._wheel.peek()
+            if tenant.next_poll_at == when:
+                if not self._bucket.try_take():
+                    break
+                tenants.append(tenant)
+            self._wheel.pop()
+        return tenants
+
+    def overdue(self) -> int:
+        """Число просроченных студентов на момент последнего due().
+
+        Вызывается и из потока сервера метрик, поэтому колесо не двигает.
+        """
+        return self._wheel.ready()
+
+    def wait_time(self) -> float:
+        """Сколько секунд можно спать до следующего опроса."""
+        if not self._wheel:
+            return MIN_INTERVAL
+        now = self.clock()
+        self._wheel.advance(now)
+        if not self._wheel.ready():
+            return self._wheel.next_in(now)
+        return self._bucket.wait_time()
@@ -0,0 +1,228 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import homework
+import metrics
+import profiling
+
+from ratelimit import TokenBucket
+
+SEND_WORKERS = int(os.getenv('SEND_WORKERS', 8))
+TELEGRAM_GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', 30))
+TELEGRAM_CHAT_RATE = float(os.getenv('TELEGRAM_CHAT_RATE', 1))
+LATENCY_SAMPLES = 1000
+
+PRIORITY_VERDICT = 0
+PRIORITY_STATUS = 1
+PRIORITY_ERROR = 2
+
+FINAL_STATUSES = ('approved', 'rejected')
+
+DELIVERIES = metrics.REGISTRY.counter(
+    'homework_bot_deliveries_total', 'Исходы доставки сообщений в чаты',
+    ('outcome',),
+)
+
+
+def message_priority(status) -> int:
+    """Приоритет уведомления: итоговый вердикт, смена статуса, ошибка."""
+    if status in FINAL_STATUSES:
+        return PRIORITY_VERDICT
+    if status is None:
+        return PRIORITY_ERROR
+    return PRIORITY_STATUS
+
+
+def percentile(samples, fraction: float) -> float:
+    """Перцентиль по выборке без интерполяции."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class SendQueue:
+    """Очередь исходящих сообщений Telegram с приоритетами и лимитами.
+
+    Воркеры берут сообщения по приоритету и соблюдают два ограничения
+    Telegram: общее число сообщений в секунду и сообщения в один чат.
+    Сообщения чата ждут в его собственной очереди, и воркерам передаётся
+    одно сообщение чата, когда его лимит это позволяет: поток сообщений
+    в один чат не занимает воркеров и не задерживает другие чаты.
+    Воркеры работают параллельно, поэтому рассылка одного события в
+    несколько чатов занимает примерно одну отправку. Для каждого чата,
+    куда последнее сообщение не доставлено, хранится время сбоя.
+    """
+
+    def __init__(self, bot, workers: int = SEND_WORKERS,
+                 global_rate: float = TELEGRAM_GLOBAL_RATE,
+                 chat_rate: float = TELEGRAM_CHAT_RATE) -> None:
+        """Очередь с workers воркерами и лимитами Telegram."""
+        self.bot = bot
+        self.workers = workers
+        self.chat_rate = chat_rate
+        self._global = TokenBucket(global_rate)
+        self._chats = {}
+        self._queue = None
+        self._pending = {}
+        self._timers = {}
+        self._waiting = 0
+        self._unfinished = 0
+        self._idle = None
+        self._loop = None
+        self._tasks = []
+        self._counter = itertools.count()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.sent = 0
+        self.delivered = 0
+        self.failed = 0
+        self.failures = {}
+
+    def start(self) -> None:
+        """Запуск воркеров в текущем цикле событий."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.PriorityQueue()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+    def put(self, chat_id, message: str,
+            priority: int = PRIORITY_STATUS) -> None:
+        """Постановка сообщения в очередь на отправку.
+
+        Замеры опроса, поставившего сообщение, ждут его отправки.
+        Сообщение передаётся воркерам на следующей итерации цикла
+        событий, чтобы пачка сообщений в чат ушла по приоритету.
+        """
+        timings = profiling.current()
+        if timings is not None:
+            timings.hold()
+        entry = (
+            priority, next(self._counter), chat_id, message,
+            time.monotonic(), timings,
+        )
+        self._waiting += 1
+        self._unfinished += 1
+        self._idle.clear()
+        pending = self._pending.get(chat_id)
+        if pending is not None:
+            heapq.heappush(pending, entry)
+            return
+        self._pending[chat_id] = [entry]
+        self._timers[chat_id] = self._loop.call_soon(self._release, chat_id)
+
+    def _release(self, chat_id) -> None:
+        """Передача воркерам следующего сообщения чата по его лимиту.
+
+        Пока сообщение чата у воркеров, следующее ждёт в очереди чата;
+        если лимит чата исчерпан, передача откладывается таймером.
+        """
+        self._timers.pop(chat_id, None)
+        pending = self._pending[chat_id]
+        if not pending:
+            del self._pending[chat_id]
+            return
+        bucket = self._chat_bucket(chat_id)
+        if not bucket.try_take():
+            self._timers[chat_id] = self._loop.call_later(
+                bucket.wait_time(), self._release, chat_id
+            )
+            return
+        self._queue.put_nowait(heapq.heappop(pending))
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        """Ограничитель сообщений в один чат."""
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, 1)
+        return bucket
+
+    async def _worker(self) -> None:
+        """Отправка сообщений из очереди с соблюдением лимитов."""
+        loop = asyncio.get_running_loop()
+        while True:
+            (_, _, chat_id, message, queued_at,
+             timings) = await self._queue.get()
+            self._waiting -= 1
+            try:
+                await asyncio.sleep(self._global.reserve())
+                with profiling.stage('send', timings):
+                    delivered = await loop.run_in_executor(
+                        self._executor, homework.send_chat_message,
+                        self.bot, chat_id, message
+                    )
+                self._latencies.append(time.monotonic() - queued_at)
+                self.sent += 1
+                self._record_delivery(chat_id, delivered is not False)
+            except Exception as error:
+                homework.logger.error('Сбой отправки сообщения: %s', error)
+                self._record_delivery(chat_id, False)
+            finally:
+                if timings is not None:
+                    timings.release()
+                self._queue.task_done()
+                self._done(chat_id)
+
+    def _done(self, chat_id) -> None:
+        """Учёт отправленного сообщения и передача следующего в чат."""
+        self._release(chat_id)
+        self._unfinished -= 1
+        if not self._unfinished:
+            self._idle.set()
+
+    def _record_delivery(self, chat_id, delivered: bool) -> None:
+        """Учёт исхода доставки в чат."""
+        if delivered:
+            self.delivered += 1
+            self.failures.pop(chat_id, None)
+            DELIVERIES.inc('delivered')
+        else:
+            self.failed += 1
+            self.failures[chat_id] = time.time()
+            DELIVERIES.inc('failed')
+
+    async def join(self) -> None:
+        """Ожидание отправки всех сообщений из очереди."""
+        await self._idle.wait()
+
+    async def stop(self) -> None:
+        """Остановка воркеров и таймеров очередей чатов."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers = {}
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def prune(self) -> None:
+        """Удаление ограничителей чатов, в которые давно не писали."""
+        self._chats = {
+            chat_id: bucket for chat_id, bucket in self._chats.items()
+            if chat_id in self._pending or not bucket.is_full()
+        }
+
+    def depth(self) -> int:
+        """Число сообщений, ожидающих отправки."""
+        return self._waiting
+
+    def stats(self) -> dict:
+        """Глубина очереди, исходы доставки и задержка (p50/p99, секунды)."""
+        return {
+            'depth': self.depth(),
+            'sent': self.sent,
+            'delivered': self.delivered,
+            'failed': self.failed,
+            'failing_chats': len(self.failures),
+            'latency_p50': percentile(self._latencies, 0.5),
+            'latency_p99': percentile(self._latencies, 0.99),
+        }
@@ -0,0 +1,220 @@
+import hashlib
+import os
+import socket
+import sqlite3
+import time
+
+from bisect import bisect
+
+from storage import STATE_DB
+
+SHARDING = os.getenv('SHARDING') == '1'
+WORKER_ID = (
+    os.getenv('WORKER_ID') or os.getenv('DYNO')
+    or f'{socket.gethostname()}-{os.getpid()}'
+)
+LEASE_DB = os.getenv('LEASE_DB', STATE_DB)
+LEASE_TTL = float(os.getenv('LEASE_TTL', 30))
+RING_REPLICAS = 128
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    heartbeat_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS leases (
+    tenant TEXT PRIMARY KEY,
+    worker_id TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+'''
+
+ACQUIRE = '''
+INSERT INTO leases (tenant, worker_id, expires_at) VALUES (?, ?, ?)
+ON CONFLICT (tenant) DO UPDATE SET
+    worker_id = excluded.worker_id,
+    expires_at = excluded.expires_at
+WHERE leases.worker_id = excluded.worker_id OR leases.expires_at <= ?
+'''
+
+
+def ring_hash(key: str) -> int:
+    """Позиция ключа на кольце."""
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+def tenant_key(tenant) -> str:
+    """Ключ студента в таблице аренды; токен в базу не попадает."""
+    return hashlib.blake2b(
+        f'{tenant.token}:{tenant.chat_id}'.encode(), digest_size=12
+    ).hexdigest()
+
+
+def ring_key(tenant) -> str:
+    """Позиция студента на кольце по токену, а не по чату.
+
+    Подписки на один токен попадают к одному воркеру и делят запросы.
+    """
+    return hashlib.blake2b(tenant.token.encode(), digest_size=12).hexdigest()
+
+
+class HashRing:
+    """Консистентное хеширование: у каждого воркера replicas точек.
+
+    При добавлении или уходе одного из N воркеров к другому владельцу
+    переходит примерно 1/N ключей, остальные остаются на месте.
+    """
+
+    def __init__(self, members=(), replicas: int = RING_REPLICAS) -> None:
+        """Кольцо из replicas точек на каждого участника."""
+        points = sorted(
+            (ring_hash(f'{member}#{replica}'), member)
+            for member in members
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._members = [member for _, member in points]
+
+    def owner(self, key: str):
+        """Воркер, которому принадлежит ключ; None, если воркеров нет."""
+        if not self._hashes:
+            return None
+        index = bisect(self._hashes, ring_hash(key)) % len(self._hashes)
+        return self._members[index]
+
+
+class LeaseTable:
+    """Пульс воркеров и аренда студентов в SQLite, общей для процессов."""
+
+    def __init__(self, path: str = LEASE_DB, ttl: float = LEASE_TTL) -> None:
+        """Подключение к базе аренды path со сроком аренды ttl."""
+        self.ttl = ttl
+        self._connection = sqlite3.connect(path, timeout=ttl)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(SCHEMA)
+
+    def heartbeat(self, worker_id: str, now: float) -> list:
+        """Отметка воркера; возвращает живых воркеров."""
+        with self._connection:
+            self._connection.execute(
+                'INSERT INTO workers (worker_id, heartbeat_at) VALUES (?, ?) '
+                'ON CONFLICT (worker_id) DO UPDATE SET '
+                'heartbeat_at = excluded.heartbeat_at',
+                (worker_id, now),
+            )
+        rows = self._connection.execute(
+            'SELECT worker_id FROM workers WHERE heartbeat_at > ?',
+            (now - self.ttl,),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def acquire(self, worker_id: str, keys, now: float) -> set:
+        """Продление своей аренды и захват свободной; возвращает свои ключи.
+
+        Чужая аренда перехватывается только после истечения срока,
+        поэтому студента в каждый момент опрашивает один воркер.
+        """
+        expires_at = now + self.ttl
+        with self._connection:
+            self._connection.executemany(
+                ACQUIRE, ((key, worker_id, expires_at, now) for key in keys)
+            )
+        rows = self._connection.execute(
+            'SELECT tenant FROM leases WHERE worker_id = ? AND expires_at = ?',
+            (worker_id, expires_at),
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def release(self, worker_id: str, keys) -> None:
+        """Освобождение аренды, чтобы новый владелец не ждал её истечения."""
+        with self._connection:
+            self._connection.executemany(
+                'DELETE FROM leases WHERE tenant = ? AND worker_id = ?',
+                ((key, worker_id) for key in keys),
+            )
+
+    def leave(self, worker_id: str) -> None:
+        """Уход воркера: его студенты сразу достаются остальным."""
+        with self._connection:
+            self._connection.execute(
+                'DELETE FROM workers WHERE worker_id = ?', (worker_id,)
+            )
+            self._connection.execute(
+                'DELETE FROM leases WHERE worker_id = ?', (worker_id,)
+            )
+
+    def close(self) -> None:
+        """Закрытие соединения с базой."""
+        self._connection.close()
+
+
+class Shard:
+    """Доля студентов одного воркера: кольцо воркеров плюс аренда.
+
+    Студента опрашивает только тот воркер, которому он принадлежит по
+    кольцу и который держит его аренду. Аренда продлевается при каждом
+    rebalance, поэтому его нужно вызывать чаще, чем раз в ttl секунд.
+    """
+
+    def __init__(self, table: LeaseTable, worker_id: str = WORKER_ID,
+                 clock=time.time) -> None:
+        """Доля воркера worker_id в таблице аренды table."""
+        self.table = table
+        self.worker_id = worker_id
+        self.clock = clock
+        self.members = []
+        self.owned = set()
+        self._wanted = set()
+        self._expires_at = 0
+
+    def assign(self, placement: dict) -> None:
+        """Пульс и пересчёт кольца: какие студенты теперь наши.
+
+        placement — ключ аренды студента и его ключ на кольце.
+        """
+        now = self.clock()
+        self.members = self.table.heartbeat(self.worker_id, now)
+        ring = HashRing(self.members)
+        self._wanted = {
+            key for key, position in placement.items()
+            if ring.owner(position) == self.worker_id
+        }
+
+    def release(self, busy=()) -> set:
+        """Освобождение студентов, ушедших другим воркерам.
+
+        Перед вызовом их состояние должно быть сохранено. Студенты из
+        busy (опрос ещё идёт) освобождаются при следующем вызове.
+        """
+        lost = self.owned - self._wanted - set(busy)
+        self.table.release(self.worker_id, lost)
+        self.owned -= lost
+        return lost
+
+    def acquire(self) -> set:
+        """Продление аренды; возвращает ключи новых студентов."""
+        now = self.clock()
+        owned = self.table.acquire(self.worker_id, self._wanted, now)
+        gained = owned - self.owned
+        self.owned = owned | (self.owned - self._wanted)
+        self._expires_at = now + self.table.ttl
+        return gained
+
+    def wants(self, key: str) -> bool:
+        """Принадлежит ли студент этому воркеру по кольцу."""
+        return key in self._wanted
+
+    def owns(self, key: str) -> bool:
+        """Можно ли сейчас опрашивать студента с этим ключом."""
+        return (
+            key in self._wanted and key in self.owned
+            and self.clock() < self._expires_at
+        )
+
+    def leave(self) -> None:
+        """Освобождение всех студентов при остановке воркера."""
+        self.table.leave(self.worker_id)
+        self.owned = set()
+        self._wanted = set()
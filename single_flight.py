@@ -0,0 +1,58 @@
+import asyncio
+
+import metrics
+
+SHARED_CALLS = metrics.REGISTRY.counter(
+    'homework_bot_shared_calls_total',
+    'Вызовы, получившие результат одновременного вызова по тому же ключу',
+)
+
+
+class SingleFlight:
+    """Один общий вызов на ключ для одновременных запросов.
+
+    Пока вызов по ключу выполняется, остальные вызывающие ждут его
+    результат (или исключение) вместо собственного вызова. После
+    завершения ключ освобождается: результаты не кешируются.
+    """
+
+    def __init__(self) -> None:
+        """Пустой набор общих вызовов со счётчиками."""
+        self._flights = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key, func, *args, accept=None):
+        """Результат func(*args), общий для одновременных вызовов по key.
+
+        accept(args) решает, подходит ли уже идущий вызов с его
+        аргументами; если нет, выполняется отдельный вызов.
+        """
+        flight = self._flights.get(key)
+        if flight is not None and (accept is None or accept(flight[1])):
+            self.shared += 1
+            SHARED_CALLS.inc()
+            return await asyncio.shield(flight[0])
+        self.calls += 1
+        if flight is not None:
+            return await func(*args)
+        future = asyncio.get_running_loop().create_future()
+        self._flights[key] = future, args
+        try:
+            result = await func(*args)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
+
+    def stats(self) -> dict:
+        """Число собственных и общих вызовов."""
+        return {'calls': self.calls, 'shared': self.shared}
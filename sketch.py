@@ -0,0 +1,74 @@
+import math
+
+SKETCH_ACCURACY = 0.01
+
+
+class QuantileSketch:
+    """Потоковая оценка квантилей с относительной точностью (DDSketch).
+
+    Значение попадает в корзину с номером ceil(log_gamma(x)), где
+    gamma = (1 + accuracy) / (1 - accuracy): добавление — O(1), память
+    зависит от разброса значений, а не от их числа. Любой квантиль
+    оценивается с относительной ошибкой не больше accuracy. Наброски
+    складываются (merge), поэтому агрегаты по периодам объединяются.
+    """
+
+    __slots__ = ('accuracy', 'count', 'zeros', 'bins', '_log_gamma')
+
+    def __init__(self, accuracy: float = SKETCH_ACCURACY) -> None:
+        """Пустой набросок с относительной точностью accuracy."""
+        self.accuracy = accuracy
+        self.count = 0
+        self.zeros = 0
+        self.bins = {}
+        self._log_gamma = math.log((1 + accuracy) / (1 - accuracy))
+
+    def add(self, value: float) -> None:
+        """Учёт одного неотрицательного значения."""
+        self.count += 1
+        if value <= 0:
+            self.zeros += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + 1
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Добавление значений другого наброска с той же точностью."""
+        self.count += other.count
+        self.zeros += other.zeros
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+
+    def quantile(self, fraction: float):
+        """Оценка квантиля или None, если значений нет."""
+        if not self.count:
+            return None
+        rank = fraction * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                return 2 * math.exp(index * self._log_gamma) / (
+                    1 + math.exp(self._log_gamma)
+                )
+        return None
+
+    def to_dict(self) -> dict:
+        """Состояние для сохранения в JSON."""
+        return {
+            'accuracy': self.accuracy, 'zeros': self.zeros,
+            'bins': {str(index): count for index, count in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'QuantileSketch':
+        """Набросок из сохранённого состояния."""
+        sketch = cls(data['accuracy'])
+        sketch.zeros = data['zeros']
+        sketch.bins = {
+            int(index): count for index, count in data['bins'].items()
+        }
+        sketch.count = sketch.zeros + sum(sketch.bins.values())
+        return sketch
@@ -0,0 +1,120 @@
+import gc
+import hashlib
+import json
+import os
+import sqlite3
+
+from homework_index import HomeworkIndex
+
+STATE_DB = os.getenv('STATE_DB', 'homework_state.sqlite3')
+STATE_FLUSH_INTERVAL = float(os.getenv('STATE_FLUSH_INTERVAL', 5))
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tenants (
+    token TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    from_date INTEGER NOT NULL,
+    message_hash TEXT NOT NULL,
+    status TEXT,
+    status_changed_at REAL NOT NULL,
+    statuses TEXT NOT NULL,
+    PRIMARY KEY (token, chat_id)
+) WITHOUT ROWID
+'''
+
+UPSERT = '''
+INSERT INTO tenants (token, chat_id, from_date, message_hash, status,
+                     status_changed_at, statuses)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (token, chat_id) DO UPDATE SET
+    from_date = excluded.from_date,
+    message_hash = excluded.message_hash,
+    status = excluded.status,
+    status_changed_at = excluded.status_changed_at,
+    statuses = excluded.statuses
+'''
+
+
+def message_hash(message: str) -> str:
+    """Короткий хеш текста уведомления для проверки повторов."""
+    return hashlib.blake2b(message.encode(), digest_size=8).hexdigest()
+
+
+class StateStore:
+    """Состояние студентов в SQLite: from_date, последнее сообщение, статусы.
+
+    Запись идёт пачками в одной транзакции в режиме WAL, поэтому fsync
+    выполняется один раз на пачку, а не на каждого студента.
+    """
+
+    def __init__(self, path: str = STATE_DB) -> None:
+        """Подключение к базе path и создание таблицы."""
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(SCHEMA)
+        self._connection.commit()
+
+    def load(self) -> dict:
+        """Все сохранённые состояния по ключу (token, chat_id).
+
+        Статусы всех студентов разбираются одним вызовом json.loads:
+        на 100k строк это в разы быстрее, чем разбор каждой по отдельности.
+        """
+        rows = self._connection.execute(
+            'SELECT token, chat_id, from_date, message_hash, status, '
+            'status_changed_at, statuses FROM tenants'
+        ).fetchall()
+        statuses = json.loads('[' + ','.join(row[6] for row in rows) + ']')
+        return {
+            (row[0], row[1]): (row[2], row[3], row[4], row[5], decoded)
+            for row, decoded in zip(rows, statuses)
+        }
+
+    def restore(self, tenants: list) -> int:
+        """Восстановление состояния студентов после перезапуска.
+
+        На время загрузки сборщик мусора отключается: сотни тысяч
+        создаваемых кортежей иначе запускают его десятки раз.
+        """
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._restore(tenants)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _restore(self, tenants: list) -> int:
+        """Перенос сохранённых состояний в объекты студентов."""
+        saved = self.load()
+        restored = 0
+        for tenant in tenants:
+            row = saved.get((tenant.token, str(tenant.chat_id)))
+            if row is None:
+                continue
+            (tenant.timestamp, tenant.message_hash, tenant.status,
+             tenant.status_changed_at, statuses) = row
+            tenant.statuses = HomeworkIndex.from_dict(statuses)
+            restored += 1
+        return restored
+
+    def save(self, tenants) -> None:
+        """Сохранение состояния студентов одной транзакцией."""
+        rows = [
+            (
+                tenant.token, str(tenant.chat_id), tenant.timestamp,
+                tenant.message_hash, tenant.status, tenant.status_changed_at,
+                json.dumps(dict(tenant.statuses), ensure_ascii=False),
+            )
+            for tenant in tenants
+        ]
+        if not rows:
+            return
+        with self._connection:
+            self._connection.executemany(UPSERT, rows)
+
+    def close(self) -> None:
+        """Закрытие соединения с базой."""
+        self._connection.close()
@@ -0,0 +1,135 @@
+import codecs
+import json
+import re
+import time
+
+import homework
+import metrics
+
+HOMEWORKS_ARRAY = re.compile(r'"homeworks"\s*:\s*\[')
+SEPARATORS = ' \t\r\n,'
+COMPACT_AFTER = 64 * 1024
+
+
+def is_top_level(prefix: str) -> bool:
+    """Ключ homeworks найден на верхнем уровне ответа, а не внутри."""
+    try:
+        json.loads(prefix + '[]}')
+    except json.JSONDecodeError:
+        return False
+    return True
+
+
+class HomeworksStream:
+    """Потоковый разбор ответа API: работы выдаются по одной.
+
+    Массив homeworks декодируется по элементам через raw_decode, поэтому
+    в памяти одновременно держится только текущий кусок ответа и одна
+    работа. Остальные ключи ответа (current_date) после полного чтения
+    доступны в response, как если бы homeworks был пустым списком.
+    При strict=False элементы, не являющиеся словарями, выдаются как
+    есть, чтобы их отбросила проверка работ (validation). Если задан
+    stage, время от started до конца чтения ответа и ошибки разбора
+    учитываются в метриках этого этапа.
+    """
+
+    def __init__(self, chunks, close=None, strict: bool = True,
+                 stage: str = None, started: float = None) -> None:
+        """Поток по кускам ответа chunks; close закрывает ответ."""
+        self._chunks = iter(chunks)
+        self._close = close
+        self.strict = strict
+        self.stage = stage
+        self.started = time.perf_counter() if started is None else started
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self.response = None
+        self.first = None
+        self.count = 0
+
+    def _read(self):
+        """Следующий кусок ответа как текст или None в конце потока."""
+        for chunk in self._chunks:
+            text = self._text.decode(chunk)
+            if text:
+                return text
+        return self._text.decode(b'', final=True) or None
+
+    def _read_all(self, buffer: str) -> str:
+        """Дочитывание остатка ответа."""
+        parts = [buffer]
+        chunk = self._read()
+        while chunk is not None:
+            parts.append(chunk)
+            chunk = self._read()
+        return ''.join(parts)
+
+    def _seek_array(self):
+        """Поиск начала массива homeworks; возвращает префикс и остаток."""
+        buffer = ''
+        while True:
+            match = HOMEWORKS_ARRAY.search(buffer)
+            if match:
+                prefix = buffer[:match.end() - 1]
+                if is_top_level(prefix):
+                    return prefix, buffer[match.end():]
+                return None, self._read_all(buffer)
+            chunk = self._read()
+            if chunk is None:
+                return None, buffer
+            buffer += chunk
+
+    def _validated(self, item) -> dict:
+        """Проверка одной работы и учёт её в счётчиках."""
+        if not isinstance(item, dict):
+            if not self.strict:
+                return item
+            homework.logger.error('В списке работ не словарь')
+            raise TypeError('В списке работ не словарь')
+        if self.first is None:
+            self.first = item
+        self.count += 1
+        return item
+
+    def _items(self, buffer: str):
+        """Работы из массива homeworks; возвращает текст после массива."""
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in SEPARATORS:
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']':
+                return buffer[pos + 1:]
+            try:
+                item, pos = self._json.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                chunk = self._read()
+                if chunk is None:
+                    raise
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield self._validated(item)
+            if pos > COMPACT_AFTER:
+                buffer, pos = buffer[pos:], 0
+
+    def __iter__(self):
+        """Работы по мере чтения ответа; после чтения ответ закрывается."""
+        try:
+            prefix, buffer = self._seek_array()
+            if prefix is None:
+                self.response = json.loads(buffer)
+                for item in homework.check_response(self.response):
+                    yield self._validated(item)
+                return
+            rest = yield from self._items(buffer)
+            self.response = json.loads(prefix + '[]' + self._read_all(rest))
+        except Exception as error:
+            if self.stage is not None:
+                metrics.EXCEPTIONS.inc(type(error).__name__)
+            raise
+        finally:
+            if self._close is not None:
+                self._close()
+            if self.stage is not None:
+                metrics.STAGE_SECONDS.observe(
+                    time.perf_counter() - self.started, self.stage
+                )
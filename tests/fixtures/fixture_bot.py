@@ -0,0 +1,53 @@
+import time
+
+import pytest
+
+
+class MockBot:
+
+    def __init__(self):
+        self.sent = []
+        self.sent_at = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text))
+        self.sent_at.append(time.monotonic())
+
+    def texts(self, chat_id=None):
+        return [
+            text for chat, text in self.sent
+            if chat_id is None or chat == chat_id
+        ]
+
+
+@pytest.fixture
+def mock_bot():
+    return MockBot()
+
+
+@pytest.fixture
+def api_answer(monkeypatch):
+    """Подмена ответа API: работы — список или функция от токена.
+
+    Возвращает список вызовов (token, current_timestamp).
+    """
+    import homework
+
+    calls = []
+
+    def install(homeworks=(), current_date=1, delay=0):
+        def mock_answer(token, current_timestamp):
+            calls.append((token, current_timestamp))
+            if delay:
+                time.sleep(delay)
+            if callable(homeworks):
+                return {
+                    'homeworks': homeworks(token),
+                    'current_date': current_date,
+                }
+            return {'homeworks': list(homeworks), 'current_date': current_date}
+
+        monkeypatch.setattr(homework, 'get_token_api_answer', mock_answer)
+        return calls
+
+    return install
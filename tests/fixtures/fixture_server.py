@@ -0,0 +1,17 @@
+import pytest
+
+from benchmarks.stubs import StubPracticum, StubTelegram
+
+
+@pytest.fixture
+def stub_practicum():
+    stub = StubPracticum().start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def stub_telegram():
+    stub = StubTelegram().start()
+    yield stub
+    stub.stop()
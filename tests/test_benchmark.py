@@ -0,0 +1,39 @@
+class TestBenchmark:
+
+    def test_scenario_drives_full_pipeline(self):
+        from benchmarks import bench
+
+        result = bench.run_scenario(100, cycles=2, change_rate=0.5)
+
+        assert result['api_requests'] == 200, (
+            'Каждый цикл опрашивает каждого студента'
+        )
+        assert result['messages'] > 100, (
+            'Первый цикл уведомляет всех, второй — тех, чей статус сменился'
+        )
+        assert result['polls_per_sec'] > 0
+        assert result['poll_p50'] <= result['poll_p99']
+        assert result['rss_mb'] > 0
+
+    def test_errors_are_survived(self):
+        import retry
+        from benchmarks import bench
+
+        result = bench.run_scenario(20, cycles=1, error_rate=0.5)
+        assert result['api_errors'] > 0
+        assert result['api_requests'] <= (
+            20 * (1 + retry.RETRY_BUDGET_RATIO) + retry.RETRY_BUDGET_BURST
+        ), (
+            'После серии ошибок предохранитель перестаёт пускать запросы, '
+            'а повторы не выходят за бюджет'
+        )
+
+    def test_compare_detects_regression(self):
+        from benchmarks import bench
+
+        base = {'polls_per_sec': 100, 'poll_p99': 0.1, 'cycle_p99': 1,
+                'rss_mb': 50}
+        current = dict(base, tenants=1, polls_per_sec=50)
+        regressions = bench.compare([current], {'1': base}, tolerance=0.25)
+        assert [key for _, key, _, _ in regressions] == ['polls_per_sec']
+        assert bench.compare([dict(base, tenants=1)], {'1': base}, 0.25) == []
@@ -0,0 +1,135 @@
+import pytest
+import requests
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    import circuit_breaker
+
+    circuit_breaker.reset_breakers()
+    yield
+    circuit_breaker.reset_breakers()
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_failures_and_recovers(self):
+        import circuit_breaker
+
+        clock = FakeClock()
+        breaker = circuit_breaker.CircuitBreaker(
+            'api', failures=3, reset_timeout=10, probes=1, clock=clock
+        )
+        states = []
+        breaker.add_listener(lambda _, state: states.append(state))
+
+        for _ in range(3):
+            assert breaker.allow()
+            breaker.record_failure()
+        assert breaker.state == circuit_breaker.OPEN
+        assert not breaker.allow(), (
+            'Разомкнутый предохранитель не пропускает запросы'
+        )
+
+        clock.now = 10
+        assert breaker.allow(), 'После паузы пропускается пробный запрос'
+        assert not breaker.allow(), 'Пробных запросов не больше probes'
+        breaker.record_status(500)
+        assert breaker.state == circuit_breaker.OPEN
+
+        clock.now = 20
+        assert breaker.allow()
+        breaker.record_status(200)
+        assert breaker.state == circuit_breaker.CLOSED
+        assert states == [
+            circuit_breaker.OPEN, circuit_breaker.HALF_OPEN,
+            circuit_breaker.OPEN, circuit_breaker.HALF_OPEN,
+            circuit_breaker.CLOSED,
+        ]
+
+    def test_success_resets_failure_count(self):
+        import circuit_breaker
+
+        breaker = circuit_breaker.CircuitBreaker('api', failures=2)
+        breaker.record_failure()
+        breaker.record_status(404)
+        breaker.record_failure()
+        assert breaker.state == circuit_breaker.CLOSED, (
+            'Ошибки считаются только подряд, 4xx не считается сбоем'
+        )
+
+    def test_open_breaker_skips_request(self, monkeypatch):
+        import circuit_breaker
+        import homework
+        import http_client
+        import retry
+        from exceptions import CircuitOpenError
+
+        calls = []
+        monkeypatch.setattr(
+            retry, 'get_budget', lambda host: retry.RetryBudget(burst=0)
+        )
+
+        class MockSession:
+            def get(self, *args, **kwargs):
+                calls.append(args)
+                raise requests.ConnectionError('down')
+
+        monkeypatch.setattr(http_client, 'get_session', MockSession)
+        breaker = circuit_breaker.get_breaker(homework.ENDPOINT)
+        for _ in range(breaker.failures):
+            with pytest.raises(requests.ConnectionError):
+                homework.request_api({}, 1)
+        with pytest.raises(CircuitOpenError):
+            homework.request_api({}, 1)
+        assert len(calls) == breaker.failures, (
+            'При разомкнутом предохранителе запрос не уходит в сеть'
+        )
+
+    def test_interrupted_probe_is_released(self, monkeypatch):
+        import circuit_breaker
+        import homework
+        import http_client
+        from exceptions import DeadlineExceededError
+
+        class HungSession:
+            def get(self, *args, **kwargs):
+                raise DeadlineExceededError(msg='hedge timed out', code='')
+
+        monkeypatch.setattr(http_client, 'get_session', HungSession)
+        breaker = circuit_breaker.get_breaker(homework.ENDPOINT)
+        breaker.state = circuit_breaker.HALF_OPEN
+        for _ in range(breaker.probes + 1):
+            with pytest.raises(DeadlineExceededError):
+                homework.request_api({}, 1)
+        assert breaker.allow(), (
+            'Прерванная проба освобождает слот, предохранитель не залипает'
+        )
+
+    def test_outage_sends_single_notice(self, monkeypatch, mock_bot):
+        import asyncio
+        import engine
+        import homework
+
+        def mock_get(*args, **kwargs):
+            raise requests.ConnectionError('down')
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        monkeypatch.setattr(homework, 'ADMIN_CHAT_ID', 'admin')
+        tenants = [engine.Tenant(token=f't{i}', chat_id=i) for i in range(20)]
+        asyncio.run(engine.PollingEngine(mock_bot, tenants).run_cycle())
+
+        sent = mock_bot.sent
+        assert sent == [('admin', sent[0][1])], (
+            'При недоступности API отправляется одно общее уведомление'
+        )
+        assert 'недоступен' in sent[0][1]
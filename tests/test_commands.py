@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+
+class TestStatusCommand:
+
+    def test_reply_from_memory(self, monkeypatch, mock_bot):
+        import commands
+        import engine
+        import homework
+
+        def mock_answer(token, current_timestamp):
+            raise AssertionError('Ответ на /status не ходит в API')
+
+        monkeypatch.setattr(homework, 'get_token_api_answer', mock_answer)
+        tenant = engine.Tenant(
+            token='t', chat_id=1, status='approved', polled_at=time.time()
+        )
+        command = commands.StatusCommand(
+            engine.PollingEngine(mock_bot, [tenant])
+        )
+        reply = command.reply(1)
+        assert homework.HOMEWORK_STATUSES['approved'] in reply
+        assert commands.REFRESHING not in reply
+        assert command.reply(2) == commands.NOT_SUBSCRIBED
+
+    def test_burst_triggers_single_refresh(self, api_answer, mock_bot):
+        import commands
+        import engine
+
+        calls = api_answer(
+            [{'homework_name': 'hw', 'status': 'approved'}], delay=0.05
+        )
+        tenant = engine.Tenant(token='t', chat_id=1, status='reviewing')
+        polling = engine.PollingEngine(mock_bot, [tenant])
+        command = commands.StatusCommand(polling, max_age=60)
+
+        async def burst():
+            polling._start()
+            try:
+                replies = [command.reply(1) for _ in range(100)]
+                await asyncio.sleep(0.2)
+                await polling.sender.join()
+            finally:
+                await polling._stop()
+            return replies
+
+        replies = asyncio.run(burst())
+        assert all(commands.REFRESHING in reply for reply in replies)
+        assert [token for token, _ in calls] == ['t'], (
+            'Поток команд по устаревшим данным вызывает один запрос к API'
+        )
+        assert tenant.status == 'approved'
+        assert polling.bot.sent, 'О новом статусе приходит уведомление'
+        assert commands.REFRESHING not in command.reply(1)
+
+    def test_updater_stops_in_background(self):
+        import commands
+
+        class SlowUpdater:
+            stopped = False
+
+            def stop(self):
+                time.sleep(0.2)
+                self.stopped = True
+
+        updater = SlowUpdater()
+        started = time.perf_counter()
+        thread = commands.stop_updater(updater)
+        assert time.perf_counter() - started < 0.1, (
+            'Остановка long polling не задерживает дописывание очереди'
+        )
+        thread.join(1)
+        assert updater.stopped
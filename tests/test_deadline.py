@@ -0,0 +1,123 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+import requests
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDeadline:
+
+    def test_scope_nesting_and_timeouts(self):
+        import deadline
+        from exceptions import DeadlineExceededError
+
+        clock = FakeClock()
+        assert deadline.remaining() == float('inf')
+        with deadline.scope(5, clock):
+            with deadline.scope(60, clock):
+                assert deadline.remaining() == 5, 'Внешний срок короче'
+                assert deadline.timeouts(connect=3, read=10) == (3, 5)
+            clock.now += 5
+            with pytest.raises(DeadlineExceededError):
+                deadline.timeouts()
+        assert deadline.current() is None
+
+    def test_hung_socket_is_bounded(self, monkeypatch):
+        import circuit_breaker
+        import deadline
+        import homework
+        import http_client
+
+        server = socket.socket()
+        server.bind(('127.0.0.1', 0))
+        server.listen(8)
+        port = server.getsockname()[1]
+        monkeypatch.setattr(
+            homework, 'ENDPOINT', f'http://127.0.0.1:{port}/statuses/'
+        )
+        monkeypatch.setattr(http_client, 'get_session', lambda: None)
+        circuit_breaker.reset_breakers()
+        started = time.perf_counter()
+        try:
+            with deadline.scope(1):
+                with pytest.raises(Exception):
+                    homework.request_api({}, 1)
+        finally:
+            server.close()
+            circuit_breaker.reset_breakers()
+        assert time.perf_counter() - started < 2, (
+            'Зависшее соединение не держит опрос дольше срока'
+        )
+
+    def test_engine_propagates_deadline(self, monkeypatch, mock_bot):
+        import deadline
+        import engine
+        import homework
+
+        seen = []
+
+        def mock_answer(token, current_timestamp):
+            seen.append(deadline.remaining())
+            return {'homeworks': [], 'current_date': 1}
+
+        monkeypatch.setattr(homework, 'get_token_api_answer', mock_answer)
+        tenant = engine.Tenant(token='t', chat_id=1)
+        asyncio.run(engine.PollingEngine(mock_bot, [tenant]).run_cycle())
+        assert seen and seen[0] <= deadline.POLL_DEADLINE, (
+            'Запрос в пуле потоков видит срок опроса'
+        )
+
+    def test_hedged_request_cuts_tail(self):
+        import hedging
+
+        hedger = hedging.Hedger(workers=4)
+        for _ in range(hedging.HEDGE_MIN_SAMPLES):
+            hedger.latency.observe(0.01)
+        calls = []
+        lock = threading.Lock()
+
+        def request():
+            with lock:
+                calls.append(1)
+                first = len(calls) == 1
+            time.sleep(1 if first else 0.01)
+            return 'first' if first else 'hedge'
+
+        started = time.perf_counter()
+        try:
+            assert hedger.call(request) == 'hedge'
+        finally:
+            hedger.close()
+        assert time.perf_counter() - started < 0.5
+        assert len(calls) == 2
+
+    def test_hedge_keeps_first_success(self):
+        import hedging
+
+        hedger = hedging.Hedger(workers=4)
+        for _ in range(hedging.HEDGE_MIN_SAMPLES):
+            hedger.latency.observe(0.01)
+        calls = []
+
+        def request():
+            calls.append(1)
+            if len(calls) == 2:
+                raise requests.ConnectionError('hedge failed')
+            time.sleep(0.1)
+            return 'first'
+
+        try:
+            assert hedger.call(request) == 'first'
+        finally:
+            hedger.close()
@@ -0,0 +1,47 @@
+class TestDiff:
+
+    def test_every_transition_is_reported(self):
+        import diff
+
+        index = {}
+        homeworks = [
+            {'id': 2, 'homework_name': 'hw2', 'status': 'reviewing'},
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+        ]
+        changes = diff.diff_homeworks(index, homeworks)
+        assert [item['homework_name'] for _, item in changes] == [
+            'hw1', 'hw2'
+        ], 'Изменения всех работ выдаются от старых к новым'
+        assert index == {}, 'Индекс не меняется до apply_changes'
+
+        diff.apply_changes(index, changes)
+        assert index == {'1': 'approved', '2': 'reviewing'}
+        assert diff.diff_homeworks(index, homeworks) == []
+
+        homeworks[0]['status'] = 'rejected'
+        changes = diff.diff_homeworks(index, homeworks)
+        assert [key for key, _ in changes] == ['2']
+
+    def test_key_falls_back_to_name(self):
+        import diff
+
+        assert diff.homework_key({'homework_name': 'hw'}) == 'hw'
+        assert diff.homework_key({'id': 5, 'homework_name': 'hw'}) == '5'
+
+    def test_engine_notifies_each_homework(self, api_answer, mock_bot):
+        import asyncio
+        import engine
+
+        api_answer([
+            {'homework_name': 'hw2', 'status': 'reviewing'},
+            {'homework_name': 'hw1', 'status': 'approved'},
+        ])
+        tenant = engine.Tenant(token='t', chat_id=1)
+        asyncio.run(engine.PollingEngine(mock_bot, [tenant]).run_cycle())
+        sent = mock_bot.texts()
+
+        assert len(sent) == 2, (
+            'Уведомление отправляется по каждой работе из ответа'
+        )
+        assert '"hw1"' in sent[0] and '"hw2"' in sent[1]
+        assert tenant.status == 'reviewing'
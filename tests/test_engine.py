@@ -0,0 +1,174 @@
+import asyncio
+import threading
+import time
+
+from tests.fixtures.fixture_bot import MockBot
+
+
+class TestEngine:
+
+    def test_poll_many_tenants(self, api_answer, mock_bot, random_timestamp):
+        import engine
+
+        api_answer(
+            lambda token: [
+                {'homework_name': f'hw_{token}', 'status': 'approved'}
+            ],
+            current_date=random_timestamp,
+        )
+        tenants = [engine.Tenant(token=str(i), chat_id=i) for i in range(50)]
+        bot = mock_bot
+        asyncio.run(engine.PollingEngine(bot, tenants).run_cycle())
+
+        assert len(bot.sent) == len(tenants), (
+            'Каждый студент должен получить уведомление'
+        )
+        for tenant in tenants:
+            assert tenant.timestamp == random_timestamp, (
+                'После опроса from_date студента берётся из current_date'
+            )
+            assert tenant.statuses == {f'hw_{tenant.token}': 'approved'}
+
+        asyncio.run(engine.PollingEngine(bot, tenants).run_cycle())
+        assert len(bot.sent) == len(tenants), (
+            'Повторное уведомление о том же статусе не отправляется'
+        )
+
+    def test_broadcast_takes_one_send(self, monkeypatch, api_answer,
+                                      tmp_path):
+        import json
+
+        import engine
+        import homework
+
+        calls = api_answer(
+            [{'homework_name': 'hw', 'status': 'approved'}], current_date=10
+        )
+
+        class SlowBot(MockBot):
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                time.sleep(0.2)
+                super().send_message(chat_id, text)
+
+        tenants_file = tmp_path / 'tenants.json'
+        tenants_file.write_text(json.dumps([{
+            'practicum_token': 'student',
+            'chat_ids': ['student', 'mentor', 'cohort', 'dean'],
+        }]))
+        monkeypatch.setattr(homework, 'TENANTS_FILE', str(tenants_file))
+        tenants = engine.load_tenants()
+        assert [tenant.chat_id for tenant in tenants] == [
+            'student', 'mentor', 'cohort', 'dean'
+        ]
+        bot = SlowBot()
+        polling = engine.PollingEngine(bot, tenants)
+        started = time.perf_counter()
+        asyncio.run(polling.run_cycle())
+        elapsed = time.perf_counter() - started
+
+        assert [token for token, _ in calls] == ['student'], (
+            'Токен опрашивается один раз'
+        )
+        assert sorted(chat for chat, _ in bot.sent) == [
+            'cohort', 'dean', 'mentor', 'student'
+        ]
+        assert elapsed < 0.6, (
+            f'Рассылка в 4 чата заняла {elapsed:.2f} с вместо одной отправки'
+        )
+
+    def test_concurrency_is_capped(self, monkeypatch, mock_bot):
+        import engine
+        import homework
+
+        lock = threading.Lock()
+        active = [0, 0]
+
+        def mock_answer(token, current_timestamp):
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return {'homeworks': [], 'current_date': current_timestamp}
+
+        monkeypatch.setattr(homework, 'get_token_api_answer', mock_answer)
+        tenants = [engine.Tenant(token=str(i), chat_id=i) for i in range(40)]
+        polling = engine.PollingEngine(mock_bot, tenants, concurrency=4)
+        asyncio.run(polling.run_cycle())
+
+        assert active[1] <= 4, (
+            'Число одновременных запросов не должно превышать concurrency'
+        )
+
+    def test_error_is_reported_once(self, monkeypatch, mock_bot):
+        import engine
+        import homework
+
+        def mock_answer(token, current_timestamp):
+            raise ConnectionError('нет сети')
+
+        monkeypatch.setattr(homework, 'get_token_api_answer', mock_answer)
+        bot = mock_bot
+        tenants = [engine.Tenant(token='t', chat_id=1)]
+        polling = engine.PollingEngine(bot, tenants)
+        asyncio.run(polling.run_cycle())
+        asyncio.run(polling.run_cycle())
+
+        assert len(bot.sent) == 1
+        assert bot.sent[0][1].startswith('Сбой в работе программы')
+
+    def test_sigterm_drains_and_exits(self, api_answer, mock_bot):
+        import os
+        import signal
+
+        import engine
+
+        api_answer([{'homework_name': 'hw', 'status': 'approved'}])
+        tenants = [engine.Tenant(token=str(i), chat_id=i) for i in range(20)]
+        bot = mock_bot
+        polling = engine.PollingEngine(bot, tenants)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.2, os.kill, os.getpid(), signal.SIGTERM)
+            await polling.run(signals=(signal.SIGTERM,))
+
+        started = time.perf_counter()
+        asyncio.run(run())
+        assert time.perf_counter() - started < 1, (
+            'По SIGTERM ожидание прерывается сразу'
+        )
+        assert len(bot.sent) == len(tenants), (
+            'Перед выходом очередь сообщений отправлена'
+        )
+
+    def test_stop_callbacks_run_before_drain(self, api_answer):
+        import os
+        import signal
+
+        import engine
+
+        api_answer([{'homework_name': 'hw', 'status': 'approved'}])
+
+        class SlowBot(MockBot):
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                time.sleep(0.1)
+                super().send_message(chat_id, text)
+
+        tenants = [engine.Tenant(token=str(i), chat_id=i) for i in range(20)]
+        bot = SlowBot()
+        polling = engine.PollingEngine(bot, tenants)
+        sent_at_stop = []
+        polling.on_stop(lambda: sent_at_stop.append(len(bot.sent)))
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, os.kill, os.getpid(), signal.SIGTERM)
+            await polling.run(signals=(signal.SIGTERM,))
+
+        asyncio.run(run())
+        assert len(sent_at_stop) == 1
+        assert sent_at_stop[0] < len(tenants) == len(bot.sent), (
+            'Приём команд останавливается по сигналу, до дописывания очереди'
+        )
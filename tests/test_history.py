@@ -0,0 +1,152 @@
+import asyncio
+import random
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def item(status, at):
+    from datetime import datetime, timezone
+
+    moment = datetime.fromtimestamp(at, timezone.utc)
+    return {
+        'id': 1, 'homework_name': 'hw', 'status': status,
+        'date_updated': moment.strftime('%Y-%m-%dT%H:%M:%SZ'),
+    }
+
+
+class TestHistory:
+
+    def test_sketch_relative_accuracy(self):
+        from sketch import QuantileSketch
+
+        rng = random.Random(1)
+        values = [rng.lognormvariate(9, 1.5) for _ in range(20000)]
+        sketch = QuantileSketch(0.01)
+        halves = QuantileSketch(0.01), QuantileSketch(0.01)
+        for index, value in enumerate(values):
+            sketch.add(value)
+            halves[index % 2].add(value)
+        halves[0].merge(halves[1])
+        ordered = sorted(values)
+        for fraction in (0.5, 0.9, 0.99):
+            exact = ordered[int(fraction * (len(ordered) - 1))]
+            assert abs(sketch.quantile(fraction) - exact) <= 0.011 * exact
+            assert halves[0].quantile(fraction) == sketch.quantile(fraction)
+        assert len(sketch.bins) < 2000, 'Память не зависит от числа значений'
+        restored = QuantileSketch.from_dict(sketch.to_dict())
+        assert restored.quantile(0.9) == sketch.quantile(0.9)
+
+    def test_review_time_and_verdicts(self, tmp_path):
+        import history
+
+        clock = FakeClock()
+        log = history.TransitionHistory(str(tmp_path / 'h.sqlite3'), clock)
+        start = clock.now
+        for number in range(1, 11):
+            token = f'token{number}'
+            log.record(token, '1', None, item('reviewing', start))
+            verdict = 'approved' if number % 2 else 'rejected'
+            log.record(
+                token, '1', 'reviewing', item(verdict, start + number * 3600)
+            )
+        clock.now = start + 11 * 3600
+        assert log.verdicts() == {'approved': 5, 'rejected': 5}
+        p90 = log.review_time(0.9)
+        assert abs(p90 - 9 * 3600) <= 0.01 * 9 * 3600
+        assert log.review_time(0.9, 'all') == p90
+        assert log.review_time(0.9, '2000-W01') is None
+
+    def test_same_change_counted_once(self, tmp_path):
+        import history
+
+        log = history.TransitionHistory(str(tmp_path / 'h.sqlite3'))
+        change = item('approved', 1_700_000_000)
+        assert log.record('t', '1', 'reviewing', change)
+        assert not log.record('t', '1', 'reviewing', change), (
+            'Переход, замеченный второй подпиской на токен, не дублируется'
+        )
+        assert log.verdicts(history.ALL_TIME)['approved'] == 1
+
+    def test_chats_on_one_token_record_once(self, api_answer, mock_bot,
+                                            tmp_path):
+        import itertools
+
+        import engine
+        import history
+
+        statuses = {'status': 'reviewing'}
+        api_answer(
+            lambda token: [{'id': 420, 'homework_name': 'hw', **statuses}]
+        )
+        ticks = itertools.count(1_700_000_000)
+        log = history.TransitionHistory(
+            str(tmp_path / 'h.sqlite3'), lambda: next(ticks)
+        )
+        tenants = [
+            engine.Tenant(token='t', chat_id=chat) for chat in ('a', 'b', 'c')
+        ]
+        polling = engine.PollingEngine(mock_bot, tenants, history=log)
+        asyncio.run(polling.run_cycle())
+        statuses['status'] = 'approved'
+        asyncio.run(polling.run_cycle())
+        polling.flush_state()
+        assert [event[4] for event in log.events(0, 2_000_000_000)] == [
+            'reviewing', 'approved'
+        ], 'Переход без date_updated пишется один раз на токен'
+        assert log.verdicts(history.ALL_TIME)['approved'] == 1
+        log.close()
+
+    def test_state_survives_restart(self, tmp_path):
+        import history
+
+        path = str(tmp_path / 'h.sqlite3')
+        clock = FakeClock()
+        start = clock.now
+        log = history.TransitionHistory(path, clock)
+        log.record('t', '1', None, item('reviewing', start))
+        log.record('t', '2', None, item('approved', start))
+        log.close()
+
+        log = history.TransitionHistory(path, clock)
+        log.record('t', '1', 'reviewing', item('rejected', start + 600))
+        assert log.verdicts() == {'approved': 1, 'rejected': 1}
+        assert abs(log.review_time(0.5) - 600) <= 6, (
+            'Начало проверки восстанавливается после перезапуска'
+        )
+        log.flush()
+        events = log.events(start, start + 3600)
+        assert [event[4] for event in events] == [
+            'reviewing', 'approved', 'rejected'
+        ]
+        assert all(event[1] != 't' for event in events), (
+            'Токен в журнале хранится в виде хеша'
+        )
+        log.close()
+
+    def test_engine_records_transitions(self, api_answer, mock_bot, tmp_path):
+        import engine
+        import history
+
+        statuses = iter(['reviewing', 'approved'])
+        api_answer(lambda token: [
+            {'id': 7, 'homework_name': 'hw', 'status': next(statuses)}
+        ])
+        log = history.TransitionHistory(str(tmp_path / 'h.sqlite3'))
+        polling = engine.PollingEngine(
+            mock_bot, [engine.Tenant(token='t', chat_id=1)], history=log
+        )
+        asyncio.run(polling.run_cycle())
+        asyncio.run(polling.run_cycle())
+        polling.flush_state()
+        assert [event[3:] for event in log.events(0)] == [
+            (None, 'reviewing'), ('reviewing', 'approved')
+        ]
+        assert log.verdicts()['approved'] == 1
+        log.close()
@@ -0,0 +1,55 @@
+class TestHomeworkIndex:
+
+    def test_behaves_like_dict(self):
+        from homework_index import SMALL_INDEX, HomeworkIndex
+
+        index = HomeworkIndex({'1': 'reviewing', 'hw_name': 'approved'})
+        assert index == {'1': 'reviewing', 'hw_name': 'approved'}
+        index['1'] = 'approved'
+        index['007'] = 'rejected'
+        del index['hw_name']
+        assert index == {'1': 'approved', '007': 'rejected'}
+        assert index.get('hw_name') is None
+        assert list(index) == ['1', '007'], 'Ключи отдаются строками'
+
+        for number in range(SMALL_INDEX * 2):
+            index[str(number + 100)] = 'reviewing'
+        assert len(index) == SMALL_INDEX * 2 + 2
+        assert index['1'] == 'approved'
+        assert index['150'] == 'reviewing'
+
+    def test_unknown_status_is_kept(self):
+        from homework_index import HomeworkIndex
+
+        index = HomeworkIndex.from_dict({'1': 'new_status', '2': None})
+        assert index == {'1': 'new_status', '2': None}
+
+    def test_uses_less_memory_than_dict(self):
+        from benchmarks import memory
+
+        compact = memory.bytes_per_record(memory.compact_index, 20_000)
+        baseline = memory.bytes_per_record(memory.status_dict, 20_000)
+        assert compact < baseline / 2, (
+            f'Индекс статусов занимает {compact:.0f} байт на работу '
+            f'против {baseline:.0f} у словаря'
+        )
+
+    def test_non_ascii_digits_are_names(self):
+        from homework_index import HomeworkIndex
+
+        index = HomeworkIndex({'3': 'approved', '²': 'reviewing'})
+        index['٣'] = 'rejected'
+        assert index == {'3': 'approved', '²': 'reviewing', '٣': 'rejected'}, (
+            'Цифры не из ASCII не упаковываются в числа и не совпадают с id'
+        )
+
+    def test_restored_index_is_packed_lazily(self):
+        from homework_index import SMALL_INDEX, HomeworkIndex
+
+        for size in (2, SMALL_INDEX * 2):
+            statuses = {str(number + 1): 'reviewing' for number in range(size)}
+            index = HomeworkIndex.from_dict(statuses)
+            assert list(index) == list(statuses)
+            index['1'] = 'approved'
+            assert statuses['1'] == 'reviewing', 'Исходный словарь не меняется'
+            assert index == {**statuses, '1': 'approved'}
@@ -0,0 +1,35 @@
+import pytest
+
+
+class TestHttpClient:
+
+    def test_connections_are_reused(self, stub_practicum):
+        import http_client
+
+        session = http_client.PooledSession(pool_size=2)
+        for _ in range(10):
+            assert session.get(stub_practicum.url).json()['homeworks'] == []
+        stats = session.stats()
+        session.close()
+
+        assert stats['requests'] == 10
+        assert stats['connections'] == 1, (
+            'Последовательные запросы должны идти по одному соединению'
+        )
+        assert stats['handshakes_avoided'] == 9
+        assert stats['reuse_ratio'] == pytest.approx(0.9)
+
+    def test_get_api_answer_uses_shared_session(self, monkeypatch,
+                                                stub_practicum):
+        import homework
+        import http_client
+
+        monkeypatch.setattr(homework, 'ENDPOINT', stub_practicum.url)
+        session = http_client.init_session(pool_size=1)
+        try:
+            homework.get_api_answer(1)
+            homework.get_api_answer(1)
+            assert session.stats()['requests'] == 2
+        finally:
+            http_client.close_session()
+        assert http_client.get_session() is None
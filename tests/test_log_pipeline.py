@@ -0,0 +1,78 @@
+import atexit
+import io
+import json
+import logging
+import queue
+import threading
+
+
+def make_logger(name):
+    logger = logging.getLogger(name)
+    logger.handlers = []
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+class TestLogPipeline:
+
+    def test_json_output_formatted_in_listener(self):
+        import log_pipeline
+
+        threads = []
+
+        class Lazy:
+            def __str__(self):
+                threads.append(threading.current_thread())
+                return 'значение'
+
+        stream = io.StringIO()
+        logger = make_logger('test_json_output')
+        listener = log_pipeline.setup_logging(logger, stream)
+        logger.info('Статус %s', Lazy(), extra={'fields': {'chat_id': 1}})
+        listener.stop()
+        atexit.unregister(listener.stop)
+
+        entry = json.loads(stream.getvalue())
+        assert entry['message'] == 'Статус значение'
+        assert entry['level'] == 'INFO'
+        assert entry['chat_id'] == 1
+        assert threads and threads[0] is not threading.main_thread(), (
+            'Сообщение форматируется в потоке записи, а не в опросе'
+        )
+
+    def test_rate_limit_per_message_type(self):
+        import log_pipeline
+
+        log_filter = log_pipeline.RateLimitFilter(rate=2)
+        logger = make_logger('test_rate_limit')
+        records = []
+
+        class Collect(logging.Handler):
+            def emit(self, record):
+                records.append(record)
+
+        handler = Collect()
+        handler.addFilter(log_filter)
+        logger.addHandler(handler)
+        for i in range(100):
+            logger.info('Ошибка %s', i)
+        logger.info('Другое сообщение')
+
+        messages = [record.getMessage() for record in records]
+        assert messages == ['Ошибка 0', 'Ошибка 1', 'Другое сообщение'], (
+            'Лимит считается по шаблону сообщения, а не по тексту'
+        )
+        log_filter._buckets[logging.INFO, 'Ошибка %s'].tokens = 1
+        logger.info('Ошибка %s', 'снова')
+        assert records[-1].suppressed == 98
+
+    def test_full_queue_does_not_block(self):
+        import log_pipeline
+
+        handler = log_pipeline.NonBlockingQueueHandler(queue.Queue(1))
+        logger = make_logger('test_full_queue')
+        logger.addHandler(handler)
+        for i in range(10):
+            logger.warning('Сообщение %s', i)
+        assert handler.dropped == 9
@@ -0,0 +1,63 @@
+import urllib.request
+
+import pytest
+
+
+class TestMetrics:
+
+    def test_histogram_render(self):
+        import metrics
+
+        histogram = metrics.Histogram(
+            'test_seconds', 'Тест', ('stage',), buckets=(0.1, 1)
+        )
+        histogram.observe(0.05, 'a')
+        histogram.observe(0.5, 'a')
+        histogram.observe(5, 'a')
+        lines = histogram.render()
+        assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{stage="a",le="1"} 2' in lines
+        assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+        assert 'test_seconds_count{stage="a"} 3' in lines
+
+    def test_stages_and_exceptions_are_counted(self):
+        import homework
+        import metrics
+
+        before = metrics.STAGE_SECONDS.count('parse_status')
+        errors = metrics.EXCEPTIONS.value('NoHomeworkStatusInResponse')
+        homework.parse_status({'homework_name': 'hw', 'status': 'approved'})
+        with pytest.raises(Exception):
+            homework.parse_status({'homework_name': 'hw', 'status': 'x'})
+
+        assert metrics.STAGE_SECONDS.count('parse_status') == before + 2
+        assert (
+            metrics.EXCEPTIONS.value('NoHomeworkStatusInResponse')
+            == errors + 1
+        )
+
+    def test_exception_classes_are_registered(self):
+        import metrics
+
+        text = metrics.REGISTRY.render()
+        for name in ('APIResponseError', 'HTTPStatusError',
+                     'CheckTokenError', 'NoHomeworkStatusInResponse'):
+            assert f'homework_bot_exceptions_total{{exception="{name}"}}' in (
+                text
+            )
+
+    def test_http_endpoint(self):
+        import metrics
+        import metrics_server
+
+        metrics.TENANTS_BEHIND.set_function(lambda: 7)
+        server = metrics_server.start_server(0, host='127.0.0.1')
+        try:
+            url = f'http://127.0.0.1:{server.server_port}/metrics'
+            with urllib.request.urlopen(url) as response:
+                body = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert 'homework_bot_tenants_behind_schedule 7' in body
+        assert '# TYPE homework_bot_stage_seconds histogram' in body
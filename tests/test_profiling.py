@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+
+class SlowBot:
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        time.sleep(0.05)
+        self.sent.append((chat_id, text))
+
+
+def slow_answer(token, current_timestamp):
+    import profiling
+
+    with profiling.stage('http'):
+        time.sleep(0.1)
+    return {
+        'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+        'current_date': 1,
+    }
+
+
+class TestProfiling:
+
+    def test_slow_poll_reports_stages(self, monkeypatch):
+        import engine
+        import homework
+        import profiling
+
+        logged = []
+        monkeypatch.setattr(profiling, 'SLOW_POLL', 0.1)
+        monkeypatch.setattr(homework, 'get_token_api_answer', slow_answer)
+        monkeypatch.setattr(
+            homework.logger, 'warning', lambda *args: logged.append(args)
+        )
+        before = profiling.SLOW_POLLS.value()
+        bot = SlowBot()
+        tenant = engine.Tenant(token='t', chat_id=1)
+        asyncio.run(engine.PollingEngine(bot, [tenant]).run_cycle())
+
+        assert len(bot.sent) == 1
+        assert profiling.SLOW_POLLS.value() == before + 1
+        (_, label, elapsed, stages), = logged
+        assert label == 'chat1'
+        assert stages['http'] >= 0.1
+        assert stages['send'] >= 0.05, (
+            'Опрос завершается после отправки своих сообщений'
+        )
+        assert elapsed >= stages['http'] + stages['send']
+
+    def test_disabled_profiling_is_noop(self, monkeypatch):
+        import profiling
+
+        monkeypatch.setattr(profiling, 'SLOW_POLL', 0)
+        with profiling.poll('chat1') as timings:
+            assert timings is None
+            assert profiling.stage('http') is profiling._OFF
+        assert profiling.run(sum, (1, 2)) == 3
+
+    def test_sampled_poll_is_profiled(self, monkeypatch, tmp_path):
+        import pstats
+
+        import engine
+        import homework
+        import profiling
+
+        monkeypatch.setattr(profiling, 'PROFILE_SAMPLE', 1)
+        monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+        monkeypatch.setitem(profiling._state, 'active', True)
+        monkeypatch.setattr(homework, 'get_token_api_answer', slow_answer)
+        tenant = engine.Tenant(token='t', chat_id=1)
+        asyncio.run(engine.PollingEngine(SlowBot(), [tenant]).run_cycle())
+
+        dumps = list(tmp_path.glob('poll-*-chat1.prof'))
+        assert len(dumps) == 1
+        functions = {
+            name for _, _, name in pstats.Stats(str(dumps[0])).stats
+        }
+        assert 'slow_answer' in functions, (
+            'Профиль включает вызовы опроса в пуле потоков'
+        )
+
+    def test_memory_report_diffs_snapshots(self):
+        import profiling
+
+        assert profiling.memory_report() == []
+        assert profiling.toggle()
+        try:
+            profiling.memory_report()
+            kept = [bytearray(1024) for _ in range(1000)]
+            diff = profiling.memory_report()
+        finally:
+            assert not profiling.toggle()
+        assert kept and diff
+        assert diff[0].size_diff >= 1024 * 1000
@@ -0,0 +1,99 @@
+import pytest
+
+
+@pytest.fixture
+def cache(monkeypatch, stub_practicum):
+    import homework
+    import response_cache
+
+    monkeypatch.setattr(homework, 'ENDPOINT', stub_practicum.url)
+    yield response_cache.init_cache()
+    response_cache.close_cache()
+
+
+class TestResponseCache:
+
+    def test_unchanged_body_skips_parsing(self, monkeypatch, cache,
+                                          stub_practicum):
+        import homework
+
+        stub_practicum.homeworks = [
+            {'homework_name': 'hw1', 'status': 'reviewing'}
+        ]
+        first = homework.get_token_api_answer('token', 100)
+        assert first['homeworks'] == stub_practicum.homeworks
+
+        def fail_json(*args, **kwargs):
+            raise AssertionError('JSON не должен разбираться повторно')
+
+        monkeypatch.setattr('requests.Response.json', fail_json)
+        assert homework.get_token_api_answer('token', 200) is None, (
+            'Неизменный ответ (кроме current_date) не разбирается'
+        )
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_changed_body_is_miss(self, cache, stub_practicum):
+        import homework
+
+        homework.get_token_api_answer('token', 100)
+        stub_practicum.homeworks = [
+            {'homework_name': 'hw1', 'status': 'approved'}
+        ]
+        response = homework.get_token_api_answer('token', 100)
+        assert response['homeworks'][0]['status'] == 'approved'
+        assert cache.stats()['misses'] == 2
+
+    def test_etag_revalidation(self, cache, stub_practicum):
+        import homework
+
+        stub_practicum.use_etag = True
+        homework.get_token_api_answer('token', 100)
+        assert cache.conditional_headers('token', 100), (
+            'При повторном запросе отправляется If-None-Match'
+        )
+        assert homework.get_token_api_answer('token', 100) is None
+        assert homework.get_api_answer(100) is not None
+        assert cache.stats()['hits'] == 1
+
+    def test_tokens_are_isolated(self, cache):
+        import homework
+
+        homework.get_token_api_answer('first', 100)
+        assert homework.get_token_api_answer('second', 100) is not None
+        assert len(cache) == 2
+
+    def test_subscription_polled_alone_keeps_others(self, cache, mock_bot,
+                                                    stub_practicum):
+        import asyncio
+        import engine
+
+        stub_practicum.homeworks = [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing'}
+        ]
+        student = engine.Tenant(token='t', chat_id='student', timestamp=1)
+        mentor = engine.Tenant(token='t', chat_id='mentor', timestamp=1)
+        polling = engine.PollingEngine(mock_bot, [student, mentor])
+
+        async def run():
+            polling._start()
+            try:
+                await polling.poll(student)
+                await polling.poll(mentor)
+                stub_practicum.homeworks[0]['status'] = 'approved'
+                polling._refresh(student)
+                while polling._refreshing:
+                    await asyncio.sleep(0.01)
+                await polling.poll(mentor)
+                await polling.poll(mentor)
+                await polling.sender.join()
+            finally:
+                await polling._stop()
+
+        asyncio.run(run())
+        assert mentor.statuses == {'1': 'approved'}, (
+            'Ответ, разобранный одной подпиской, доходит и до остальных'
+        )
+        assert len(mock_bot.texts('mentor')) == 2
+        assert len(mock_bot.texts('student')) == 2
+        assert cache.stats()['hits'] >= 2
@@ -0,0 +1,146 @@
+import pytest
+import requests
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_response(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = b'{}'
+    response._content_consumed = True
+    return response
+
+
+class TestRetry:
+
+    def test_parse_retry_after(self):
+        import retry
+
+        assert retry.parse_retry_after('7') == 7
+        assert retry.parse_retry_after(
+            'Wed, 21 Oct 2015 07:28:10 GMT', now=1445412480
+        ) == 10
+        assert retry.parse_retry_after('soon') is None
+        assert retry.parse_retry_after(None) is None
+
+    def test_backoff_has_full_jitter(self):
+        import retry
+
+        assert retry.backoff(3, base=1, cap=100, rng=lambda: 1) == 8
+        assert retry.backoff(10, base=1, cap=5, rng=lambda: 1) == 5
+        assert retry.backoff(3, base=1, cap=100, rng=lambda: 0) == 0
+
+    def test_http_retries_honor_retry_after(self):
+        import retry
+
+        responses = iter([
+            make_response(503, {'Retry-After': '2'}), make_response(200),
+        ])
+        sleeps = []
+        result = retry.call(
+            'test-honor', responses.__next__, should_retry=retry.http_delay,
+            sleep=sleeps.append,
+        )
+        assert result.status_code == 200
+        assert sleeps and sleeps[0] >= 2, 'Пауза не короче Retry-After'
+
+    def test_final_errors_are_not_retried(self):
+        import retry
+
+        calls = []
+
+        def fail():
+            calls.append(1)
+            raise ValueError('bad data')
+
+        with pytest.raises(ValueError):
+            retry.call('test-final', fail, should_retry=retry.http_delay,
+                       sleep=lambda _: None)
+        assert len(calls) == 1
+        result = retry.call(
+            'test-final', make_response, 404,
+            should_retry=retry.http_delay, sleep=lambda _: None,
+        )
+        assert result.status_code == 404
+
+    def test_budget_limits_retries(self):
+        import retry
+
+        clock = FakeClock()
+        budget = retry.RetryBudget(ratio=0.25, min_rate=0, burst=10,
+                                   clock=clock)
+        assert sum(budget.withdraw() for _ in range(100)) == 10
+        retries = 0
+        for _ in range(100):
+            budget.deposit()
+            retries += budget.withdraw()
+        assert retries == 25, 'Повторов не больше ratio от запросов'
+
+    def test_outage_does_not_multiply_load(self, monkeypatch):
+        import retry
+
+        clock = FakeClock()
+        budget = retry.RetryBudget(min_rate=0, clock=clock)
+        monkeypatch.setattr(retry, 'get_budget', lambda host: budget)
+        calls = []
+
+        def down():
+            calls.append(1)
+            return make_response(503)
+
+        for _ in range(1000):
+            retry.call('test-outage', down, should_retry=retry.http_delay,
+                       sleep=lambda _: None)
+        assert len(calls) <= 1000 * (1 + retry.RETRY_BUDGET_RATIO) + (
+            retry.RETRY_BUDGET_BURST
+        )
+
+    def test_telegram_retry_after(self):
+        import homework
+        import retry
+        from telegram.error import BadRequest, RetryAfter
+
+        class FloodBot:
+            def __init__(self):
+                self.attempts = 0
+
+            def send_message(self, chat_id, text, **kwargs):
+                self.attempts += 1
+                if self.attempts == 1:
+                    raise RetryAfter(0)
+
+        bot = FloodBot()
+        homework.send_chat_message(bot, 1, 'text')
+        assert bot.attempts == 2, 'После RetryAfter сообщение отправляется'
+        assert retry.telegram_delay(None, RetryAfter(3)) == 3
+        assert retry.telegram_delay(None, BadRequest('bad')) is None
+
+    def test_telegram_timeout_not_repeated(self):
+        import homework
+        import retry
+        from telegram.error import NetworkError, TimedOut
+
+        class SlowBot:
+            def __init__(self):
+                self.attempts = 0
+
+            def send_message(self, chat_id, text, **kwargs):
+                self.attempts += 1
+                raise TimedOut()
+
+        bot = SlowBot()
+        assert homework.send_chat_message(bot, 1, 'text') is False
+        assert bot.attempts == 1, (
+            'Сообщение, на которое Telegram не ответил вовремя, не дублируется'
+        )
+        assert retry.telegram_delay(None, TimedOut()) is None
+        assert retry.telegram_delay(None, NetworkError('reset')) == 0
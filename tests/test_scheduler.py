@@ -0,0 +1,142 @@
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestScheduler:
+
+    def test_interval_depends_on_status(self):
+        import scheduler
+
+        now = 100000.0
+        reviewing = scheduler.next_interval('reviewing', now, now, jitter=0)
+        unknown = scheduler.next_interval(None, 0, now, jitter=0)
+        approved = scheduler.next_interval('approved', now, now, jitter=0)
+        assert reviewing < unknown < approved, (
+            'Работы на ревью опрашиваются чаще, принятые — реже'
+        )
+        stale = scheduler.next_interval(
+            'reviewing', now - scheduler.STALE_AFTER, now, jitter=0
+        )
+        assert stale == 2 * reviewing, (
+            'Давно не менявшийся статус опрашивается реже'
+        )
+
+    def test_jitter_bounds(self):
+        import scheduler
+
+        for _ in range(100):
+            interval = scheduler.next_interval('rejected', 0, 0, jitter=0.1)
+            assert 540 <= interval <= 660
+
+    def test_budget_limits_due_tenants(self):
+        import engine
+        import scheduler
+
+        clock = FakeClock()
+        tenants = [engine.Tenant(token=str(i), chat_id=i) for i in range(30)]
+        queue = scheduler.PollScheduler(tenants, budget=10, clock=clock)
+
+        assert len(queue.due()) == 10, (
+            'За один тик опрашивается не больше бюджета'
+        )
+        assert queue.due() == []
+        assert queue.wait_time() > 0
+        clock.now += 0.5
+        assert len(queue.due()) == 5
+        clock.now += 10
+        assert len(queue.due()) == 10
+        assert len(queue) == 5
+
+    def test_first_poll_is_due_now(self):
+        import engine
+        import scheduler
+
+        clock = FakeClock()
+        clock.now = 5_000_000.0
+        tenant = engine.Tenant(token='t', chat_id=1)
+        queue = scheduler.PollScheduler([tenant], clock=clock)
+        assert tenant.next_poll_at == clock.now, (
+            'Задержка первого опроса считается от запуска, а не от нуля'
+        )
+        assert queue.due() == [tenant]
+
+    def test_reschedule_orders_by_status(self):
+        import engine
+        import scheduler
+
+        clock = FakeClock()
+        fast = engine.Tenant(token='fast', chat_id=1, status='reviewing')
+        slow = engine.Tenant(token='slow', chat_id=2, status='approved')
+        queue = scheduler.PollScheduler(budget=100, clock=clock)
+        queue.reschedule(slow)
+        queue.reschedule(fast)
+        assert fast.next_poll_at < slow.next_poll_at
+        clock.now = fast.next_poll_at
+        assert queue.due() == [fast]
+
+    def test_timing_wheel_never_fires_early(self):
+        import random
+        import timing_wheel
+
+        wheel = timing_wheel.TimingWheel(0)
+        deadlines = [random.uniform(0, 500_000) for _ in range(5000)]
+        for deadline in deadlines:
+            wheel.add(deadline, deadline)
+        fired = []
+        now = 0
+        while now < 600_000:
+            now += random.uniform(0, 100)
+            wheel.advance(now)
+            while wheel.ready():
+                deadline = wheel.pop()
+                assert deadline < now + wheel.tick, (
+                    'Срок срабатывает не раньше, чем за один тик'
+                )
+                fired.append(deadline)
+        assert sorted(fired) == sorted(deadlines)
+        assert len(wheel) == 0
+
+    def test_scheduling_cost_is_flat(self):
+        import time
+
+        import engine
+        import scheduler
+
+        def cost(count):
+            clock = FakeClock()
+            queue = scheduler.PollScheduler(budget=1e9, clock=clock)
+            tenants = [
+                engine.Tenant(token=str(i), chat_id=i) for i in range(count)
+            ]
+            started = time.perf_counter()
+            for i, tenant in enumerate(tenants):
+                queue.schedule(tenant, clock.now + i % 3600)
+            polled = 0
+            while polled < count:
+                clock.now += 1
+                polled += len(queue.due())
+            return (time.perf_counter() - started) / count
+
+        small, large = min(cost(10_000) for _ in range(3)), cost(200_000)
+        assert large < small * 3, (
+            f'Стоимость опроса на студента растёт: {small:.2e} -> {large:.2e}'
+        )
+
+    def test_rescheduled_entry_is_skipped(self):
+        import engine
+        import scheduler
+
+        clock = FakeClock()
+        tenant = engine.Tenant(token='t', chat_id=1)
+        queue = scheduler.PollScheduler(budget=100, clock=clock)
+        queue.schedule(tenant, clock.now + 10)
+        queue.schedule(tenant, clock.now + 100)
+        clock.now += 20
+        assert queue.due() == [], 'Действует только последняя постановка'
+        clock.now += 100
+        assert queue.due() == [tenant]
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+from tests.fixtures.fixture_bot import MockBot
+
+
+def sent_times(bot, chat_id):
+    return [
+        at for (chat, _), at in zip(bot.sent, bot.sent_at) if chat == chat_id
+    ]
+
+
+class TestSendQueue:
+
+    def test_verdicts_go_first(self, mock_bot):
+        import send_queue
+
+        bot = mock_bot
+
+        async def scenario():
+            queue = send_queue.SendQueue(
+                bot, workers=1, global_rate=1000, chat_rate=1000
+            )
+            queue.start()
+            queue.put(1, 'warmup', send_queue.PRIORITY_STATUS)
+            await asyncio.sleep(0.05)
+            queue.put(1, 'error', send_queue.PRIORITY_ERROR)
+            queue.put(1, 'reviewing', send_queue.message_priority('reviewing'))
+            queue.put(1, 'approved', send_queue.message_priority('approved'))
+            await queue.join()
+            stats = queue.stats()
+            await queue.stop()
+            return stats
+
+        stats = asyncio.run(scenario())
+        assert bot.texts() == [
+            'warmup', 'approved', 'reviewing', 'error'
+        ], 'При ограничении скорости вердикты отправляются первыми'
+        assert stats['depth'] == 0
+        assert stats['sent'] == 4
+
+    def test_chat_rate_limit(self, mock_bot):
+        import send_queue
+
+        bot = mock_bot
+
+        async def scenario():
+            queue = send_queue.SendQueue(
+                bot, workers=4, global_rate=1000, chat_rate=20
+            )
+            queue.start()
+            for i in range(5):
+                queue.put('chat', str(i))
+            queue.put('other', 'x')
+            await queue.join()
+            await queue.stop()
+
+        asyncio.run(scenario())
+        chat_times = sent_times(bot, 'chat')
+        assert chat_times[-1] - chat_times[0] >= 4 / 20 * 0.9, (
+            'Сообщения в один чат отправляются не чаще chat_rate'
+        )
+        other_at = sent_times(bot, 'other')[0]
+        assert other_at < chat_times[-1], (
+            'Лимит одного чата не задерживает другие чаты'
+        )
+
+    def test_delivery_outcomes_per_chat(self):
+        import send_queue
+        from telegram import TelegramError
+
+        class FlakyBot(MockBot):
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                if chat_id == 'blocked':
+                    raise TelegramError('bot was blocked by the user')
+                super().send_message(chat_id, text)
+
+        async def scenario():
+            queue = send_queue.SendQueue(
+                FlakyBot(), global_rate=1000, chat_rate=1000
+            )
+            queue.start()
+            for chat in ('student', 'blocked', 'mentor'):
+                queue.put(chat, 'approved')
+            await queue.join()
+            stats = queue.stats()
+            await queue.stop()
+            return queue, stats
+
+        queue, stats = asyncio.run(scenario())
+        assert stats['delivered'] == 2 and stats['failed'] == 1
+        assert list(queue.failures) == ['blocked'], (
+            'Недоставленные чаты учитываются по отдельности'
+        )
+
+    def test_throttled_chat_does_not_block_others(self, mock_bot):
+        import send_queue
+
+        bot = mock_bot
+
+        async def scenario():
+            queue = send_queue.SendQueue(
+                bot, workers=4, global_rate=1000, chat_rate=1
+            )
+            queue.start()
+            started = time.monotonic()
+            for i in range(8):
+                queue.put('busy', str(i))
+            await asyncio.sleep(0.05)
+            queue.put('other', 'approved', send_queue.PRIORITY_VERDICT)
+            while not bot.texts('other'):
+                await asyncio.sleep(0.01)
+            depth = queue.depth()
+            await queue.stop()
+            return started, depth
+
+        started, depth = asyncio.run(scenario())
+        other_at = sent_times(bot, 'other')[0]
+        assert other_at - started < 0.2, (
+            'Вердикт в другой чат не ждёт лимита занятого чата'
+        )
+        assert depth == 7, 'Сообщения занятого чата ждут в его очереди'
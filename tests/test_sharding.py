@@ -0,0 +1,138 @@
+import asyncio
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_shard(path, worker_id, clock):
+    import sharding
+
+    return sharding.Shard(
+        sharding.LeaseTable(path, ttl=30), worker_id, clock=clock
+    )
+
+
+def rebalance(shard, keys):
+    shard.assign({key: key for key in keys})
+    shard.release()
+    shard.acquire()
+
+
+class TestSharding:
+
+    def test_ring_moves_one_nth_of_keys(self):
+        import sharding
+
+        keys = [f'tenant{i}' for i in range(20_000)]
+        before = sharding.HashRing([f'w{i}' for i in range(4)])
+        after = sharding.HashRing([f'w{i}' for i in range(5)])
+        moved = sum(before.owner(key) != after.owner(key) for key in keys)
+        assert 0.1 < moved / len(keys) < 0.3, (
+            'При добавлении пятого воркера переезжает около 1/5 студентов'
+        )
+        owners = [after.owner(key) for key in keys]
+        assert min(owners.count(f'w{i}') for i in range(5)) > 2000
+
+    def test_each_tenant_owned_by_one_worker(self, tmp_path):
+        path = str(tmp_path / 'leases.sqlite3')
+        clock = FakeClock()
+        keys = [f'tenant{i}' for i in range(1000)]
+        first = make_shard(path, 'w1', clock)
+        rebalance(first, keys)
+        assert all(first.owns(key) for key in keys)
+
+        second = make_shard(path, 'w2', clock)
+        rebalance(second, keys)
+        assert not second.owned, (
+            'Чужая аренда не перехватывается до освобождения или истечения'
+        )
+        assert not any(
+            first.owns(key) and second.owns(key) for key in keys
+        )
+
+        rebalance(first, keys)
+        rebalance(second, keys)
+        owned = [first.owns(key) + second.owns(key) for key in keys]
+        assert set(owned) == {1}, 'Каждого студента опрашивает ровно один'
+        assert 300 < len(second.owned) < 700
+
+        clock.now += 60
+        rebalance(first, keys)
+        assert all(first.owns(key) for key in keys), (
+            'Студенты пропавшего воркера переходят после истечения аренды'
+        )
+        assert not any(second.owns(key) for key in keys)
+
+    def test_handoff_does_not_renotify(self, api_answer, mock_bot, tmp_path):
+        import engine
+        import storage
+
+        api_answer(
+            [{'homework_name': 'hw', 'status': 'approved'}], current_date=777
+        )
+
+        def tenants():
+            return [engine.Tenant(token=f't{i}', chat_id=i) for i in range(50)]
+
+        store = storage.StateStore(str(tmp_path / 'state.sqlite3'))
+        path = str(tmp_path / 'leases.sqlite3')
+        clock = FakeClock()
+        bot = mock_bot
+        first = engine.PollingEngine(
+            bot, tenants(), store=store, shard=make_shard(path, 'w1', clock)
+        )
+        first.rebalance()
+        asyncio.run(first.run_cycle())
+        assert len(bot.sent) == 50
+
+        second = engine.PollingEngine(
+            bot, tenants(), store=store, shard=make_shard(path, 'w2', clock)
+        )
+        second.rebalance()
+        first.rebalance()
+        second.rebalance()
+        assert second.shard.owned, 'Новый воркер получает часть студентов'
+        asyncio.run(second.run_cycle())
+        asyncio.run(first.run_cycle())
+        store.close()
+        assert len(bot.sent) == 50, (
+            'После переезда студента уведомление не повторяется'
+        )
+
+    def test_lease_lapse_keeps_schedule(self, mock_bot, tmp_path):
+        import engine
+        import sharding
+
+        clock = FakeClock()
+        tenant = engine.Tenant(token='t', chat_id=1)
+        polling = engine.PollingEngine(
+            mock_bot, [tenant],
+            shard=make_shard(str(tmp_path / 'leases.sqlite3'), 'w1', clock),
+        )
+        polling.rebalance()
+        assert len(polling.scheduler) == 1
+
+        clock.now += sharding.LEASE_TTL + 1
+        assert not polling._owns(tenant)
+
+        async def run():
+            polling._start()
+            try:
+                tasks = set()
+                polling._start_due(tasks)
+                await asyncio.gather(*tasks)
+            finally:
+                await polling._stop()
+
+        asyncio.run(run())
+        polling.rebalance()
+        assert polling._owns(tenant)
+        assert len(polling.scheduler) == 1, (
+            'После продления аренды студент остаётся в расписании'
+        )
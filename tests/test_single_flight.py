@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+
+def token_homeworks(token):
+    return [{'homework_name': f'hw_{token}', 'status': 'approved'}]
+
+
+def slow_answer(api_answer):
+    return api_answer(token_homeworks, current_date=500, delay=0.05)
+
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_share_result(self):
+        import single_flight
+
+        flights = single_flight.SingleFlight()
+        calls = []
+
+        async def fetch(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            if value == 'error':
+                raise ValueError(value)
+            return value
+
+        async def run():
+            results = await asyncio.gather(
+                *(flights.do('key', fetch, 'ok') for _ in range(10))
+            )
+            errors = await asyncio.gather(
+                *(flights.do('key', fetch, 'error') for _ in range(3)),
+                return_exceptions=True,
+            )
+            return results, errors
+
+        results, errors = asyncio.run(run())
+        assert results == ['ok'] * 10
+        assert all(isinstance(error, ValueError) for error in errors), (
+            'Исключение общего вызова получают все ожидающие'
+        )
+        assert calls == ['ok', 'error']
+        assert flights.stats() == {'calls': 2, 'shared': 11}
+
+    def test_api_calls_scale_with_tokens(self, monkeypatch, api_answer,
+                                         mock_bot):
+        import engine
+        import homework
+
+        calls = slow_answer(api_answer)
+        parsed = []
+        parse_status = homework.parse_status
+
+        def mock_parse(item):
+            parsed.append(item['homework_name'])
+            return parse_status(item)
+
+        monkeypatch.setattr(homework, 'parse_status', mock_parse)
+        tenants = [
+            engine.Tenant(token=f'token{i % 2}', chat_id=i, timestamp=1)
+            for i in range(10)
+        ]
+        bot = mock_bot
+        asyncio.run(engine.PollingEngine(bot, tenants).run_cycle())
+
+        assert len(calls) == 2, 'Один запрос к API на уникальный токен'
+        assert sorted(parsed) == ['hw_token0', 'hw_token1'], (
+            'Ответ разбирается один раз на токен'
+        )
+        assert sorted(chat for chat, _ in bot.sent) == list(range(10)), (
+            'Уведомление получает каждый подписанный чат'
+        )
+
+    def test_newer_flight_is_not_shared(self, api_answer, mock_bot):
+        import engine
+
+        calls = slow_answer(api_answer)
+        tenants = [
+            engine.Tenant(token='token', chat_id=1, timestamp=200),
+            engine.Tenant(token='token', chat_id=2, timestamp=100),
+        ]
+        asyncio.run(engine.PollingEngine(mock_bot, tenants).run_cycle())
+        assert sorted(calls) == [('token', 100), ('token', 200)], (
+            'Ответ с более поздним from_date не подходит подписке'
+        )
+
+    @pytest.mark.parametrize('due', [0, 2])
+    def test_subscriptions_polled_together(self, api_answer, mock_bot, due):
+        import engine
+
+        calls = slow_answer(api_answer)
+        tenants = [
+            engine.Tenant(token='token', chat_id=i, timestamp=100 + i)
+            for i in range(3)
+        ]
+        polling = engine.PollingEngine(mock_bot, tenants)
+
+        async def run():
+            polling._start()
+            try:
+                await polling._poll_and_reschedule(tenants[due])
+                await polling.sender.join()
+            finally:
+                await polling._stop()
+
+        asyncio.run(run())
+        assert calls == [('token', 100)], (
+            'Подписки на токен опрашиваются вместе одним запросом'
+        )
+        assert {tenant.timestamp for tenant in tenants} == {500}
+        now = time.monotonic()
+        assert all(tenant.next_poll_at > now for tenant in tenants)
@@ -0,0 +1,41 @@
+class TestStartup:
+
+    def test_import_does_not_load_clients(self):
+        from benchmarks import startup
+
+        seconds, loaded = startup.measure_import()
+        assert loaded == [], (
+            f'Импорт homework не загружает клиенты Telegram и API: {loaded}'
+        )
+        assert seconds < startup.IMPORT_BUDGET, (
+            f'Импорт homework занял {seconds * 1000:.0f} мс'
+        )
+
+    def test_check_mode(self, monkeypatch, tmp_path):
+        import homework
+
+        tenants = tmp_path / 'tenants.json'
+        tenants.write_text('[{"practicum_token": "t", "chat_id": 1}]')
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abc')
+        monkeypatch.setattr(homework, 'TENANTS_FILE', str(tenants))
+        assert homework.check_config()
+
+        tenants.write_text('[{"chat_id": 1}]')
+        assert not homework.check_config(), (
+            '--check находит ошибки в списке студентов'
+        )
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', None)
+        assert not homework.check_config()
+
+    def test_startup_budget(self):
+        from benchmarks import startup
+
+        seconds, returncode = startup.measure_check()
+        assert returncode == 0
+        assert seconds < startup.CHECK_BUDGET, (
+            f'homework.py --check занял {seconds * 1000:.0f} мс'
+        )
+        seconds = startup.measure_first_poll()
+        assert seconds < startup.FIRST_POLL_BUDGET, (
+            f'До первого опроса прошло {seconds * 1000:.0f} мс'
+        )
@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+
+class TestStorage:
+
+    def test_restart_does_not_renotify(self, api_answer, mock_bot, tmp_path):
+        import engine
+        import storage
+
+        api_answer(
+            [{'homework_name': 'hw', 'status': 'approved'}], current_date=777
+        )
+        path = str(tmp_path / 'state.sqlite3')
+        bot = mock_bot
+
+        store = storage.StateStore(path)
+        polling = engine.PollingEngine(
+            bot, [engine.Tenant(token='t', chat_id=1)], store=store
+        )
+        asyncio.run(polling.run_cycle())
+        polling.flush_state()
+        store.close()
+        assert len(bot.sent) == 1
+
+        store = storage.StateStore(path)
+        tenant = engine.Tenant(token='t', chat_id=1, timestamp=1)
+        polling = engine.PollingEngine(bot, [tenant], store=store)
+        assert tenant.timestamp == 777, (
+            'После перезапуска from_date восстанавливается из хранилища'
+        )
+        assert tenant.statuses == {'hw': 'approved'}
+        asyncio.run(polling.run_cycle())
+        store.close()
+        assert len(bot.sent) == 1, (
+            'После перезапуска то же уведомление не отправляется повторно'
+        )
+
+    def test_load_many_tenants_fast(self, tmp_path):
+        import engine
+        import storage
+
+        store = storage.StateStore(str(tmp_path / 'state.sqlite3'))
+        tenants = [
+            engine.Tenant(
+                token=f'token{i}', chat_id=i, timestamp=i,
+                status='reviewing', statuses={f'hw{i}': 'reviewing'},
+            )
+            for i in range(100_000)
+        ]
+        store.save(tenants)
+        for tenant in tenants:
+            tenant.timestamp = 0
+        started = time.perf_counter()
+        restored = store.restore(tenants)
+        elapsed = time.perf_counter() - started
+        store.close()
+
+        assert restored == len(tenants)
+        assert tenants[-1].timestamp == 99_999
+        assert elapsed < 1, (
+            f'Загрузка 100k студентов заняла {elapsed:.2f} с'
+        )
@@ -0,0 +1,128 @@
+import json
+import tracemalloc
+
+import pytest
+
+
+def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def make_homeworks(count: int) -> list:
+    return [
+        {
+            'id': i,
+            'homework_name': f'работа_{i}',
+            'status': 'approved',
+            'reviewer_comment': 'Всё нравится' * 5,
+        }
+        for i in range(count)
+    ]
+
+
+class TestStreamParser:
+
+    @pytest.mark.parametrize('chunk_size', [1, 7, 64, 4096])
+    def test_items_match_full_parse(self, chunk_size):
+        import stream_parser
+
+        payload = {'homeworks': make_homeworks(20), 'current_date': 42}
+        data = json.dumps(payload, ensure_ascii=False).encode()
+        closed = []
+        stream = stream_parser.HomeworksStream(
+            chunked(data, chunk_size), close=lambda: closed.append(True)
+        )
+
+        assert list(stream) == payload['homeworks']
+        assert stream.response == {'homeworks': [], 'current_date': 42}
+        assert stream.first == payload['homeworks'][0]
+        assert stream.count == 20
+        assert closed, 'После чтения ответ закрывается'
+
+    @pytest.mark.parametrize('payload, error', [
+        ([{'homeworks': []}], TypeError),
+        ({'current_date': 1}, KeyError),
+        ({'homeworks': {'status': 'approved'}}, TypeError),
+        ({'homeworks': [1, 2]}, TypeError),
+    ])
+    def test_invalid_response(self, payload, error):
+        import stream_parser
+
+        data = json.dumps(payload).encode()
+        with pytest.raises(error):
+            list(stream_parser.HomeworksStream(chunked(data, 5)))
+
+    def test_truncated_response(self):
+        import stream_parser
+
+        data = json.dumps({'homeworks': make_homeworks(3)}).encode()[:-20]
+        with pytest.raises(ValueError):
+            list(stream_parser.HomeworksStream(chunked(data, 16)))
+
+    def test_stage_covers_whole_stream(self):
+        import time
+
+        import metrics
+        import stream_parser
+
+        def slow_chunks(data):
+            for chunk in chunked(data, 16):
+                time.sleep(0.01)
+                yield chunk
+
+        data = json.dumps({'homeworks': make_homeworks(3)}).encode()
+        count = metrics.STAGE_SECONDS.count('stream_test')
+        errors = metrics.EXCEPTIONS.value('JSONDecodeError')
+        started = time.perf_counter()
+        list(stream_parser.HomeworksStream(
+            slow_chunks(data), stage='stream_test', started=started
+        ))
+        assert metrics.STAGE_SECONDS.count('stream_test') == count + 1, (
+            'Время этапа учитывается после чтения всего ответа'
+        )
+        with pytest.raises(ValueError):
+            list(stream_parser.HomeworksStream(
+                chunked(data[:-20], 16), stage='stream_test'
+            ))
+        assert metrics.EXCEPTIONS.value('JSONDecodeError') == errors + 1, (
+            'Ошибки разбора потока учитываются в метриках этапа'
+        )
+
+    def test_peak_memory_is_bounded(self):
+        import stream_parser
+
+        data = json.dumps(
+            {'homeworks': make_homeworks(20000), 'current_date': 1},
+            ensure_ascii=False,
+        ).encode()
+        tracemalloc.start()
+        count = 0
+        for _ in stream_parser.HomeworksStream(chunked(data, 64 * 1024)):
+            count += 1
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert count == 20000
+        assert peak < len(data) / 4, (
+            f'Пиковая память {peak} байт при ответе {len(data)} байт'
+        )
+
+    def test_engine_streaming_mode(self, monkeypatch, mock_bot,
+                                   stub_practicum):
+        import asyncio
+        import engine
+        import homework
+
+        stub_practicum.homeworks = [
+            {'homework_name': 'hw2', 'status': 'reviewing'},
+            {'homework_name': 'hw1', 'status': 'approved'},
+        ]
+        monkeypatch.setattr(homework, 'ENDPOINT', stub_practicum.url)
+        monkeypatch.setattr(homework, 'STREAM_RESPONSES', True)
+        tenant = engine.Tenant(token='t', chat_id=1, timestamp=1)
+        asyncio.run(engine.PollingEngine(mock_bot, [tenant]).run_cycle())
+
+        assert len(mock_bot.sent) == 2
+        assert tenant.status == 'reviewing'
+        assert tenant.timestamp > 1
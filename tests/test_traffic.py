@@ -0,0 +1,53 @@
+import asyncio
+import gzip
+
+
+class TestTraffic:
+
+    def test_record_and_replay(self, monkeypatch, mock_bot, tmp_path):
+        import circuit_breaker
+        import engine
+        import homework
+        import http_client
+        import response_cache
+        import traffic
+
+        from benchmarks.stubs import StubPracticum
+
+        practicum = StubPracticum(change_rate=1.0, use_etag=True).start()
+        monkeypatch.setattr(homework, 'ENDPOINT', practicum.url)
+        circuit_breaker.reset_breakers()
+        http_client.init_session()
+        response_cache.init_cache()
+        path = str(tmp_path / 'traffic.jsonl.gz')
+        bot, recorder = traffic.start_recording(mock_bot, path)
+        tenants = [
+            engine.Tenant(token=f'secret{i}', chat_id=i, timestamp=1)
+            for i in range(5)
+        ]
+        try:
+            polling = engine.PollingEngine(bot, tenants)
+            for generation in (1, 1, 2):
+                practicum.generation = generation
+                asyncio.run(polling.run_cycle())
+        finally:
+            recorder.close()
+            http_client.close_session()
+            response_cache.close_cache()
+            practicum.stop()
+
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            raw = file.read()
+        assert 'OAuth' not in raw and '"secret0"' not in raw, (
+            'Токены в записи заменяются'
+        )
+        records = traffic.load(path)
+        api = [r for r in records if r['kind'] == traffic.API]
+        assert len(api) == 15
+
+        replay_bot = traffic.ReplayBot()
+        result = asyncio.run(traffic.replay(records, bot=replay_bot))
+        assert result['polls'] == 15
+        assert sorted(text for _, text in replay_bot.sent) == sorted(
+            text for _, text in bot._bot.sent
+        ), 'Прогон записи даёт те же уведомления без сети'
@@ -0,0 +1,50 @@
+import asyncio
+
+
+BATCH = [
+    {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+    'not a homework',
+    {'id': 2, 'homework_name': 'hw2'},
+    {'id': 3, 'homework_name': 'hw3', 'status': 'unknown'},
+    {'id': [4], 'homework_name': 'hw4', 'status': 'approved'},
+    {'homework_name': 'hw5', 'status': 'rejected'},
+    {'id': 6, 'homework_name': None, 'status': 'reviewing'},
+]
+
+
+class TestValidation:
+
+    def test_batch_keeps_valid_items(self):
+        import validation
+
+        valid, errors = validation.HOMEWORK_SCHEMA.validate(BATCH)
+        assert [item['homework_name'] for item in valid] == ['hw1', 'hw5']
+        assert errors == {
+            'not_object': 1, 'missing:status': 1, 'unknown:status': 1,
+            'type:id': 1, 'type:homework_name': 1,
+        }
+        assert validation.summary({'missing:status': 2}) == (
+            'missing:status x2'
+        )
+
+    def test_stream_skips_invalid_items(self):
+        import validation
+
+        homeworks = validation.ValidHomeworks(iter(BATCH))
+        assert [item['id'] for item in homeworks if 'id' in item] == [1]
+        assert homeworks.first is BATCH[0]
+        assert sum(homeworks.errors.values()) == 5
+
+    def test_bad_homework_does_not_block_others(self, api_answer, mock_bot):
+        import engine
+
+        api_answer(BATCH, current_date=10)
+        tenant = engine.Tenant(token='t', chat_id=1)
+        bot = mock_bot
+        asyncio.run(engine.PollingEngine(bot, [tenant]).run_cycle())
+
+        assert tenant.statuses == {'1': 'approved', 'hw5': 'rejected'}
+        assert tenant.timestamp == 10
+        assert not any(
+            text.startswith('Сбой') for _, text in bot.sent
+        ), 'Некорректные работы не превращаются в сбой опроса'
@@ -0,0 +1,113 @@
+from collections import deque
+
+TICK = 1.0
+SLOT_BITS = 6
+LEVELS = 3
+
+
+class TimingWheel:
+    """Иерархическое колесо таймеров: вставка и срабатывание за O(1).
+
+    Нижний уровень хранит сроки ближайших 2 ** SLOT_BITS тиков, каждый
+    следующий — в 2 ** SLOT_BITS раз дальше. Когда нижний уровень
+    проходит полный круг, слот верхнего уровня раскладывается вниз,
+    так что каждый элемент перекладывается не больше LEVELS раз.
+    Сроки дальше последнего уровня ждут в его самом дальнем слоте.
+    Точность — один тик: элемент может сработать до tick секунд раньше.
+    """
+
+    def __init__(self, now: float, tick: float = TICK,
+                 slot_bits: int = SLOT_BITS, levels: int = LEVELS) -> None:
+        """Пустое колесо, начинающееся с момента now."""
+        self.tick = tick
+        self.slot_bits = slot_bits
+        self.slots = 1 << slot_bits
+        self.levels = levels
+        self._wheels = [
+            [[] for _ in range(self.slots)] for _ in range(levels)
+        ]
+        self._current = int(now // tick)
+        self._ready = deque()
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Число записей в колесе."""
+        return self._count
+
+    def add(self, item, when: float) -> None:
+        """Постановка элемента на момент when."""
+        self._count += 1
+        self._place(int(when // self.tick), item)
+
+    def _place(self, deadline: int, item) -> None:
+        """Слот по номеру тика срока; просроченное — сразу в готовые."""
+        delta = deadline - self._current
+        if delta <= 0:
+            self._ready.append(item)
+            return
+        position = deadline
+        for level in range(self.levels):
+            if delta < 1 << (self.slot_bits * (level + 1)):
+                break
+        else:
+            position = self._current + (
+                1 << (self.slot_bits * self.levels)
+            ) - 1
+        slot = (position >> (self.slot_bits * level)) & (self.slots - 1)
+        self._wheels[level][slot].append((deadline, item))
+
+    def advance(self, now: float) -> None:
+        """Перенос сработавших к моменту now элементов в готовые."""
+        target = int(now // self.tick)
+        if self._count == len(self._ready):
+            self._current = max(self._current, target)
+            return
+        while self._current < target:
+            self._current += 1
+            self._cascade()
+            slot = self._wheels[0][self._current & (self.slots - 1)]
+            self._ready.extend(item for _, item in slot)
+            slot.clear()
+
+    def _cascade(self) -> None:
+        """Раскладка верхних уровней при полном обороте нижнего."""
+        for level in range(1, self.levels):
+            shift = self.slot_bits * level
+            if self._current & ((1 << shift) - 1):
+                return
+            index = (self._current >> shift) & (self.slots - 1)
+            entries = self._wheels[level][index]
+            self._wheels[level][index] = []
+            for deadline, item in entries:
+                self._place(deadline, item)
+
+    def peek(self):
+        """Следующий готовый элемент без извлечения или None."""
+        return self._ready[0] if self._ready else None
+
+    def pop(self):
+        """Следующий готовый элемент или None."""
+        if not self._ready:
+            return None
+        self._count -= 1
+        return self._ready.popleft()
+
+    def ready(self) -> int:
+        """Число сработавших, но ещё не выданных элементов."""
+        return len(self._ready)
+
+    def next_in(self, now: float) -> float:
+        """Сколько секунд до следующего срабатывания (не больше оборота).
+
+        Просматривается только нижний уровень, поэтому время не зависит
+        от числа элементов; дальние сроки проверяются раз в оборот.
+        """
+        if self._ready:
+            return 0
+        for offset in range(1, self.slots + 1):
+            tick = self._current + offset
+            if self._wheels[0][tick & (self.slots - 1)]:
+                return max(tick * self.tick - now, 0)
+            if not tick & (self.slots - 1):
+                break
+        return max(tick * self.tick - now, 0)
@@ -0,0 +1,292 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+from collections import deque
+
+import requests
+
+import homework
+
+TRAFFIC_RECORD = os.getenv('TRAFFIC_RECORD')
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+API = 'api'
+SEND = 'send'
+UNLIMITED_RATE = 1e9
+
+
+def redact(value) -> str:
+    """Стабильная замена токена или чата, не раскрывающая исходное."""
+    digest = hashlib.blake2b(str(value).encode(), digest_size=8).hexdigest()
+    return f'redacted-{digest}'
+
+
+def request_token(headers: dict) -> str:
+    """Токен из заголовка авторизации запроса к API."""
+    return headers.get('Authorization', '').rpartition(' ')[2]
+
+
+class Recorder:
+    """Запись обмена с API и Telegram в сжатый JSONL.
+
+    Каждая строка — один запрос: смещение от начала записи t, время
+    ответа и сам ответ. Токены и чаты заменяются через redact, заголовки
+    запроса не пишутся. Вызывается из потоков пула, запись под блокировкой.
+    """
+
+    def __init__(self, path: str, clock=time.perf_counter) -> None:
+        """Файл записи трафика path."""
+        self.path = path
+        self.clock = clock
+        self.records = 0
+        self._started = clock()
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def write(self, kind: str, started: float, **fields) -> None:
+        """Запись одного запроса, начатого в момент started."""
+        record = {
+            'kind': kind,
+            't': round(started - self._started, 6),
+            'elapsed': round(self.clock() - started, 6),
+            **fields,
+        }
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self.records += 1
+
+    def close(self) -> None:
+        """Сброс и закрытие файла записи."""
+        with self._lock:
+            self._file.close()
+
+
+class RecordingSession:
+    """Сессия HTTP, которая пишет ответы API в Recorder.
+
+    Потоковые ответы при записи читаются целиком: тело нужно сохранить,
+    а iter_content затем отдаёт его из памяти.
+    """
+
+    def __init__(self, session, recorder: Recorder) -> None:
+        """Обёртка над сессией session с записью в recorder."""
+        self._session = session
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        """Остальные атрибуты берутся у исходной сессии."""
+        return getattr(self._session, name)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET-запрос с записью ответа или ошибки."""
+        started = self._recorder.clock()
+        fields = {
+            'token': redact(request_token(kwargs.get('headers') or {})),
+            'from_date': (kwargs.get('params') or {}).get('from_date'),
+        }
+        try:
+            response = (self._session or requests).get(url, **kwargs)
+        except requests.RequestException as error:
+            self._recorder.write(
+                API, started, error=type(error).__name__, **fields
+            )
+            raise
+        self._recorder.write(
+            API, started, status=response.status_code,
+            headers={
+                name: response.headers[name]
+                for name in KEPT_HEADERS if name in response.headers
+            },
+            body=response.text, **fields,
+        )
+        return response
+
+
+class RecordingBot:
+    """Бот, который пишет отправленные сообщения в Recorder."""
+
+    def __init__(self, bot, recorder: Recorder) -> None:
+        """Обёртка над ботом bot с записью в recorder."""
+        self._bot = bot
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        """Остальные атрибуты берутся у исходного бота."""
+        return getattr(self._bot, name)
+
+    def send_message(self, chat_id, text, *args, **kwargs):
+        """Отправка сообщения с записью результата."""
+        started = self._recorder.clock()
+        error = None
+        try:
+            return self._bot.send_message(chat_id, text, *args, **kwargs)
+        except Exception as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            self._recorder.write(
+                SEND, started, chat=redact(chat_id), text=text, error=error
+            )
+
+
+def start_recording(bot, path: str = TRAFFIC_RECORD) -> tuple:
+    """Запись трафика общей сессии HTTP и бота; возвращает (бот, запись)."""
+    import http_client
+
+    recorder = Recorder(path)
+    http_client.set_session(
+        RecordingSession(http_client.get_session(), recorder)
+    )
+    homework.logger.info('Запись трафика в %s', path)
+    return RecordingBot(bot, recorder), recorder
+
+
+def load(path: str) -> list:
+    """Все записи из файла в порядке начала запросов."""
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        records = [json.loads(line) for line in file if line.strip()]
+    records.sort(key=lambda record: record['t'])
+    return records
+
+
+def recorded_response(record: dict, url: str) -> requests.Response:
+    """Ответ requests, собранный из записи без обращения к сети."""
+    response = requests.Response()
+    response.status_code = record['status']
+    response.headers.update(record.get('headers', {}))
+    response.url = url
+    response.encoding = 'utf-8'
+    response._content = record.get('body', '').encode('utf-8')
+    response._content_consumed = True
+    return response
+
+
+class ReplaySession:
+    """Сессия HTTP, отдающая записанные ответы API по очереди токена.
+
+    Токеном в replay служит его замена из записи. При wall_clock ответ
+    возвращается не раньше записанного времени ответа.
+    """
+
+    def __init__(self, records: list, wall_clock: bool = False) -> None:
+        """Очереди записанных ответов по токенам."""
+        self.wall_clock = wall_clock
+        self._queues = {}
+        for record in records:
+            if record['kind'] == API:
+                self._queues.setdefault(record['token'], deque()).append(
+                    record
+                )
+        self._lock = threading.Lock()
+
+    def get(self, url: str, headers: dict = None, **kwargs):
+        """Следующий записанный ответ для токена из заголовков."""
+        token = request_token(headers or {})
+        with self._lock:
+            queue = self._queues.get(token)
+            record = queue.popleft() if queue else None
+        if record is None:
+            raise requests.ConnectionError(f'Нет записанных ответов: {token}')
+        if self.wall_clock:
+            time.sleep(record['elapsed'])
+        if 'error' in record:
+            raise requests.ConnectionError(record['error'])
+        return recorded_response(record, url)
+
+    def stats(self) -> dict:
+        """Сколько записанных ответов ещё не отдано."""
+        return {'pending': sum(map(len, self._queues.values()))}
+
+    def close(self) -> None:
+        """Сессии без соединений закрывать нечего."""
+
+
+class ReplayBot:
+    """Бот без сети: сообщения только складываются в список."""
+
+    def __init__(self) -> None:
+        """Бот без сети с пустым списком сообщений."""
+        self.sent = []
+
+    def send_message(self, chat_id, text, *args, **kwargs) -> None:
+        """Сообщение запоминается вместо отправки."""
+        self.sent.append((chat_id, text))
+
+
+async def _replay_token(polling, tenant, records: list, wall_clock: bool,
+                        started: float) -> None:
+    """Опросы одного токена в записанном порядке."""
+    for record in records:
+        if wall_clock:
+            delay = started + record['t'] - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if record['from_date'] is not None:
+            tenant.timestamp = record['from_date']
+        await polling.poll(tenant)
+
+
+async def replay(records: list, wall_clock: bool = False, bot=None) -> dict:
+    """Прогон записанного трафика через опрос, разбор, diff и отправку.
+
+    Записанные ответы API отдаются по токенам в исходном порядке:
+    при wall_clock — с записанными интервалами и временем ответа,
+    иначе без пауз и без лимитов Telegram. Сообщения получает
+    ReplayBot, сеть не нужна.
+    """
+    import circuit_breaker
+    import http_client
+    import response_cache
+    import retry
+    from engine import PollingEngine, Tenant
+    from send_queue import SendQueue
+
+    by_token = {}
+    for record in records:
+        if record['kind'] == API:
+            by_token.setdefault(record['token'], []).append(record)
+    tenants = {
+        token: Tenant(token=token, chat_id=number)
+        for number, token in enumerate(by_token)
+    }
+    bot = bot or ReplayBot()
+    previous = http_client.set_session(ReplaySession(records, wall_clock))
+    circuit_breaker.reset_breakers()
+    retry.reset_budgets()
+    response_cache.init_cache()
+    polling = PollingEngine(bot, list(tenants.values()))
+    if not wall_clock:
+        polling.sender = SendQueue(
+            bot, global_rate=UNLIMITED_RATE, chat_rate=UNLIMITED_RATE
+        )
+    polling._start()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            _replay_token(
+                polling, tenants[token], token_records, wall_clock, started
+            )
+            for token, token_records in by_token.items()
+        ))
+        await polling.sender.join()
+    finally:
+        elapsed = time.perf_counter() - started
+        await polling._stop()
+        http_client.set_session(previous)
+        response_cache.close_cache()
+    polls = sum(map(len, by_token.values()))
+    return {
+        'tenants': len(tenants),
+        'polls': polls,
+        'messages': len(getattr(bot, 'sent', ())),
+        'recorded_messages': sum(
+            record['kind'] == SEND for record in records
+        ),
+        'seconds': elapsed,
+        'polls_per_sec': polls / elapsed if elapsed else 0.0,
+    }
@@ -0,0 +1,117 @@
+from collections import Counter
+
+import homework
+import metrics
+
+INVALID_HOMEWORKS = metrics.REGISTRY.counter(
+    'homework_bot_invalid_homeworks_total',
+    'Работы из ответа API, не прошедшие проверку', ('problem',),
+)
+MISSING = object()
+
+
+class Schema:
+    """Проверка записей одного вида, собранная заранее.
+
+    Описание полей разворачивается в кортежи при создании схемы, поэтому
+    проверка записи — несколько сравнений без исключений. Плохая запись
+    получает короткий код проблемы (missing:status, type:id,
+    unknown:status) и не мешает проверке остальных.
+    """
+
+    def __init__(self, required: dict, optional: dict = None,
+                 choices: dict = None) -> None:
+        """Схема: обязательные и необязательные поля с типами."""
+        self._required = frozenset(required)
+        self._types = tuple({**(optional or {}), **required}.items())
+        self._choices = tuple((choices or {}).items())
+
+    def problem(self, item):
+        """Код проблемы записи или None, если запись корректна."""
+        if type(item) is not dict:
+            return 'not_object'
+        if not self._required <= item.keys():
+            return 'missing:' + min(self._required.difference(item))
+        for name, types in self._types:
+            value = item.get(name, MISSING)
+            if value is not MISSING and not isinstance(value, types):
+                return f'type:{name}'
+        for name, allowed in self._choices:
+            if name in item and item[name] not in allowed:
+                return f'unknown:{name}'
+        return None
+
+    def validate(self, items) -> tuple:
+        """Корректные записи списком и счётчик проблем остальных."""
+        valid = []
+        errors = Counter()
+        problem = self.problem
+        for item in items:
+            code = problem(item)
+            if code is None:
+                valid.append(item)
+            else:
+                errors[code] += 1
+        return valid, errors
+
+
+HOMEWORK_SCHEMA = Schema(
+    required={'homework_name': str, 'status': str},
+    optional={'id': (int, str)},
+    choices={'status': homework.HOMEWORK_STATUSES},
+)
+
+
+def summary(errors: dict) -> str:
+    """Сводка проблем одной строкой: missing:status x2, not_object x1."""
+    return ', '.join(
+        f'{code} x{count}' for code, count in sorted(
+            errors.items(), key=lambda pair: -pair[1]
+        )
+    )
+
+
+def report(errors: Counter) -> None:
+    """Счётчики и одна запись в лог на весь ответ API."""
+    if not errors:
+        return
+    for code, count in errors.items():
+        INVALID_HOMEWORKS.inc(code, amount=count)
+    homework.logger.warning(
+        'Пропущены некорректные работы: %s', summary(errors)
+    )
+
+
+def validate_homeworks(homeworks: list) -> list:
+    """Корректные работы из списка; о пропущенных — одна сводка."""
+    valid, errors = HOMEWORK_SCHEMA.validate(homeworks)
+    report(errors)
+    return valid
+
+
+class ValidHomeworks:
+    """Корректные работы из потока по мере чтения.
+
+    Для потокового разбора: работы не собираются в список, сводка
+    пропущенных выводится, когда поток прочитан до конца.
+    """
+
+    def __init__(self, items, schema: Schema = HOMEWORK_SCHEMA) -> None:
+        """Фильтр работ items по схеме schema."""
+        self._items = items
+        self._schema = schema
+        self.first = None
+        self.errors = Counter()
+
+    def __iter__(self):
+        """Корректные работы; некорректные отбрасываются с учётом."""
+        problem = self._schema.problem
+        for item in self._items:
+            code = problem(item)
+            if code is not None:
+                self.errors[code] += 1
+                continue
+            if self.first is None:
+                self.first = item
+            yield item
+        report(self.errors)